@@ -10,6 +10,12 @@ import os
 # 添加src目录到Python路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "src"))
 
+# --profile-startup：在导入主模块之前开始计时，统计启动时的模块导入耗时
+if "--profile-startup" in sys.argv:
+    from bbh3_scan_launch.utils.startup_profiler import startup_profiler
+
+    startup_profiler.enable()
+
 # 导入主模块
 from bbh3_scan_launch.main import main
 
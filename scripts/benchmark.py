@@ -0,0 +1,1862 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+性能基准测试脚本
+用法: python scripts/benchmark.py <场景> [选项]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# 添加项目路径到系统路径
+project_root = Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(project_root / "src"))
+
+from bbh3_scan_launch.constants import TEMPLATE_PICTURES_DIR
+from bbh3_scan_launch.utils.clipboard_utils import ClipboardBackend
+
+# 基准测试的模板缩放缓存目录（进程退出时删除），不写入 config/template_cache
+TEMPLATE_CACHE_TEMP_DIR = tempfile.TemporaryDirectory(prefix="bbh3_template_cache_")
+
+# 基准测试的合成帧分辨率（宽, 高）
+RESOLUTIONS = {
+    "720p": (1280, 720),
+    "1440p": (2560, 1440),
+    "2160p": (3840, 2160),
+}
+
+
+def new_image_processor(**kwargs):
+    """构造 ImageProcessor，模板缩放缓存写入临时目录"""
+    from bbh3_scan_launch.core.bh3_utils import ImageProcessor
+
+    return ImageProcessor(template_cache_dir=TEMPLATE_CACHE_TEMP_DIR.name, **kwargs)
+
+
+def timeit(func, repeat):
+    """多次执行 func，返回 (平均耗时毫秒, 最后一次返回值)"""
+    result = func()  # 预热
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) * 1000 / repeat, result
+
+
+def load_scaled_templates(screen_height):
+    """按文件名中的分辨率标识加载并缩放模板，返回 {文件名: 灰度PIL图像}"""
+    import re
+
+    templates = {}
+    for filename in sorted(os.listdir(TEMPLATE_PICTURES_DIR)):
+        match = re.search(r"(\d+)p", filename)
+        if not match or not filename.lower().endswith((".png", ".jpg", ".jpeg")):
+            continue
+        image = Image.open(os.path.join(TEMPLATE_PICTURES_DIR, filename)).convert("L")
+        scale = screen_height / int(match.group(1))
+        size = (max(1, int(image.width * scale)), max(1, int(image.height * scale)))
+        templates[filename] = image.resize(size, Image.LANCZOS)
+    return templates
+
+
+def make_synthetic_frame(width, height, template=None, position=None, seed=0):
+    """生成带纹理噪声的合成灰度帧，可选地在 position 处贴入模板"""
+    rng = np.random.default_rng(seed)
+    gradient = np.linspace(40, 200, width, dtype=np.float32)[None, :]
+    noise = rng.normal(0, 25, (height, width)).astype(np.float32)
+    frame = np.clip(gradient + noise, 0, 255).astype(np.uint8)
+    if template is not None:
+        x, y = position
+        t_height, t_width = template.shape[:2]
+        frame[y : y + t_height, x : x + t_width] = template
+    return frame
+
+
+def bench_match(args):
+    """模板匹配：全分辨率暴力匹配 vs 金字塔由粗到精匹配"""
+    from bbh3_scan_launch.core.vision import (
+        ImagePyramid,
+        PreparedTemplate,
+        match_brute_force,
+        match_coarse_to_fine,
+    )
+
+    print(
+        f"{'分辨率':<8}{'模板':<16}{'暴力(ms)':>10}{'金字塔(ms)':>12}{'加速':>8}  结果"
+    )
+    for label, (width, height) in RESOLUTIONS.items():
+        for name, image in load_scaled_templates(height).items():
+            template = PreparedTemplate(name, image)
+            if template.width >= width or template.height >= height:
+                continue
+            position = (width // 3, height // 2)
+            frame = make_synthetic_frame(width, height, template.array, position)
+
+            brute_ms, (brute_loc, _) = timeit(
+                lambda: match_brute_force(frame, template), args.repeat
+            )
+            pyramid_ms, (pyramid_loc, pyramid_val) = timeit(
+                lambda: match_coarse_to_fine(ImagePyramid(frame), template),
+                args.repeat,
+            )
+            status = "一致" if brute_loc == pyramid_loc else f"不一致{pyramid_loc}"
+            print(
+                f"{label:<8}{name:<16}{brute_ms:>10.1f}{pyramid_ms:>12.1f}"
+                f"{brute_ms / pyramid_ms:>7.1f}x  {status} ({pyramid_val:.2f})"
+            )
+
+
+def bench_batch(args):
+    """批量匹配：逐模板转换+匹配（旧路径） vs TemplateMatcher 单次遍历"""
+    import tracemalloc
+
+    import cv2
+    from bbh3_scan_launch.core.vision import TemplateMatcher
+
+    def legacy_match_all(screen, templates, threshold=0.8):
+        best = None
+        for name, template in templates.items():
+            screen_np = np.array(screen)
+            template_np = np.array(template)
+            result = cv2.matchTemplate(screen_np, template_np, cv2.TM_CCOEFF_NORMED)
+            _, max_val, _, max_loc = cv2.minMaxLoc(result)
+            if max_val >= threshold and (best is None or max_val > best[2]):
+                best = (name, max_loc, max_val)
+        return best
+
+    def peak_kib(func):
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak / 1024
+
+    print(
+        f"{'分辨率':<8}{'旧路径(ms)':>12}{'批量(ms)':>10}{'提前退出(ms)':>14}"
+        f"{'旧峰值(KiB)':>14}{'批量峰值(KiB)':>16}"
+    )
+    for label, (width, height) in RESOLUTIONS.items():
+        templates = {
+            name: image
+            for name, image in load_scaled_templates(height).items()
+            if image.width < width and image.height < height
+        }
+        first = next(iter(templates.values()))
+        frame = make_synthetic_frame(
+            width, height, np.asarray(first), (width // 3, height // 2)
+        )
+        screen = Image.fromarray(frame)
+        matcher = TemplateMatcher()
+        for name, image in templates.items():
+            matcher.add(name, image)
+
+        legacy_ms, _ = timeit(lambda: legacy_match_all(screen, templates), args.repeat)
+        batch_ms, _ = timeit(lambda: matcher.match_all(screen), args.repeat)
+        early_ms, _ = timeit(
+            lambda: matcher.match_all(screen, early_exit=True), args.repeat
+        )
+        legacy_peak = peak_kib(lambda: legacy_match_all(screen, templates))
+        batch_peak = peak_kib(lambda: matcher.match_all(screen))
+        print(
+            f"{label:<8}{legacy_ms:>12.1f}{batch_ms:>10.1f}{early_ms:>14.1f}"
+            f"{legacy_peak:>14.0f}{batch_peak:>16.0f}"
+        )
+
+
+def bench_roi(args):
+    """ROI 记忆：无记忆全帧搜索 vs 稳态下在上次命中区域附近搜索"""
+    from bbh3_scan_launch.core.vision import TemplateMatcher
+
+    print(f"{'分辨率':<8}{'模板':<16}{'全帧(ms)':>10}{'ROI(ms)':>10}  命中统计")
+    for label, (width, height) in RESOLUTIONS.items():
+        for name, image in load_scaled_templates(height).items():
+            if image.width >= width or image.height >= height:
+                continue
+            frame = make_synthetic_frame(
+                width, height, np.asarray(image), (width // 3, height // 2)
+            )
+            cold = TemplateMatcher()
+            cold.add(name, image)
+            warm = TemplateMatcher()
+            warm.add(name, image)
+
+            def full_frame():
+                cold.clear()
+                cold.add(name, image)
+                return cold.match(name, frame)
+
+            cold_ms, _ = timeit(full_frame, args.repeat)
+            warm_ms, _ = timeit(lambda: warm.match(name, frame), args.repeat)
+            print(
+                f"{label:<8}{name:<16}{cold_ms:>10.2f}{warm_ms:>10.2f}"
+                f"  {warm.roi_stats()}"
+            )
+
+
+def percentiles(samples, points=(50, 90, 99)):
+    """计算耗时样本（毫秒）的百分位数"""
+    if not samples:
+        return {p: 0.0 for p in points}
+    return {p: float(np.percentile(samples, p)) for p in points}
+
+
+# 运行 auto_monitor 的场景的轮询周期数（需远大于变化检测的强制刷新间隔）
+MONITOR_TICKS = 60
+
+
+class StopMonitor(BaseException):
+    """在指定的轮询周期后结束 auto_monitor（不会被监控循环的 except Exception 捕获）"""
+
+
+def run_monitor(processor, ticks, config):
+    """
+    以真实的 BH3GameManager.auto_monitor 运行 ticks 个轮询周期（剪贴板检查计为一个周期）
+    :param config: 监控配置（auto_click 时视为拥有管理员权限）
+    """
+    import asyncio
+
+    from bbh3_scan_launch.core.bh3_utils import BH3GameManager
+
+    polls = [0]
+
+    def poll_clipboard_ticket():
+        polls[0] += 1
+        if polls[0] >= ticks:
+            raise StopMonitor
+        return None
+
+    processor.poll_clipboard_ticket = poll_clipboard_ticket
+    manager = BH3GameManager()
+    manager._is_admin = lambda: True
+    try:
+        asyncio.run(
+            manager.auto_monitor(
+                dict(config, account_login=True), processor, lambda: None
+            )
+        )
+    except StopMonitor:
+        pass
+    return polls[0]
+
+
+def bench_skip(args):
+    """帧变化检测：运行 auto_monitor，静止画面应跳过大部分帧，持续变化的画面不应跳过"""
+    from bbh3_scan_launch.core.vision import SyntheticFrameSource
+
+    width, height = 640, 360
+    frames = [make_ui_frame(width, height, seed=seed) for seed in range(2)]
+    config = {"auto_clip": True, "sleep_time": 0.05, "min_sleep_time": 0.05}
+    # (说明, 帧生成函数, 跳过比例下限, 跳过比例上限)
+    cases = [
+        ("静止画面", lambda index: frames[0], 0.8, 1.0),
+        ("变化画面", lambda index: frames[index % 2], 0.0, 0.05),
+    ]
+    failures = []
+    for label, factory, low, high in cases:
+        processor = new_image_processor(
+            frame_source=SyntheticFrameSource(factory, (width, height))
+        )
+        ticks = run_monitor(processor, MONITOR_TICKS, config)
+        stats = processor.frame_skip_stats()
+        print(
+            f"{label}: 轮询 {ticks} 次，检查 {stats['checked']} 帧，"
+            f"跳过 {stats['skipped']} 帧（{stats['skip_ratio']:.0%}）"
+        )
+        if not low <= stats["skip_ratio"] <= high:
+            failures.append(f"{label}跳过比例 {stats['skip_ratio']:.0%}")
+    if failures:
+        print("失败: " + "；".join(failures))
+        sys.exit(1)
+    print("通过")
+
+
+def bench_capture(args):
+    """单次截图：运行 auto_monitor（模板匹配与二维码解析均开启），每个轮询周期只截图一次且两者共用同一帧"""
+    from bbh3_scan_launch.core.vision import SyntheticFrameSource
+
+    width, height = 640, 360
+    frames = [make_ui_frame(width, height, seed=seed) for seed in range(2)]
+    source = SyntheticFrameSource(lambda index: frames[index % 2], (width, height))
+    processor = new_image_processor(frame_source=source)
+    received = {"match": [], "decode": []}
+    match_and_click, extract_ticket = (
+        processor.match_and_click,
+        processor.extract_ticket,
+    )
+
+    def recording_match(threshold=0.8, early_exit=False, frame=None):
+        received["match"].append(frame)
+        return match_and_click(threshold, early_exit, frame=frame)
+
+    def recording_extract(image, image_source="game_window"):
+        received["decode"].append(image)
+        return extract_ticket(image, image_source)
+
+    processor.match_and_click = recording_match
+    processor.extract_ticket = recording_extract
+    config = {
+        "auto_click": True,
+        "auto_clip": True,
+        "sleep_time": 0.05,
+        "min_sleep_time": 0.05,
+    }
+    ticks = run_monitor(processor, MONITOR_TICKS, config)
+    shared = sum(
+        match is decode for match, decode in zip(received["match"], received["decode"])
+    )
+    print(
+        f"轮询 {ticks} 次，截图 {source.captures} 次，模板匹配 {len(received['match'])} 次，"
+        f"二维码解析 {len(received['decode'])} 次，共用同一帧 {shared} 次"
+    )
+    failures = []
+    if source.captures != ticks:
+        failures.append(f"截图次数 {source.captures} 不等于轮询次数 {ticks}")
+    if None in received["match"]:
+        failures.append("模板匹配自行截图")
+    # 监控停止时正在执行的分析会在二维码解析前中止，最后一帧可能只做了模板匹配
+    if (
+        not received["decode"]
+        or shared != len(received["decode"])
+        or len(received["match"]) - len(received["decode"]) > 1
+    ):
+        failures.append("模板匹配与二维码解析未共用同一帧")
+    if failures:
+        print("失败: " + "；".join(failures))
+        sys.exit(1)
+    print("通过")
+
+
+def bench_replay(args):
+    """回放：通过 FrameSource 将录制截图/合成帧送入 match_and_click 与 parse_qr_code"""
+    import asyncio
+
+    from bbh3_scan_launch.core.vision import DirectoryFrameSource, SyntheticFrameSource
+
+    if args.frames_dir:
+        source = DirectoryFrameSource(args.frames_dir)
+    else:
+        width, height = RESOLUTIONS[args.resolution]
+        source = SyntheticFrameSource(
+            lambda index: make_synthetic_frame(width, height, seed=index),
+            (width, height),
+            count=args.repeat,
+        )
+    processor = new_image_processor(frame_source=source)
+    processor.ensure_templates()
+
+    match_ms, decode_ms = [], []
+    while True:
+        frame = processor.grab_frame()
+        if frame is None:
+            break
+        start = time.perf_counter()
+        processor.match_and_click(frame=frame)
+        match_ms.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        asyncio.run(processor.parse_qr_code(image_source="game_window", frame=frame))
+        decode_ms.append((time.perf_counter() - start) * 1000)
+
+    print(f"回放帧数: {source.captures}")
+    for label, samples in (("模板匹配", match_ms), ("二维码解析", decode_ms)):
+        stats = percentiles(samples)
+        print(
+            f"{label}: p50={stats[50]:.1f}ms p90={stats[90]:.1f}ms "
+            f"p99={stats[99]:.1f}ms"
+        )
+
+
+def bench_gray(args):
+    """BGRX 转灰度：PIL frombuffer + convert("L") + np.array vs Frame.from_bgrx"""
+    from bbh3_scan_launch.core.vision import Frame
+
+    print(f"{'分辨率':<8}{'旧路径(ms)':>12}{'新路径(ms)':>12}{'加速':>8}  结果")
+    for label, (width, height) in (("1080p", (1920, 1080)), *RESOLUTIONS.items()):
+        if label == "720p":
+            continue
+        rng = np.random.default_rng(0)
+        pixels = rng.integers(0, 256, (height, width, 4), dtype=np.uint8)
+
+        def legacy():
+            image = Image.frombuffer(
+                "RGB", (width, height), pixels, "raw", "BGRX", 0, 1
+            )
+            return np.array(image.convert("L"))
+
+        legacy_ms, legacy_gray = timeit(legacy, args.repeat)
+        new_ms, new_gray = timeit(lambda: Frame.from_bgrx(pixels).gray, args.repeat)
+        max_diff = int(np.abs(legacy_gray.astype(int) - new_gray).max())
+        print(
+            f"{label:<8}{legacy_ms:>12.2f}{new_ms:>12.2f}"
+            f"{legacy_ms / new_ms:>7.1f}x  最大灰度差 {max_diff}"
+        )
+
+
+def make_ui_frame(width, height, seed=0):
+    """生成接近游戏界面的平滑合成灰度帧（低频色块 + 轻微噪声）"""
+    import cv2
+
+    rng = np.random.default_rng(seed)
+    blocks = rng.normal(128, 40, (height // 32 + 1, width // 32 + 1))
+    frame = cv2.resize(
+        blocks.astype(np.float32), (width, height), interpolation=cv2.INTER_CUBIC
+    )
+    frame += rng.normal(0, 6, (height, width)).astype(np.float32)
+    return np.clip(frame, 0, 255).astype(np.uint8)
+
+
+def make_qr_frame(width, height, seed=0, side=None):
+    """
+    生成带登录二维码的合成灰度帧
+    :param side: 二维码边长（像素），默认为帧高的 1/4
+    """
+    import cv2
+
+    url = (
+        "https://user.mihoyo.com/qr_code_in_game.html?app_id=1&app_name=bh3"
+        "&bbs=true&biz_key=bh3_cn&expire=1700000000&ticket=0123456789abcdef01234567"
+    )
+    code = cv2.QRCodeEncoder.create().encode(url)
+    side = side or height // 4
+    code = cv2.resize(code, (side, side), interpolation=cv2.INTER_NEAREST)
+    frame = make_ui_frame(width, height, seed)
+    x, y = width // 2 - side // 2, height // 4
+    frame[y : y + side, x : x + side] = code
+    return frame
+
+
+def bench_qr(args):
+    """二维码解析：整帧 pyzbar 解码 vs 缩小定位 + 候选区域解码，报告延迟百分位"""
+    from pyzbar.pyzbar import ZBarSymbol, decode
+    from bbh3_scan_launch.core.vision import SyntheticFrameSource
+
+    print(
+        f"{'分辨率':<8}{'二维码':<6}{'整帧p50/p90(ms)':>18}{'两阶段p50/p90(ms)':>20}"
+        "  解码结果"
+    )
+    for label, (width, height) in RESOLUTIONS.items():
+        for with_qr in (True, False):
+            factory = make_qr_frame if with_qr else make_ui_frame
+            processor = new_image_processor(
+                frame_source=SyntheticFrameSource(
+                    lambda index: factory(width, height, seed=index), (width, height)
+                )
+            )
+            full_ms, staged_ms, decoded = [], [], 0
+            for _ in range(args.repeat):
+                gray = processor.grab_frame().gray
+                start = time.perf_counter()
+                decode(gray, symbols=[ZBarSymbol.QRCODE])
+                full_ms.append((time.perf_counter() - start) * 1000)
+                start = time.perf_counter()
+                decoded += bool(processor.decode_qr(gray))
+                staged_ms.append((time.perf_counter() - start) * 1000)
+            full, staged = percentiles(full_ms), percentiles(staged_ms)
+            print(
+                f"{label:<8}{'有' if with_qr else '无':<6}"
+                f"{full[50]:>11.1f}/{full[90]:<6.1f}{staged[50]:>13.1f}/{staged[90]:<6.1f}"
+                f"  {decoded}/{args.repeat}"
+            )
+
+    # 定位器漏检兜底：二维码静止在画面中且定位器始终漏检时，
+    # 只有帧变化检测强制刷新的帧会解码，整帧兜底须按经过的时间触发
+    width, height = RESOLUTIONS["1440p"]  # 大于定位器的缩小尺寸，才会经过定位阶段
+    qr_frame = make_qr_frame(width, height)
+    clock = [0.0]
+    processor = new_image_processor(
+        frame_source=SyntheticFrameSource(lambda index: qr_frame, (width, height)),
+        clock=lambda: clock[0],
+    )
+    processor.qr_locator.locate = lambda gray: []
+    found_at = None
+    for tick in range(1, 200):
+        clock[0] += 1.0  # 基础轮询间隔 1 秒
+        frame = processor.grab_frame()
+        if processor.frame_changed(frame) and processor.extract_ticket(frame):
+            found_at = tick
+            break
+    limit = (
+        processor.QR_FULL_DECODE_INTERVAL + processor.change_detector.force_interval + 2
+    )
+    print(
+        f"定位器漏检、画面静止时第 {found_at} 个轮询周期识别到二维码（上限 {limit:.0f}）"
+    )
+    if found_at is None or found_at > limit:
+        print("失败: 整帧解码兜底过晚")
+        sys.exit(1)
+
+
+class FakeClipboardBackend(ClipboardBackend):
+    """脚本化的剪贴板后端：由测试设置内容与序列号，并统计读取次数"""
+
+    def __init__(self, use_sequence=True):
+        self.use_sequence = use_sequence
+        self.sequence = 0
+        self.image = None
+        self.grabs = 0
+
+    def copy(self, image):
+        """模拟用户复制图像（序列号递增）"""
+        self.image = image
+        self.sequence += 1
+
+    def sequence_number(self):
+        return self.sequence if self.use_sequence else None
+
+    def grab_image(self):
+        self.grabs += 1
+        return self.image
+
+
+def bench_clipboard(args):
+    """
+    剪贴板轮询：序列号未变化时不读取剪贴板；已拒绝的图像（无二维码）重新复制时不再解码。
+    脚本：第 0 次轮询复制无二维码的截图，第 50 次重新复制同一截图，第 100 次复制登录二维码
+    """
+    from bbh3_scan_launch.core.vision import SyntheticFrameSource
+    from bbh3_scan_launch.utils.clipboard_utils import ClipboardWatcher
+
+    width, height = RESOLUTIONS["720p"]
+    ui_image = Image.fromarray(make_ui_frame(width, height))
+    qr_image = Image.fromarray(make_qr_frame(width, height))
+    script = {0: ui_image, 50: ui_image, 100: qr_image}
+    polls = 150
+
+    failures = []
+    for label, use_sequence, max_grabs in (
+        ("序列号", True, len(script)),
+        ("内容哈希（无序列号）", False, polls),
+    ):
+        backend = FakeClipboardBackend(use_sequence)
+        processor = new_image_processor(
+            frame_source=SyntheticFrameSource(
+                lambda index: make_ui_frame(width, height), (width, height)
+            )
+        )
+        processor.clipboard_watcher = ClipboardWatcher(backend)
+        decode_qr = processor.decode_qr
+        decodes = []
+        processor.decode_qr = lambda image, locate=True: decodes.append(1) or decode_qr(
+            image, locate
+        )
+
+        tickets = []
+        start = time.perf_counter()
+        for index in range(polls):
+            if index in script:
+                backend.copy(script[index])
+            ticket = processor.poll_clipboard_ticket()
+            if ticket:
+                tickets.append(index)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        stats = processor.clipboard_watcher.stats()
+        print(
+            f"{label:<12} 轮询 {polls} 次 {elapsed_ms:>7.1f}ms  读取剪贴板 {backend.grabs} 次  "
+            f"解码 {len(decodes)} 次  抑制 {stats['suppressed']} 次  票据出现于第 {tickets} 次"
+        )
+        if backend.grabs > max_grabs:
+            failures.append(
+                f"{label}: 读取剪贴板 {backend.grabs} 次（上限 {max_grabs}）"
+            )
+        # 无二维码的截图只解码一次，重新复制时被抑制；二维码只解码一次
+        if len(decodes) != 2:
+            failures.append(f"{label}: 解码 {len(decodes)} 次（应为 2）")
+        if use_sequence and stats["suppressed"] != 1:
+            failures.append(f"{label}: 重新复制的已拒绝图像未被抑制")
+        if tickets != [100]:
+            failures.append(f"{label}: 票据识别结果 {tickets}（应为 [100]）")
+
+    # 剪贴板中的整屏截图直接整图解码，不经过二维码定位器：定位器漏检小二维码时，
+    # 截图会被记为无效且不再重试（此处令定位器始终漏检）
+    width, height = 1920, 1080
+    screenshot = Image.fromarray(make_qr_frame(width, height, side=160))
+    processor = new_image_processor(
+        frame_source=SyntheticFrameSource(
+            lambda index: make_ui_frame(width, height), (width, height)
+        )
+    )
+    locates = []
+    processor.qr_locator.locate = lambda gray: locates.append(1) or []
+    ticket = processor.extract_ticket(screenshot, "clipboard")
+    print(
+        f"1920x1080 截图中 160px 二维码（定位器漏检）：剪贴板解码"
+        f"{'识别' if ticket else '未识别'}，调用定位器 {len(locates)} 次"
+    )
+    if not ticket or locates:
+        failures.append("剪贴板截图未整图解码")
+    if failures:
+        print("失败: " + "；".join(failures))
+        sys.exit(1)
+    print("通过")
+
+
+def bench_pipeline(args):
+    """自动监控：串行循环 vs 线程池流水线，报告二维码出现到开始扫码验证的端到端延迟"""
+    import asyncio
+
+    from bbh3_scan_launch.core.pipeline import FramePipeline
+    from bbh3_scan_launch.core.vision import SyntheticFrameSource
+
+    width, height = RESOLUTIONS[args.resolution]
+    ui_frames = [make_ui_frame(width, height, seed=seed) for seed in range(2)]
+    qr_frame = make_qr_frame(width, height)
+    interval, capture_s = 0.25, 0.03  # 登录界面轮询间隔与估算的 PrintWindow 耗时
+
+    def make_processor(qr_at):
+        def factory(index):
+            time.sleep(capture_s)
+            if time.monotonic() >= qr_at:
+                return qr_frame
+            return ui_frames[index % 2]
+
+        return new_image_processor(
+            frame_source=SyntheticFrameSource(factory, (width, height))
+        )
+
+    async def serial_loop(qr_at):
+        processor = make_processor(qr_at)
+        while True:
+            frame = processor.grab_frame()
+            if processor.frame_changed(frame):
+                processor.match_and_click(frame=frame)
+                if processor.extract_ticket(frame):
+                    return time.monotonic() - qr_at
+            await asyncio.sleep(interval)
+
+    async def pipeline_loop(qr_at):
+        pipeline = FramePipeline(make_processor(qr_at))
+        try:
+            while True:
+                frame = await pipeline.capture()
+                pipeline.submit(frame, auto_click=True, auto_clip=True)
+                if pipeline.tickets():
+                    return time.monotonic() - qr_at
+                await pipeline.wait(interval)
+        finally:
+            pipeline.close()
+
+    rng = np.random.default_rng(0)
+    offsets = rng.uniform(0.5, 1.5, args.repeat)
+    print(
+        f"分辨率 {args.resolution}，轮询间隔 {interval}s，模拟截图耗时 {capture_s * 1000:.0f}ms"
+    )
+    for label, loop in (("串行循环", serial_loop), ("流水线", pipeline_loop)):
+        latency_ms = [
+            asyncio.run(loop(time.monotonic() + offset)) * 1000 for offset in offsets
+        ]
+        stats = percentiles(latency_ms)
+        print(
+            f"{label}: p50={stats[50]:.0f}ms p90={stats[90]:.0f}ms "
+            f"max={max(latency_ms):.0f}ms"
+        )
+
+    # 停止：分析进行中关闭流水线，关闭后不应再点击或产生票据
+    async def stop_during_analysis():
+        processor = make_processor(0.0)
+        events = []
+
+        def slow_changed(frame):
+            time.sleep(0.3)
+            events.append("changed")
+            return True
+
+        processor.frame_changed = slow_changed
+        processor.match_and_click = lambda frame=None: events.append("click")
+        processor.extract_ticket = lambda frame: events.append("ticket") or "t"
+        pipeline = FramePipeline(processor)
+        frame = await pipeline.capture()
+        pipeline.submit(frame, auto_click=True, auto_clip=True)
+        await asyncio.sleep(0.05)
+        await pipeline.aclose()
+        events.append("closed")
+        await asyncio.sleep(0.5)
+        return events, pipeline.tickets()
+
+    events, tickets = asyncio.run(stop_during_analysis())
+    print(f"分析进行中停止: 事件 {events}，关闭后的票据 {tickets}")
+    if events != ["changed", "closed"] or tickets:
+        print("失败: 流水线关闭后仍执行了点击或提交了票据")
+        sys.exit(1)
+    print("通过")
+
+
+def bench_window(args):
+    """窗口检测：无缓存（每次查询都访问后端） vs WindowWatcher TTL 缓存的后端调用次数"""
+    from bbh3_scan_launch.core.window_watcher import (
+        ScriptedWindowBackend,
+        WindowWatcher,
+    )
+
+    # 模拟 60 秒监控：每 0.25 秒一个周期，每周期查询 3 次（帧来源、点击、界面状态）；
+    # 第 20.1 秒窗口出现，第 40.1 秒窗口关闭
+    tick, queries_per_tick, duration = 0.25, 3, 60.0
+    print(
+        f"{'TTL(s)':<8}{'查询次数':>8}{'后端调用':>10}{'状态变化':>10}{'最大感知延迟(s)':>16}"
+    )
+    failures = []
+    baseline_calls = None
+    for ttl in (0.0, 0.5, 1.0, 2.0):
+        backend = ScriptedWindowBackend()
+        clock = [0.0]
+        watcher = WindowWatcher("崩坏3", backend, ttl=ttl, clock=lambda: clock[0])
+        changes = []
+        watcher.subscribe(lambda hwnd, pid: changes.append((clock[0], hwnd)))
+        while clock[0] < duration:
+            backend.hwnd = 0x1234 if 20.1 <= clock[0] < 40.1 else 0
+            for _ in range(queries_per_tick):
+                watcher.exists()
+            clock[0] += tick
+        delay = max(
+            changed_at - event_at
+            for (changed_at, _), event_at in zip(changes, (20.1, 40.1))
+        )
+        print(
+            f"{ttl:<8}{watcher.queries:>10}{backend.calls:>12}"
+            f"{len(changes):>12}{delay:>18.2f}"
+        )
+        if baseline_calls is None:
+            baseline_calls = backend.calls
+            continue
+        # TTL 内的查询不访问后端：后端调用至少减少到无缓存时的 1/(每周期查询次数)
+        if backend.calls > baseline_calls / queries_per_tick:
+            failures.append(
+                f"TTL {ttl}s 后端调用 {backend.calls} 次，无缓存时 {baseline_calls} 次"
+            )
+        if len(changes) != 2 or delay > ttl + tick:
+            failures.append(
+                f"TTL {ttl}s 状态变化 {len(changes)} 次，最大感知延迟 {delay:.2f}s"
+            )
+    if failures:
+        print("失败: " + "；".join(failures))
+        sys.exit(1)
+    print("通过")
+
+
+def bench_process(args):
+    """进程检测：每次 process_iter 全量遍历 vs ProcessTracker（PID 缓存 + 创建时间校验）"""
+    import shutil
+    import subprocess
+    import tempfile
+
+    import psutil
+    from bbh3_scan_launch.core.process_tracker import ProcessTracker
+
+    # 进程数不足时启动空闲子进程，使系统中至少有数百个进程
+    children = [
+        subprocess.Popen(["sleep", "60"])
+        for _ in range(max(0, 300 - len(psutil.pids())))
+    ]
+    try:
+        target = psutil.Process().name()
+
+        def scan(name):
+            for proc in psutil.process_iter(["name"]):
+                if proc.info["name"] and proc.info["name"].lower() == name:
+                    return True
+            return False
+
+        print(f"系统进程数: {len(psutil.pids())}")
+        for label, name in (("进程存在", target.lower()), ("进程不存在", "bh3.exe")):
+            tracker = ProcessTracker(name)
+            scan_ms, _ = timeit(lambda: scan(name), args.repeat)
+            tracker.is_running()
+            tracked_ms, running = timeit(tracker.is_running, args.repeat)
+            print(
+                f"{label}: 全量遍历 {scan_ms:.2f}ms, 跟踪器 {tracked_ms:.3f}ms "
+                f"(结果={running}, 遍历次数={tracker.scans})"
+            )
+
+        # kill_all 须结束缓存建立之后才启动的同名进程
+        with tempfile.TemporaryDirectory() as directory:
+            probe = os.path.join(directory, "bh3probe")
+            shutil.copy(shutil.which("sleep"), probe)
+            tracker = ProcessTracker("bh3probe")
+            first = subprocess.Popen([probe, "60"])
+            children.append(first)
+            time.sleep(0.1)
+            tracker.is_running()
+            second = subprocess.Popen([probe, "60"])
+            children.append(second)
+            time.sleep(0.1)
+            tracker.kill_all()
+            survivors = []
+            for proc in (first, second):
+                try:
+                    proc.wait(timeout=2)
+                except subprocess.TimeoutExpired:
+                    survivors.append(proc.pid)
+            print(
+                f"kill_all（其中 1 个进程在缓存之后启动）: 存活 {len(survivors)}/2 个"
+            )
+            if survivors:
+                print("失败: kill_all 遗漏了进程")
+                sys.exit(1)
+    finally:
+        for child in children:
+            child.kill()
+            child.wait()
+
+
+def start_https_stub(directory, delays=None):
+    """
+    在本地启动返回 {"retcode": 0} 的 HTTPS 桩服务器（自签名证书）
+    :param delays: {路径片段: 延迟秒数}，匹配的请求在响应前等待（模拟慢接口）
+    :return: (服务器, 地址, 证书路径)；server.log 记录 (路径, 开始时间, 结束时间)；
+             server.faults 为 {路径: [故障, ...]}，每次请求依次取出一个故障注入：
+             "timeout"（延迟 2 秒再响应）、"503"、"badjson"（返回非 JSON 内容）；
+             server.responses 为 {路径前缀: 响应内容}，未匹配时返回 {"retcode": 0}
+    """
+    import datetime
+    import ipaddress
+    import ssl
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+    from cryptography.x509.oid import NameOID
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(
+            x509.SubjectAlternativeName(
+                [x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]
+            ),
+            critical=False,
+        )
+        .sign(key, hashes.SHA256())
+    )
+    cert_path = os.path.join(directory, "stub.pem")
+    key_path = os.path.join(directory, "stub.key")
+    with open(cert_path, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(
+            key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.TraditionalOpenSSL,
+                serialization.NoEncryption(),
+            )
+        )
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def _reply(self):
+            start = time.monotonic()
+            length = int(self.headers.get("Content-Length", 0))
+            self.rfile.read(length)
+            for fragment, delay in (delays or {}).items():
+                if fragment in self.path:
+                    time.sleep(delay)
+            faults = self.server.faults.get(self.path)
+            fault = faults.pop(0) if faults else None
+            if fault == "timeout":
+                time.sleep(2)
+            body = next(
+                (
+                    content
+                    for prefix, content in self.server.responses.items()
+                    if self.path.startswith(prefix)
+                ),
+                b'{"retcode": 0, "data": {}}',
+            )
+            if fault == "badjson":
+                body = b"<html>bad gateway</html>"
+            self.send_response(503 if fault == "503" else 200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            self.server.log.append((self.path, start, time.monotonic()))
+
+        do_GET = do_POST = _reply
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.log = []
+    server.faults = {}
+    server.responses = {}
+    server.handle_error = lambda request, address: None  # 客户端超时断开属预期情况
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert_path, key_path)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"https://127.0.0.1:{server.server_address[1]}", cert_path
+
+
+async def no_dispatch(oa_token=None):
+    """跳过 OA 服务器查询（http/async 场景只关心扫码请求本身）"""
+    return "{}"
+
+
+def bench_http(args):
+    """HTTP 连接：每次请求新建 Session vs 共享 HttpClient 连接池（本地 HTTPS 桩服务器）"""
+    import asyncio
+    import tempfile
+
+    import requests
+    from bbh3_scan_launch.core.sdk import mihoyosdk
+    from bbh3_scan_launch.utils.http_client import HttpClient
+
+    with tempfile.TemporaryDirectory() as directory:
+        server, base, cert_path = start_https_stub(directory)
+        try:
+            target = base + "/bh3_cn/combo/panda/qrcode/scan"
+
+            def fresh_session():
+                with requests.Session() as session:
+                    return session.post(target, data="{}", verify=cert_path)
+
+            client = HttpClient(verify=cert_path)
+            fresh_ms, _ = timeit(fresh_session, args.repeat)
+            pooled_ms, _ = timeit(lambda: client.post(target, data="{}"), args.repeat)
+            print(f"每次新建 Session: {fresh_ms:.2f}ms/请求（每次请求新建连接）")
+            pooled_stats = client.stats()
+            print(f"共享连接池: {pooled_ms:.2f}ms/请求, 统计: {pooled_stats}")
+            client.close()
+
+            # scanCheck → scanConfirm 应复用同一个连接
+            client = HttpClient(verify=cert_path)
+            mihoyosdk.http_client = client
+            mihoyosdk.apiBase = base
+            mihoyosdk.getOAServer = no_dispatch
+            bh_info = {"data": {"open_id": "1", "combo_id": "1", "combo_token": "x"}}
+            asyncio.run(mihoyosdk.scanCheck(bh_info, "ticket", {}))
+            scan_stats = client.stats()
+            print(f"scanCheck → scanConfirm: {scan_stats}")
+            client.close()
+        finally:
+            server.shutdown()
+
+    # 同一主机的顺序请求应共用一个连接
+    failures = []
+    for label, stats, expected in (
+        ("共享连接池", pooled_stats, args.repeat + 1),  # timeit 额外预热一次
+        ("scanCheck → scanConfirm", scan_stats, 2),
+    ):
+        counts = list(stats.values())
+        if counts != [{"requests": expected, "connections": 1, "reused": expected - 1}]:
+            failures.append(
+                f"{label} 应为 {expected} 个请求共用 1 个连接，实际 {stats}"
+            )
+    if failures:
+        print("失败: " + "；".join(failures))
+        sys.exit(1)
+    print("通过")
+
+
+def bench_async(args):
+    """异步传输：扫码确认接口变慢（桩服务器注入 2 秒延迟）时，监控循环是否继续截图"""
+    import asyncio
+    import tempfile
+
+    from bbh3_scan_launch.core.bh3_utils import BH3GameManager
+    from bbh3_scan_launch.core.sdk import mihoyosdk
+    from bbh3_scan_launch.core.vision import SyntheticFrameSource
+    from bbh3_scan_launch.utils.config_utils import config_manager
+    from bbh3_scan_launch.utils.http_client import HttpClient
+
+    width, height = RESOLUTIONS["720p"]
+    ui_frames = [make_ui_frame(width, height, seed=seed) for seed in range(2)]
+    qr_frame = make_qr_frame(width, height)
+    config = {"auto_clip": True, "sleep_time": 0.1, "min_sleep_time": 0.1}
+    max_gap_ms = 500  # 异步传输时相邻两次截图的最大间隔
+    config_manager.bh_info = {
+        "data": {"open_id": "1", "combo_id": "1", "combo_token": "x"}
+    }
+    mihoyosdk.getOAServer = no_dispatch
+
+    failures = []
+    with tempfile.TemporaryDirectory() as directory:
+        server, base, cert_path = start_https_stub(directory, {"confirm": 2.0})
+        mihoyosdk.apiBase = base
+        try:
+            for label, blocking in (("阻塞传输", True), ("异步传输", False)):
+                client = HttpClient(verify=cert_path)
+                if blocking:
+                    # 模拟改动前的行为：在事件循环线程中直接发送阻塞请求
+                    async def arequest(method, url, client=client, **kwargs):
+                        return client.request(method, url, **kwargs)
+
+                    client.arequest = arequest
+                mihoyosdk.http_client = client
+                server.log.clear()
+                captured_at = []
+
+                def factory(index):
+                    captured_at.append(time.monotonic())
+                    return qr_frame if index >= 3 else ui_frames[index % 2]
+
+                processor = new_image_processor(
+                    frame_source=SyntheticFrameSource(factory, (width, height))
+                )
+                monitor = BH3GameManager().auto_monitor(config, processor, lambda: None)
+                try:
+                    asyncio.run(asyncio.wait_for(monitor, timeout=4.0))
+                except asyncio.TimeoutError:
+                    pass
+                client.close()
+
+                _, start, end = next(
+                    entry for entry in server.log if "confirm" in entry[0]
+                )
+                during = [t for t in captured_at if start <= t <= end]
+                gaps = np.diff(captured_at) * 1000
+                print(
+                    f"{label}: scanConfirm 耗时 {end - start:.1f}s，期间截图 {len(during)} 次，"
+                    f"最大截图间隔 {gaps.max():.0f}ms"
+                )
+                if blocking:
+                    continue
+                # 扫码确认挂起期间监控循环应按轮询间隔继续截图
+                expected = (end - start) / config["sleep_time"] / 2
+                if len(during) < expected:
+                    failures.append(
+                        f"scanConfirm 期间仅截图 {len(during)} 次（应不少于 {expected:.0f} 次）"
+                    )
+                if gaps.max() > max_gap_ms:
+                    failures.append(
+                        f"最大截图间隔 {gaps.max():.0f}ms 超过 {max_gap_ms}ms"
+                    )
+        finally:
+            server.shutdown()
+    if failures:
+        print("失败: " + "；".join(failures))
+        sys.exit(1)
+    print("通过")
+
+
+def bench_retry(args):
+    """重试策略：向故障注入桩服务器发送请求，验证超时、5xx 与格式错误时的重试行为"""
+    import tempfile
+
+    from bbh3_scan_launch.utils.http_client import NO_RETRY, HttpClient, RetryPolicy
+
+    ok = {"retcode": 0, "data": {}}
+    # (说明, 方法, 注入的故障序列, 是否解析 JSON, 本次请求的重试策略, 预期尝试次数, 预期结果)
+    cases = [
+        ("GET 读取超时一次", "GET", ["timeout"], True, None, 2, ok),
+        ("GET 连续两次 503", "GET", ["503", "503"], True, None, 3, ok),
+        ("GET 返回非 JSON", "GET", ["badjson"], True, None, 2, ok),
+        ("GET 持续 503", "GET", ["503"] * 3, False, None, 3, "HTTP 503"),
+        ("POST 503（非幂等不重试）", "POST", ["503"], False, None, 1, "HTTP 503"),
+        (
+            "POST 读取超时（非幂等不重试）",
+            "POST",
+            ["timeout"],
+            True,
+            None,
+            1,
+            "ReadTimeout",
+        ),
+        # 更新源请求（NetworkManager.fetch_from_source）失败时立即回退到下一个源
+        (
+            "GET 读取超时（NO_RETRY）",
+            "GET",
+            ["timeout"],
+            True,
+            NO_RETRY,
+            1,
+            "ReadTimeout",
+        ),
+    ]
+    failures = []
+    policy = RetryPolicy(max_attempts=3, timeout=(1, 0.5), backoff=0.05)
+    with tempfile.TemporaryDirectory() as directory:
+        server, base, cert_path = start_https_stub(directory)
+        client = HttpClient(retry_policy=policy, verify=cert_path)
+        try:
+            for index, case in enumerate(cases):
+                label, method, faults, parse_json, retry_policy = case[:5]
+                expected_attempts, expected_outcome = case[5:]
+                path = f"/case{index}"
+                server.faults[path] = list(faults)
+                try:
+                    result = client.request(
+                        method,
+                        base + path,
+                        parse=(lambda res: res.json()) if parse_json else None,
+                        retry_policy=retry_policy,
+                        timeout=policy.timeout,
+                    )
+                    outcome = result if parse_json else f"HTTP {result.status_code}"
+                except Exception as e:
+                    outcome = f"{type(e).__name__}"
+                stats = client.endpoint_stats()[f"{method} {base[8:]}{path}"]
+                print(
+                    f"{label:<24} 重试 {stats['retries']} 次，失败 {stats['failures']}，"
+                    f"耗时 {stats['max_ms']:.0f}ms -> {outcome}"
+                )
+                attempts = stats["retries"] + 1
+                if attempts != expected_attempts or outcome != expected_outcome:
+                    failures.append(
+                        f"{label}: 尝试 {attempts} 次 -> {outcome}，"
+                        f"预期 {expected_attempts} 次 -> {expected_outcome}"
+                    )
+        finally:
+            client.close()
+            server.shutdown()
+    if failures:
+        print("失败: " + "；".join(failures))
+        sys.exit(1)
+    print("通过")
+
+
+def bench_cache(args):
+    """接口缓存：冷启动 / 热缓存 / 过期（后台刷新）/ 失效 / 条目损坏后获取版本号与 OA 分发信息的耗时"""
+    import asyncio
+    import json
+    import tempfile
+
+    from bbh3_scan_launch.core.sdk import mihoyosdk
+    from bbh3_scan_launch.utils.cache_utils import PersistentCache
+    from bbh3_scan_launch.utils.http_client import HttpClient
+
+    with tempfile.TemporaryDirectory() as directory:
+        # 模拟远程接口各 300ms 的往返延迟
+        server, base, cert_path = start_https_stub(
+            directory, {"hi3_version": 0.3, "query_gameserver": 0.3}
+        )
+        server.responses = {
+            "/v4/hi3_version": b'{"version": "99.0.0"}',
+            "/query_gameserver": b'{"retcode": 0, "dispatch": "' + b"x" * 200 + b'"}',
+        }
+        mihoyosdk.http_client = HttpClient(verify=cert_path)
+        mihoyosdk.versionApi = base + "/v4/hi3_version"
+        mihoyosdk.oaServerApi = base + "/query_gameserver?"
+        cache_path = os.path.join(directory, "cache.json")
+        clock = [time.time()]
+
+        def startup(label):
+            # 每次使用新的缓存实例，模拟进程重启后从磁盘加载
+            cache = PersistentCache(cache_path, clock=lambda: clock[0])
+            mihoyosdk.api_cache = cache
+            start = time.perf_counter()
+
+            dispatch = asyncio.run(mihoyosdk.getOAServer())
+            elapsed = (time.perf_counter() - start) * 1000
+            print(
+                f"{label:<10} {elapsed:>7.0f}ms  dispatch长度={len(dispatch)}  "
+                f"{cache.stats()}"
+            )
+            return cache.stats()
+
+        def corrupt(key):
+            with open(cache_path, encoding="utf-8") as f:
+                entries = json.load(f)
+            entries[key] = {"value": entries[key]["value"]}  # 缺少写入时间
+            with open(cache_path, "w", encoding="utf-8") as f:
+                json.dump(entries, f)
+
+        ttl = max(mihoyosdk.BH_VER_TTL, mihoyosdk.DISPATCH_TTL) + 1
+        # (说明, 启动前的操作, 预期命中统计)；每次启动查询版本号与分发信息两个条目
+        steps = [
+            ("冷启动", None, (0, 0, 2)),
+            ("热缓存", None, (2, 0, 0)),
+            ("已过期", lambda: clock.__setitem__(0, clock[0] + ttl), (0, 2, 0)),
+            # 过期时的后台刷新应在本次启动内完成并落盘
+            ("刷新后", None, (2, 0, 0)),
+            ("失效后", mihoyosdk.invalidateVersionCache, (0, 0, 2)),
+            ("条目损坏", lambda: corrupt("hi3_version"), (1, 0, 1)),
+        ]
+        failures = []
+        try:
+            for label, before, expected in steps:
+                if before:
+                    before()
+                stats = startup(label)
+                counts = (stats["hits"], stats["stale_hits"], stats["misses"])
+                if counts != expected:
+                    failures.append(
+                        f"{label}: 命中/过期命中/未命中 {counts}，预期 {expected}"
+                    )
+        finally:
+            server.shutdown()
+    if failures:
+        print("失败: " + "；".join(failures))
+        sys.exit(1)
+    print("通过")
+
+
+def sign_cases():
+    """
+    sign 场景的黄金用例：(名称, 参考实现, 预编译模板)，两者返回的请求体应逐字节一致。
+    字段值包含空格、URL 保留字符、& 与非 ASCII 字符
+    """
+    import json
+
+    from bbh3_scan_launch.core.sdk import bsgamesdk as bili
+    from bbh3_scan_launch.core.sdk import mihoyosdk as mhy
+
+    def form_case(template, request, **values):
+        def reference():
+            data = json.loads(template)
+            for key, value in values.items():
+                data[key] = value
+            return bili.setSign(data)
+
+        return reference, lambda: request.build(**values)
+
+    def json_case(template, request, **values):
+        def reference():
+            data = json.loads(template)
+            for key, value in values.items():
+                data[key] = value
+            return json.dumps(mhy.makeSign(data)).replace(" ", "")
+
+        return reference, lambda: request.build(**values)
+
+    login = dict(
+        access_key="",
+        gt_user_id="fac83ce4 326d",
+        uid="",
+        challenge="c&h=1",
+        user_id="user@example.com",
+        validate="验证 码",
+        seccode="验证 码|jordan",
+        pwd="a+b/c=d ef==",
+    )
+    raw = json.dumps(
+        {"open_id": "42", "combo_token": "tok en", "asterisk_name": "崩坏3"}
+    )
+    payload = {"raw": raw, "proto": "Combo", "ext": json.dumps({"data": {"x": " "}})}
+    cases = [
+        (
+            "user.info",
+            *form_case(
+                bili.userinfoParam, bili.userinfoRequest, uid=42, access_key="ak &k"
+            ),
+        ),
+        ("rsa", *form_case(bili.rsaParam, bili.rsaRequest)),
+        ("captcha", *form_case(bili.captchaParam, bili.captchaRequest)),
+        ("login", *form_case(bili.loginParam, bili.loginRequest, **login)),
+        (
+            "verify",
+            *json_case(
+                mhy.verifyBody,
+                mhy.verifyRequest,
+                data=json.dumps({"uid": 42, "access_key": "a k"}),
+            ),
+        ),
+        (
+            "qrcode/scan",
+            *json_case(
+                mhy.scanCheckR, mhy.scanCheckRequest, ticket="abc def", ts=1700000000
+            ),
+        ),
+        (
+            "qrcode/confirm",
+            *json_case(
+                mhy.scanResultR,
+                mhy.scanResultRequest,
+                payload=payload,
+                ts=1700000000,
+                ticket="t&t",
+            ),
+        ),
+    ]
+    return cases
+
+
+def bench_sign(args):
+    """请求签名：每次解析模板 + setSign/makeSign vs 预编译请求模板（先校验输出逐字节一致）"""
+    from unittest import mock
+
+    cases = sign_cases()
+    with mock.patch("time.time", return_value=1700000000.5):
+        mismatches = [
+            name for name, reference, build in cases if reference() != build()
+        ]
+    if mismatches:
+        print(f"输出不一致: {', '.join(mismatches)}")
+        sys.exit(1)
+    print(f"黄金校验通过: {len(cases)} 个请求的输出逐字节一致")
+
+    repeat = args.repeat * 2000
+    print(f"{'请求':<16} {'参考实现':>10} {'预编译模板':>10} {'加速比':>8}")
+    for name, reference, build in cases:
+        reference_ms, _ = timeit(reference, repeat)
+        build_ms, _ = timeit(build, repeat)
+        print(
+            f"{name:<16} {reference_ms * 1000:>8.1f}µs {build_ms * 1000:>8.1f}µs "
+            f"{reference_ms / build_ms:>7.1f}x"
+        )
+
+
+def bench_rsa(args):
+    """RSA 公钥：每次登录都获取并解析公钥 vs 复用缓存的公钥（桩服务器统计 /api/client/rsa 请求数）"""
+    import asyncio
+    import json
+    import tempfile
+
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    from bbh3_scan_launch.core.sdk import bsgamesdk
+    from bbh3_scan_launch.utils import rsacr
+    from bbh3_scan_launch.utils.http_client import HttpClient
+
+    pem = (
+        rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        .public_key()
+        .public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+        .decode()
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        server, base, cert_path = start_https_stub(directory)
+        server.responses = {
+            "/api/client/rsa": json.dumps({"hash": "salt", "rsa_key": pem}).encode(),
+            "/api/client/login": b'{"uid": 42, "access_key": "key"}',
+        }
+        bsgamesdk.http_client = HttpClient(verify=cert_path)
+        bsgamesdk.bililogin = base + "/"
+
+        async def session():
+            # 首次登录需要验证码 → 验证码重试 → 缓存账号失效后重新登录
+            await bsgamesdk.login1("user", "password")
+            await bsgamesdk.login2("user", "password", "challenge", "gt", "validate")
+            await bsgamesdk.login1("user", "password")
+
+        def rsa_requests():
+            return sum(1 for path, *_ in server.log if path == "/api/client/rsa")
+
+        failures = []
+        try:
+            for label, ttl in (("不缓存", 0), ("缓存公钥", bsgamesdk.RSA_KEY_TTL)):
+                bsgamesdk.RSA_KEY_TTL = ttl
+                bsgamesdk.invalidateRsaKey()
+                server.log.clear()
+                start = time.perf_counter()
+                asyncio.run(session())
+                elapsed = (time.perf_counter() - start) * 1000
+                hits = rsa_requests()
+                print(
+                    f"{label:<8} 3 次登录 {elapsed:>6.1f}ms  /api/client/rsa 请求 {hits} 次"
+                )
+            # 有效期内的多次登录只获取一次公钥；公钥失效后重新获取一次
+            if hits != 1:
+                failures.append(f"有效期内 3 次登录请求公钥 {hits} 次，应为 1 次")
+            bsgamesdk.invalidateRsaKey()
+            server.log.clear()
+            asyncio.run(session())
+            hits = rsa_requests()
+            print(f"invalidateRsaKey 后 3 次登录 /api/client/rsa 请求 {hits} 次")
+            if hits != 1:
+                failures.append(f"公钥失效后 3 次登录请求公钥 {hits} 次，应为 1 次")
+        finally:
+            server.shutdown()
+
+    def parse_every_time():
+        rsacr.load_public_key.cache_clear()
+        return rsacr.rsacreate("salt" + "password", pem)
+
+    repeat = args.repeat * 20
+    parse_ms, _ = timeit(parse_every_time, repeat)
+    cached_ms, _ = timeit(lambda: rsacr.rsacreate("salt" + "password", pem), repeat)
+    print(f"单次加密: 每次解析公钥 {parse_ms:.3f}ms  复用公钥对象 {cached_ms:.3f}ms")
+    if failures:
+        print("失败: " + "；".join(failures))
+        sys.exit(1)
+    print("通过")
+
+
+class QtStubSignal:
+    """PySide6 Signal 的桩：每个实例各自保存已连接的槽，emit 时直接调用"""
+
+    def __init__(self, *types):
+        self.slots = []
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return instance.__dict__.setdefault(self.name, QtStubSignal())
+
+    def connect(self, slot):
+        self.slots.append(slot)
+
+    def emit(self, *args):
+        for slot in self.slots:
+            slot(*args)
+
+
+def import_main_module():
+    """导入 bbh3_scan_launch.main；未安装 PySide6 时以桩模块代替（只运行登录流程，不创建窗口）"""
+    import types
+
+    try:
+        import PySide6.QtCore  # noqa: F401
+    except ImportError:
+
+        class QtStubModule(types.ModuleType):
+            def __getattr__(self, name):
+                if name.startswith("__"):
+                    raise AttributeError(name)
+                value = (
+                    QtStubSignal
+                    if name == "Signal"
+                    else type(name, (), {"__init__": lambda self, *a, **k: None})
+                )
+                setattr(self, name, value)
+                return value
+
+        for name in ("PySide6", "PySide6.QtCore", "PySide6.QtGui", "PySide6.QtWidgets"):
+            sys.modules[name] = QtStubModule(name)
+    import bbh3_scan_launch.main as main_module
+
+    return main_module
+
+
+def bench_session(args):
+    """
+    已验证会话：运行 LoginThread.login（桩服务器代替B站与米哈游接口），
+    比较首次启动（验证账号）与重启（使用缓存的会话）到扫码就绪（login_complete）的耗时。
+    米哈游接口主机模拟为不可达（只接受 TCP 连接不响应），连接预热不应拖慢登录
+    """
+    import asyncio
+    import socket
+    import tempfile
+
+    main_module = import_main_module()
+    from bbh3_scan_launch.core.sdk import bsgamesdk, mihoyosdk
+    from bbh3_scan_launch.utils.cache_utils import PersistentCache
+    from bbh3_scan_launch.utils.http_client import HttpClient
+
+    config_manager = main_module.config_manager
+    config_manager.write_conf = lambda config: None  # 不写入 config/config.json
+    bh_ver = max(main_module.version_manager.oa_versions)
+    # 只接受连接、从不响应的主机（TLS 握手在读取超时后失败）
+    silent = socket.socket()
+    silent.bind(("127.0.0.1", 0))
+    silent.listen(8)
+
+    with tempfile.TemporaryDirectory() as directory:
+        # 模拟B站与米哈游接口各 300ms 的往返延迟
+        server, base, cert_path = start_https_stub(
+            directory,
+            {"user.info": 0.3, "granter/login": 0.3, "hi3_version": 0.3},
+        )
+        server.responses = {
+            "/api/client/user.info": b'{"uname": "user"}',
+            "/bh3_cn/combo/granter/login": b'{"retcode": 0, "data": '
+            b'{"combo_id": "1", "open_id": "42", "combo_token": "token"}}',
+            "/v4/hi3_version": f'{{"version": "{bh_ver}"}}'.encode(),
+            "/query_gameserver": b'{"retcode": 0, "dispatch": "' + b"x" * 200 + b'"}',
+        }
+        bsgamesdk.http_client = mihoyosdk.http_client = HttpClient(verify=cert_path)
+        bsgamesdk.bililogin = base + "/"
+        mihoyosdk.url = base + "/bh3_cn/combo/granter/login/v2/login"
+        mihoyosdk.versionApi = base + "/v4/hi3_version"
+        mihoyosdk.oaServerApi = base + "/query_gameserver?"
+        mihoyosdk.apiBase = f"https://127.0.0.1:{silent.getsockname()[1]}"
+        cache_path = os.path.join(directory, "cache.json")
+
+        def startup():
+            thread = main_module.LoginThread()
+            results = []
+            start = time.perf_counter()
+            thread.login_complete.connect(
+                lambda success: results.append((success, time.perf_counter()))
+            )
+
+            async def run():
+                await thread.login()
+                return time.perf_counter()
+
+            done = asyncio.run(run())
+            if not results:
+                print("失败: login_complete 未发出")
+                sys.exit(1)
+            success, ready = results[0]
+            return success, (ready - start) * 1000, (done - start) * 1000
+
+        failures = []
+        try:
+            for label in ("首次启动", "重启"):
+                config_manager.config = {
+                    "last_login_succ": True,
+                    "uid": 42,
+                    "access_key": "key",
+                    "uname": "user",
+                    "account": "",
+                    "password": "",
+                    "account_login": False,
+                }
+                # 每次使用新的缓存实例，模拟进程重启后从磁盘加载
+                mihoyosdk.api_cache = PersistentCache(cache_path)
+                success, ready_ms, total_ms = startup()
+                token = config_manager.bh_info["data"]["combo_token"]
+                print(
+                    f"{label:<8} 扫码就绪 {ready_ms:>6.0f}ms  含后台验证 {total_ms:>6.0f}ms  "
+                    f"login_complete={success} combo_token={token}"
+                )
+                if not success:
+                    failures.append(f"{label}登录失败")
+                # 重启时不应等待任何网络请求（账号验证与预取均不在关键路径上）
+                if label == "重启" and ready_ms > 100:
+                    failures.append(f"重启后扫码就绪耗时 {ready_ms:.0f}ms")
+        finally:
+            server.shutdown()
+            silent.close()
+        if failures:
+            print("失败: " + "；".join(failures))
+            sys.exit(1)
+        print("通过")
+
+
+def bench_dedup(args):
+    """票据去重：二维码停留在画面中且同时出现在剪贴板时，不去重 vs TicketGate 的扫码请求次数"""
+    import asyncio
+    import tempfile
+
+    from bbh3_scan_launch.core.bh3_utils import BH3GameManager
+    from bbh3_scan_launch.core.sdk import mihoyosdk
+    from bbh3_scan_launch.core.ticket_gate import TicketGate
+    from bbh3_scan_launch.core.vision import SyntheticFrameSource
+    from bbh3_scan_launch.utils.config_utils import config_manager
+    from bbh3_scan_launch.utils.http_client import HttpClient
+
+    width, height = RESOLUTIONS["720p"]
+    ui_frames = [make_ui_frame(width, height, seed=seed) for seed in range(2)]
+    # 回放序列：登录界面 3 帧后二维码一直停留在画面中，噪声不同使每帧都通过变化检测
+    qr_frames = [make_qr_frame(width, height, seed=seed) for seed in range(2)]
+    config = {
+        "auto_clip": True,
+        "account_login": True,
+        "sleep_time": 0.1,
+        "min_sleep_time": 0.1,
+    }
+    config_manager.bh_info = {
+        "data": {"open_id": "1", "combo_id": "1", "combo_token": "x"}
+    }
+    mihoyosdk.getOAServer = no_dispatch
+
+    failures = []
+    with tempfile.TemporaryDirectory() as directory:
+        server, base, cert_path = start_https_stub(directory, {"qrcode": 0.1})
+        mihoyosdk.apiBase = base
+        mihoyosdk.http_client = HttpClient(verify=cert_path)
+        try:
+            for label, ttl in (("不去重", 0.0), ("TicketGate", TicketGate().ttl)):
+                server.log.clear()
+
+                def factory(index):
+                    return qr_frames[index % 2] if index >= 3 else ui_frames[index % 2]
+
+                processor = new_image_processor(
+                    frame_source=SyntheticFrameSource(factory, (width, height))
+                )
+                processor.ticket_gate = TicketGate(ttl=ttl)
+                # 第 10 次检查剪贴板时出现同一张二维码的截图
+                polls = iter(range(1000))
+                ticket = processor.extract_ticket(qr_frames[0])
+                processor.poll_clipboard_ticket = lambda: (
+                    ticket if next(polls) == 10 else None
+                )
+                monitor = BH3GameManager().auto_monitor(config, processor, lambda: None)
+                try:
+                    asyncio.run(asyncio.wait_for(monitor, timeout=3.0))
+                except asyncio.TimeoutError:
+                    pass
+                scans = sum(1 for path, *_ in server.log if path.endswith("/scan"))
+                stats = processor.ticket_gate.stats()
+                print(f"{label:<12} 3 秒内 qrcode/scan 请求 {scans} 次  {stats}")
+            # 同一票据先后来自游戏画面与剪贴板，有效期内只应提交一次
+            clipboard_polls = next(polls)
+            if ticket is None or clipboard_polls <= 10:
+                failures.append("剪贴板未提供同一票据，场景无效")
+            if scans != 1 or stats["suppressed"] == 0:
+                failures.append(f"TicketGate 下 qrcode/scan 请求 {scans} 次，应为 1 次")
+        finally:
+            server.shutdown()
+    if failures:
+        print("失败: " + "；".join(failures))
+        sys.exit(1)
+    print("通过")
+
+
+def bench_templates(args):
+    """模板加载：启动时串行缩放（改动前）vs 首次使用时并行加载（冷启动 / 读取 .npy 缓存）"""
+    import tempfile
+
+    from bbh3_scan_launch.core.template_store import TemplateStore
+    from bbh3_scan_launch.core.vision import SyntheticFrameSource
+
+    width, height = RESOLUTIONS[args.resolution]
+    source = SyntheticFrameSource(
+        lambda index: make_synthetic_frame(width, height), (width, height)
+    )
+    reference = load_scaled_templates(height)
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"分辨率 {width}x{height}，模板 {len(reference)} 个")
+        for label, workers, cache_dir in (
+            ("串行无缓存（改动前）", 1, None),
+            ("并行无缓存", 4, None),
+            ("并行冷启动", 4, directory),
+            ("并行热启动", 4, directory),
+        ):
+            start = time.perf_counter()
+            processor = new_image_processor(frame_source=source)
+            processor.template_store = TemplateStore(
+                TEMPLATE_PICTURES_DIR, cache_dir=cache_dir, max_workers=workers
+            )
+            init_ms = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            processor.ensure_templates()
+            load_ms = (time.perf_counter() - start) * 1000
+            identical = all(
+                np.array_equal(
+                    processor.template_matcher.templates[name].array,
+                    np.asarray(image),
+                )
+                for name, image in reference.items()
+            )
+            print(
+                f"{label:<14} 构造 {init_ms:>5.1f}ms  加载 {load_ms:>6.1f}ms  "
+                f"{processor.template_store.stats()}  与参考结果一致: {identical}"
+            )
+
+
+# startup 场景在子进程中执行的探针：以桩模块代替 PySide6 与 pyzbar（无需图形界面与 zbar 库），
+# 计时导入主模块，并检查视觉、网络与 Flask 模块是否被推迟导入
+STARTUP_PROBE = """
+import json, sys, time, types
+
+class Stub(types.ModuleType):
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        value = type(name, (), {"__init__": lambda self, *args, **kwargs: None})
+        setattr(self, name, value)
+        return value
+
+for name in ("PySide6", "PySide6.QtCore", "PySide6.QtGui", "PySide6.QtWidgets",
+             "pyzbar", "pyzbar.pyzbar"):
+    sys.modules[name] = Stub(name)
+sys.path.insert(0, "src")
+
+start = time.perf_counter()
+import bbh3_scan_launch.main
+import_ms = (time.perf_counter() - start) * 1000
+loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+
+start = time.perf_counter()
+for name in HEAVY_MODULES:
+    __import__(name)
+deferred_ms = (time.perf_counter() - start) * 1000
+print(json.dumps({"import_ms": import_ms, "deferred_ms": deferred_ms, "loaded": loaded}))
+"""
+# 主模块导入时不应加载的模块（首次使用时才导入）
+STARTUP_HEAVY_MODULES = [
+    "flask",
+    "cv2",
+    "numpy",
+    "requests",
+    "cryptography",
+    "bbh3_scan_launch.core.bh3_utils",
+    "bbh3_scan_launch.core.sdk.bsgamesdk",
+    "bbh3_scan_launch.core.sdk.mihoyosdk",
+]
+
+
+def bench_startup(args):
+    """启动导入预算：导入 bbh3_scan_launch.main 的耗时（子进程，图形界面桩模块）超出预算或提前加载重型模块时失败"""
+    import json
+    import subprocess
+
+    probe = f"HEAVY_MODULES = {STARTUP_HEAVY_MODULES!r}\n" + STARTUP_PROBE
+    results = []
+    for _ in range(args.repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", probe],
+            cwd=project_root,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    import_ms = float(np.median([result["import_ms"] for result in results]))
+    deferred_ms = float(np.median([result["deferred_ms"] for result in results]))
+    loaded = sorted({name for result in results for name in result["loaded"]})
+
+    print(
+        f"导入 bbh3_scan_launch.main: p50 {import_ms:.1f}ms（预算 {args.budget_ms:.0f}ms）"
+    )
+    print(f"推迟到首次使用的模块导入耗时: p50 {deferred_ms:.1f}ms")
+    failures = []
+    if import_ms > args.budget_ms:
+        failures.append(f"导入耗时超出预算 {import_ms - args.budget_ms:.1f}ms")
+    if loaded:
+        failures.append(f"导入主模块时提前加载了: {', '.join(loaded)}")
+    if failures:
+        print("失败: " + "；".join(failures))
+        sys.exit(1)
+    print("通过")
+
+
+# schedule 场景的脚本化时间线：(开始秒, 结束秒, 游戏窗口存在, 登录界面)
+SCHEDULE_TIMELINE = [
+    (0, 300, False, False),
+    (300, 360, True, False),
+    (360, 380, True, True),
+    (380, 480, True, False),
+]
+# (事件名, 发生时刻)：二维码出现在登录界面阶段，剪贴板变化发生在空闲阶段
+SCHEDULE_EVENTS = [("二维码出现", 373.3), ("剪贴板变化", 420.6)]
+# 单次轮询的估算 CPU 耗时（毫秒）：游戏窗口存在时含截图与匹配，否则仅窗口查找
+TICK_COST_MS = {True: 40.0, False: 1.0}
+# 自适应调度的验收条件：游戏未运行阶段的 CPU 至多为固定间隔的该比例；
+# 登录界面与突发轮询以额外截图换取识别延迟，总 CPU 至多比固定间隔高出该比例
+SCHEDULE_IDLE_RATIO = 0.5
+SCHEDULE_OVERHEAD_RATIO = 0.10
+
+
+def simulate_schedule(next_interval):
+    """
+    按 SCHEDULE_TIMELINE 模拟自动监控循环
+    :param next_interval: 接收 (game_present, login_screen, clipboard_changed) 返回间隔的函数
+    :return: (轮询次数, {游戏窗口是否存在: 估算 CPU 耗时毫秒}, {事件名: 检测延迟秒})
+    """
+    end = SCHEDULE_TIMELINE[-1][1]
+    now, ticks = 0.0, 0
+    cpu_ms = {True: 0.0, False: 0.0}
+    latency = {}
+    last_tick = 0.0
+    while now < end:
+        game_present, login_screen = next(
+            (present, login)
+            for start, stop, present, login in SCHEDULE_TIMELINE
+            if start <= now < stop
+        )
+        ticks += 1
+        cpu_ms[game_present] += TICK_COST_MS[game_present]
+        clipboard_changed = False
+        for name, at in SCHEDULE_EVENTS:
+            if name not in latency and at <= now:
+                latency[name] = now - at
+                clipboard_changed = clipboard_changed or name == "剪贴板变化"
+        last_tick = now
+        now += next_interval(game_present, login_screen, clipboard_changed)
+    for name, at in SCHEDULE_EVENTS:
+        latency.setdefault(name, max(0.0, last_tick - at))
+    return ticks, cpu_ms, latency
+
+
+def bench_schedule(args):
+    """轮询调度：固定 sleep_time 间隔 vs PollScheduler 自适应间隔（模拟时间线）"""
+    from bbh3_scan_launch.core.scheduler import PollScheduler
+
+    scheduler = PollScheduler()
+    strategies = {
+        "固定1s": lambda *state: 1.0,
+        "自适应": lambda *state: scheduler.next_interval(*state),
+    }
+    names = [name for name, _ in SCHEDULE_EVENTS]
+    print(
+        f"{'策略':<8}{'轮询次数':>8}{'未运行CPU(ms)':>14}{'总CPU(ms)':>12}"
+        + "".join(f"{name + '延迟(s)':>14}" for name in names)
+    )
+    results = {}
+    for label, next_interval in strategies.items():
+        ticks, cpu_ms, latency = simulate_schedule(next_interval)
+        results[label] = (cpu_ms[False], sum(cpu_ms.values()), latency)
+        print(
+            f"{label:<8}{ticks:>10}{cpu_ms[False]:>16.0f}{sum(cpu_ms.values()):>13.0f}"
+            + "".join(f"{latency[name]:>16.2f}" for name in names)
+        )
+
+    fixed_idle, fixed_total, fixed_latency = results["固定1s"]
+    idle, total, latency = results["自适应"]
+    print(
+        f"自适应：游戏未运行阶段 CPU {idle / fixed_idle - 1:+.0%}，"
+        f"总 CPU {total / fixed_total - 1:+.0%}（上限 {SCHEDULE_OVERHEAD_RATIO:+.0%}）"
+    )
+    failures = []
+    if idle > fixed_idle * SCHEDULE_IDLE_RATIO:
+        failures.append("游戏未运行阶段的 CPU 未减半")
+    if total > fixed_total * (1 + SCHEDULE_OVERHEAD_RATIO):
+        failures.append("总 CPU 开销超出上限")
+    if any(latency[name] > fixed_latency[name] for name in names):
+        failures.append("识别延迟高于固定间隔")
+    if failures:
+        print("失败: " + "；".join(failures))
+        sys.exit(1)
+    print("通过")
+
+
+SCENARIOS = {
+    "match": bench_match,
+    "batch": bench_batch,
+    "roi": bench_roi,
+    "skip": bench_skip,
+    "capture": bench_capture,
+    "replay": bench_replay,
+    "gray": bench_gray,
+    "qr": bench_qr,
+    "clipboard": bench_clipboard,
+    "schedule": bench_schedule,
+    "pipeline": bench_pipeline,
+    "window": bench_window,
+    "process": bench_process,
+    "http": bench_http,
+    "async": bench_async,
+    "retry": bench_retry,
+    "cache": bench_cache,
+    "sign": bench_sign,
+    "rsa": bench_rsa,
+    "session": bench_session,
+    "dedup": bench_dedup,
+    "templates": bench_templates,
+    "startup": bench_startup,
+}
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="BBH3ScanLaunch 性能基准测试")
+    parser.add_argument("scenario", choices=SCENARIOS.keys(), help="基准测试场景")
+    parser.add_argument("--repeat", type=int, default=5, help="每项重复次数")
+    parser.add_argument("--frames-dir", help="replay 场景：回放的截图目录")
+    parser.add_argument(
+        "--resolution",
+        choices=RESOLUTIONS.keys(),
+        default="1440p",
+        help="replay/pipeline 场景：合成帧的分辨率",
+    )
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=250.0,
+        help="startup 场景：导入主模块的耗时预算（毫秒）",
+    )
+    args = parser.parse_args()
+    SCENARIOS[args.scenario](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -20,9 +20,11 @@ UPDATES_DIR = "updates"
 RESOURCES_DIR = "resources"
 PICTURES_TO_MATCH_DIR = "pictures_to_match"
 TEMPLATES_DIR = "templates"
+TEMPLATE_CACHE_DIR = "template_cache"
 
 # 文件名常量
 CONFIG_FILE = "config.json"
+CACHE_FILE = "cache.json"
 VERSION_FILE = "version.json"
 CHANGELOG_FILE = "CHANGELOG.md"
 
@@ -45,6 +47,12 @@ TEMPLATE_WEB_DIR = os.path.join(RESOURCES_DIR_PATH, TEMPLATES_DIR)
 # 配置文件路径
 CONFIG_FILE_PATH = os.path.join(CONFIG_DIR_PATH, CONFIG_FILE)
 
+# 接口缓存文件路径
+CACHE_FILE_PATH = os.path.join(CONFIG_DIR_PATH, CACHE_FILE)
+
+# 缩放模板缓存目录
+TEMPLATE_CACHE_DIR_PATH = os.path.join(CONFIG_DIR_PATH, TEMPLATE_CACHE_DIR)
+
 # 版本文件路径
 VERSION_FILE_PATH = os.path.join(UPDATES_DIR_PATH, VERSION_FILE)
 
@@ -1,21 +1,41 @@
 # -*- coding: utf-8 -*-
 import os
-import re
+import threading
 import time
-import numpy as np
 import logging
-import psutil
 import ctypes
-from cv2 import matchTemplate, TM_CCOEFF_NORMED, minMaxLoc
-from ctypes import windll
-from PIL import Image, ImageGrab
-import pyautogui
-from pyzbar.pyzbar import decode
-import win32con
-import win32gui
-import win32ui
+import numpy as np
+from pyzbar.pyzbar import ZBarSymbol, decode
+from .pipeline import FramePipeline
+from .process_tracker import ProcessTracker
+from .scheduler import PollScheduler
+from .template_store import TemplateStore, source_resolution
 from .sdk import mihoyosdk
-from ..constants import GAME_WINDOW_TITLE, TEMPLATE_PICTURES_DIR
+from .ticket_gate import TicketGate
+from .window_watcher import WindowWatcher
+from .vision import (
+    Frame,
+    FrameChangeDetector,
+    FrameSource,
+    QRLocator,
+    TemplateMatcher,
+    to_gray_array,
+)
+
+try:
+    from ctypes import windll
+    import win32con
+    import win32gui
+    import win32ui
+except ImportError:
+    # 非 Windows 环境（如 CI 上的无头基准测试）：仅可使用文件/合成帧来源
+    windll = win32con = win32gui = win32ui = None
+from ..constants import (
+    GAME_WINDOW_TITLE,
+    TEMPLATE_CACHE_DIR_PATH,
+    TEMPLATE_PICTURES_DIR,
+)
+from ..utils.clipboard_utils import ClipboardWatcher
 from ..utils.exception_utils import handle_exceptions
 
 # 常量定义（已移至constants.py）
@@ -23,29 +43,22 @@ TEMPLATE_DIR = TEMPLATE_PICTURES_DIR  # 向后兼容
 
 
 # 进程检测相关方法
+# 崩坏3进程跟踪器：缓存 PID，避免每次检测都遍历全部进程
+bh3_process = ProcessTracker("bh3.exe")
+
+
 def is_bh3_running():
     """
     检查 BH3.exe 是否正在运行
     """
-    for proc in psutil.process_iter(["name"]):
-        try:
-            if proc.info["name"] and proc.info["name"].lower() == "bh3.exe":
-                return True
-        except Exception:
-            continue
-    return False
+    return bh3_process.is_running()
 
 
 def kill_bh3():
     """
     结束所有 BH3.exe 进程
     """
-    for proc in psutil.process_iter(["name"]):
-        try:
-            if proc.info["name"] and proc.info["name"].lower() == "bh3.exe":
-                proc.kill()
-        except Exception:
-            continue
+    bh3_process.kill_all()
 
 
 def start_bh3(game_path):
@@ -54,6 +67,7 @@ def start_bh3(game_path):
     """
     if not is_bh3_running():
         os.startfile(game_path)
+        bh3_process.invalidate()
         return True
     return False
 
@@ -96,6 +110,7 @@ class BH3GameManager:
             return False
         if not self.is_bh3_running():
             os.startfile(self.game_path)
+            bh3_process.invalidate()
             logging.info("崩坏3已启动")
             return True
         logging.info("崩坏3已在运行，无需重复启动")
@@ -171,26 +186,53 @@ class BH3GameManager:
         import ctypes
         from ..utils.config_utils import config_manager
 
-        while True:
-            try:
-                # 处理自动点击
-                if config.get("auto_click") and self._is_admin():
-                    image_processor.match_and_click()
-                elif config.get("auto_click") and not self._is_admin():
-                    logging.debug("没有管理员权限，跳过图形识别和点击")
-
-                # 处理自动截屏
-                if config.get("auto_clip"):
-                    screenshot = image_processor.capture_screen()
-                    if screenshot:
-                        from ..utils.config_utils import config_manager
-
-                        qr_parsed = await image_processor.parse_qr_code(
-                            image_source="game_window",
-                            config=config,
-                            bh_info=config_manager.bh_info,
+        # 自适应轮询：游戏未运行时退避，登录界面/剪贴板变化时加快
+        scheduler = PollScheduler.from_config(config)
+        # 截图与画面分析在线程池中流水线执行，避免阻塞事件循环
+        pipeline = FramePipeline(image_processor)
+        # 扫码验证在后台任务中进行，等待网络期间监控循环继续截图与解析
+        scan_task = None  # (票据来源, 任务)
+        pending_tickets = []  # [(票据来源, 票据)]
+
+        try:
+            while True:
+                try:
+                    # 每个周期只捕获一帧，交给变化检测、模板匹配与二维码解析共用
+                    frame = None
+                    capture_enabled = config.get("auto_click") or config.get(
+                        "auto_clip"
+                    )
+                    if capture_enabled:
+                        frame = await pipeline.capture()
+
+                    auto_click = config.get("auto_click") and self._is_admin()
+                    if config.get("auto_click") and not auto_click:
+                        logging.debug("没有管理员权限，跳过图形识别和点击")
+
+                    # 分析与下一次截图重叠进行；分析繁忙时只保留最新帧
+                    if frame is not None:
+                        pipeline.submit(
+                            frame,
+                            auto_click=auto_click,
+                            auto_clip=bool(config.get("auto_clip")),
                         )
-                        if qr_parsed:
+
+                    # 收集自动截屏识别到的票据
+                    pending_tickets += [
+                        ("game_window", ticket) for ticket in pipeline.tickets()
+                    ]
+
+                    # 处理剪贴板检查：无论是否开启自动截图，只要已登录就尝试从剪贴板识别二维码
+                    if config.get("account_login", False):
+                        ticket = await pipeline.poll_clipboard()
+                        if ticket:
+                            pending_tickets.append(("clipboard", ticket))
+
+                    # 处理已完成的扫码验证
+                    if scan_task is not None and scan_task[1].done():
+                        source, task = scan_task
+                        scan_task = None
+                        if task.result() and source == "game_window":
                             if config.get("auto_click"):
                                 logging.info("扫码成功，4秒后将自动点击窗口中心")
                                 await asyncio.sleep(4)
@@ -201,49 +243,65 @@ class BH3GameManager:
                                 exit_app_func()
                                 return
 
-                # 处理剪贴板检查：无论是否开启自动截图，只要已登录就尝试从剪贴板识别二维码
-                if config.get("account_login", False):
-                    from ..utils.config_utils import config_manager
+                    # 空闲时以最新的票据发起扫码验证（较早的票据已被新二维码取代）
+                    if scan_task is None and pending_tickets:
+                        source, ticket = pending_tickets[-1]
+                        pending_tickets.clear()
+                        scan_task = (
+                            source,
+                            asyncio.create_task(
+                                image_processor.login_with_ticket(
+                                    ticket,
+                                    config=config,
+                                    bh_info=config_manager.bh_info,
+                                )
+                            ),
+                        )
 
-                    await image_processor.parse_qr_code(
-                        image_source="clipboard",
-                        config=config,
-                        bh_info=config_manager.bh_info,
+                    # 根据本周期观察到的状态决定等待间隔，期间识别到票据时提前唤醒
+                    await pipeline.wait(
+                        scheduler.next_interval(
+                            game_present=frame is not None or not capture_enabled,
+                            login_screen=image_processor.last_match is not None,
+                            clipboard_changed=image_processor.clipboard_watcher.changed,
+                        )
                     )
 
-                # 根据配置的间隔时间等待
-                await asyncio.sleep(config.get("sleep_time", 1))
-
-            except Exception as e:
-                logging.error(f"自动监控过程中发生错误: {str(e)}")
-                await asyncio.sleep(1)
+                except Exception as e:
+                    logging.error(f"自动监控过程中发生错误: {str(e)}")
+                    await asyncio.sleep(1)
+        finally:
+            if scan_task is not None:
+                scan_task[1].cancel()
+            # 等待正在执行的画面分析结束，监控停止后不再点击或提交票据
+            await pipeline.aclose()
+            skip_stats = image_processor.frame_skip_stats()
+            logging.info(
+                f"自动监控结束：检查 {skip_stats['checked']} 帧，"
+                f"跳过未变化的 {skip_stats['skipped']} 帧（{skip_stats['skip_ratio']:.0%}）"
+            )
 
     def _is_admin(self):
         """检查管理员权限"""
         return ctypes.windll.shell32.IsUserAnAdmin()
 
 
+# 游戏窗口监视器：缓存窗口句柄，供窗口检测、截图与点击共用
+game_window_watcher = WindowWatcher(GAME_WINDOW_TITLE)
+# 游戏窗口出现时直接记录其所属进程，进程跟踪器无需再遍历
+game_window_watcher.subscribe(lambda hwnd, pid: pid and bh3_process.remember(pid))
+
+
 @handle_exceptions("检查窗口存在状态出错", False)
 def is_game_window_exist():
     """检查崩坏3游戏窗口是否存在"""
-
-    def enum_windows(hwnd, results):
-        if (
-            win32gui.IsWindowVisible(hwnd)
-            and win32gui.GetWindowText(hwnd) == GAME_WINDOW_TITLE
-        ):
-            results.append(True)
-
-    results = []
-    win32gui.EnumWindows(enum_windows, results)
-    exist = bool(results)
-    return exist
+    return game_window_watcher.exists()
 
 
 @handle_exceptions("激活窗口出错", False)
 def active_game_window():
     """激活崩坏3游戏窗口并置于前台"""
-    hwnd = win32gui.FindWindow(None, GAME_WINDOW_TITLE)
+    hwnd = game_window_watcher.hwnd
     if not hwnd:
         return False
 
@@ -272,8 +330,8 @@ def active_game_window():
 
 def click_center_of_game_window():
     """点击崩坏3游戏窗口中心位置"""
-    hwnd = win32gui.FindWindow(None, GAME_WINDOW_TITLE)
-    if not hwnd or not is_game_window_exist():
+    hwnd = game_window_watcher.hwnd
+    if not hwnd:
         logging.info("未找到游戏窗口")
         return
 
@@ -283,30 +341,157 @@ def click_center_of_game_window():
     center_x = left + width // 2
     center_y = top + height // 2
 
+    import pyautogui
+
     pyautogui.click(center_x, center_y)
 
 
+class BITMAPINFOHEADER(ctypes.Structure):
+    """GDI 位图信息头（用于创建 32 位自顶向下的 DIB Section）"""
+
+    _fields_ = [
+        ("biSize", ctypes.c_uint32),
+        ("biWidth", ctypes.c_int32),
+        ("biHeight", ctypes.c_int32),
+        ("biPlanes", ctypes.c_uint16),
+        ("biBitCount", ctypes.c_uint16),
+        ("biCompression", ctypes.c_uint32),
+        ("biSizeImage", ctypes.c_uint32),
+        ("biXPelsPerMeter", ctypes.c_int32),
+        ("biYPelsPerMeter", ctypes.c_int32),
+        ("biClrUsed", ctypes.c_uint32),
+        ("biClrImportant", ctypes.c_uint32),
+    ]
+
+
+class BITMAPINFO(ctypes.Structure):
+    _fields_ = [("bmiHeader", BITMAPINFOHEADER), ("bmiColors", ctypes.c_uint32 * 3)]
+
+
 class WindowCapture:
     """
     后台窗口截图工具类
-    使用Windows API实现后台窗口截图功能，支持对崩坏3游戏窗口的截图
+    使用Windows API实现后台窗口截图功能，支持对崩坏3游戏窗口的截图。
+    窗口尺寸不变时复用同一个内存 DC 与 DIB Section 位图，像素以 numpy 视图形式
+    直接暴露，避免每次截图都重新分配数 MB 的缓冲区
     """
 
-    def __init__(self, window_title):
+    BI_RGB = 0
+    DIB_RGB_COLORS = 0
+
+    def __init__(self, window_title, watcher=None):
+        """
+        :param window_title: 窗口标题
+        :param watcher: 窗口监视器，提供时通过它获取窗口句柄
+        """
         self.window_title = window_title
+        self.watcher = watcher
         self.hwnd = None
+        # 截图会话（窗口句柄与尺寸不变时复用）
+        self._session_key = None
+        self._mem_dc = None
+        self._bitmap = None
+        self._old_bitmap = None
+        self._pixels = None
 
     def _find_window(self):
         """查找崩坏3游戏窗口句柄"""
-        self.hwnd = win32gui.FindWindow(None, self.window_title)
+        if self.watcher is not None:
+            # 截图时句柄已失效，说明缓存的窗口状态过期，强制刷新
+            self.hwnd = self.watcher.refresh(force=True)
+        else:
+            self.hwnd = win32gui.FindWindow(None, self.window_title)
         if self.hwnd:
             return True
         logging.debug(f"未找到窗口: {self.window_title}")
         return False
 
+    def _open_session(self, width, height):
+        """为当前窗口创建内存 DC 与 32 位 DIB Section，像素内存直接映射为 numpy 数组"""
+        self.close()
+        header = BITMAPINFOHEADER()
+        header.biSize = ctypes.sizeof(BITMAPINFOHEADER)
+        header.biWidth = width
+        header.biHeight = -height  # 负值表示自顶向下，与 numpy 行序一致
+        header.biPlanes = 1
+        header.biBitCount = 32
+        header.biCompression = self.BI_RGB
+        bitmap_info = BITMAPINFO(bmiHeader=header)
+
+        gdi32 = windll.gdi32
+        gdi32.CreateDIBSection.restype = ctypes.c_void_p
+        gdi32.CreateDIBSection.argtypes = [
+            ctypes.c_void_p,
+            ctypes.c_void_p,
+            ctypes.c_uint,
+            ctypes.POINTER(ctypes.c_void_p),
+            ctypes.c_void_p,
+            ctypes.c_uint32,
+        ]
+
+        hwnd_dc = win32gui.GetWindowDC(self.hwnd)
+        try:
+            bits = ctypes.c_void_p()
+            bitmap = gdi32.CreateDIBSection(
+                hwnd_dc,
+                ctypes.byref(bitmap_info),
+                self.DIB_RGB_COLORS,
+                ctypes.byref(bits),
+                None,
+                0,
+            )
+            if not bitmap or not bits.value:
+                raise OSError("CreateDIBSection 失败")
+            self._bitmap = bitmap
+            self._mem_dc = win32gui.CreateCompatibleDC(hwnd_dc)
+        finally:
+            win32gui.ReleaseDC(self.hwnd, hwnd_dc)
+
+        self._old_bitmap = win32gui.SelectObject(self._mem_dc, self._bitmap)
+        buffer = (ctypes.c_ubyte * (width * height * 4)).from_address(bits.value)
+        self._pixels = np.frombuffer(buffer, dtype=np.uint8).reshape(height, width, 4)
+        self._session_key = (self.hwnd, width, height)
+
+    def close(self):
+        """释放截图会话占用的 GDI 资源"""
+        self._pixels = None
+        self._session_key = None
+        try:
+            if self._mem_dc and self._old_bitmap:
+                win32gui.SelectObject(self._mem_dc, self._old_bitmap)
+        except Exception:
+            pass
+        try:
+            if self._bitmap:
+                win32gui.DeleteObject(self._bitmap)
+        except Exception:
+            pass
+        try:
+            if self._mem_dc:
+                win32gui.DeleteDC(self._mem_dc)
+        except Exception:
+            pass
+        self._mem_dc = self._bitmap = self._old_bitmap = None
+
+    def __del__(self):
+        self.close()
+
+    def _print_window(self):
+        """将窗口内容绘制到内存 DC，并确保 GDI 绘制已写入像素内存"""
+        windll.user32.PrintWindow(self.hwnd, self._mem_dc, 0)
+        windll.gdi32.GdiFlush()
+
+    def _is_black_frame(self):
+        """稀疏采样判断是否为黑屏（PrintWindow 在句柄刚失效时可能返回黑屏）"""
+        return not self._pixels[::16, ::16, :3].any()
+
     @handle_exceptions("窗口捕获出错", None)
     def capture_window(self):
-        """截取整个游戏窗口画面（支持后台窗口）"""
+        """
+        截取整个游戏窗口画面（支持后台窗口）
+        :return: 形如 (高, 宽, 4) 的 BGRX uint8 数组视图。该视图指向复用的缓冲区，
+                 下一次截图会覆盖其内容，需要长期保存时请自行复制
+        """
         # 若无句柄或句柄已无效，尝试重新查找
         try:
             hwnd_valid = bool(self.hwnd) and win32gui.IsWindow(self.hwnd)
@@ -315,77 +500,82 @@ class WindowCapture:
 
         if not hwnd_valid and not self._find_window():
             logging.debug("无法获取窗口句柄，截图失败")
+            self.close()
             return None
 
-        left, top, right, bot = win32gui.GetWindowRect(self.hwnd)
-        # 二次校验：获取窗口矩形失败时，尝试刷新句柄
+        # 获取窗口矩形失败时，尝试刷新句柄
         try:
             left, top, right, bot = win32gui.GetWindowRect(self.hwnd)
         except Exception:
             if not self._find_window():
                 logging.debug("窗口句柄无效且刷新失败，截图终止")
+                self.close()
                 return None
             left, top, right, bot = win32gui.GetWindowRect(self.hwnd)
         width, height = right - left, bot - top
+        if width <= 0 or height <= 0:
+            return None
 
-        hwndDC = None
-        mfcDC = None
-        saveDC = None
-        saveBitMap = None
         try:
-            hwndDC = win32gui.GetWindowDC(self.hwnd)
-            mfcDC = win32ui.CreateDCFromHandle(hwndDC)
-            saveDC = mfcDC.CreateCompatibleDC()
-            saveBitMap = win32ui.CreateBitmap()
-            saveBitMap.CreateCompatibleBitmap(mfcDC, width, height)
-            saveDC.SelectObject(saveBitMap)
-
-            windll.user32.PrintWindow(self.hwnd, saveDC.GetSafeHdc(), 0)
-            # PrintWindow 可能在句柄刚失效时返回黑屏；重试一次
-            try:
-                windll.user32.PrintWindow(self.hwnd, saveDC.GetSafeHdc(), 0)
-            except Exception as e:
-                logging.debug(f"PrintWindow 调用失败，尝试刷新句柄后重试: {e}")
-                if self._find_window():
-                    windll.user32.PrintWindow(self.hwnd, saveDC.GetSafeHdc(), 0)
-
-            bmpinfo = saveBitMap.GetInfo()
-            bmpstr = saveBitMap.GetBitmapBits(True)
-            pil_img = Image.frombuffer(
-                "RGB",
-                (bmpinfo["bmWidth"], bmpinfo["bmHeight"]),
-                bmpstr,
-                "raw",
-                "BGRX",
-                0,
-                1,
-            )
-            return pil_img
+            if self._session_key != (self.hwnd, width, height):
+                self._open_session(width, height)
+
+            self._print_window()
+            # PrintWindow 可能在句柄刚失效时返回黑屏；仅在检测到黑屏时刷新句柄重试一次
+            if self._is_black_frame():
+                logging.debug("截图为黑屏，刷新句柄后重试")
+                if self._find_window() and self._session_key == (
+                    self.hwnd,
+                    width,
+                    height,
+                ):
+                    self._print_window()
+            return self._pixels
         except Exception as e:
             logging.error(f"截图过程中出错: {e}")
+            self.close()
             return None
-        finally:
-            # 确保资源被正确释放
-            try:
-                if saveBitMap:
-                    win32gui.DeleteObject(saveBitMap.GetHandle())
-            except Exception:
-                pass
-            try:
-                if saveDC:
-                    saveDC.DeleteDC()
-            except Exception:
-                pass
-            try:
-                if mfcDC:
-                    mfcDC.DeleteDC()
-            except Exception:
-                pass
-            try:
-                if hwndDC:
-                    win32gui.ReleaseDC(self.hwnd, hwndDC)
-            except Exception:
-                pass
+
+
+class WindowFrameSource(FrameSource):
+    """
+    游戏窗口帧来源
+    基于 WindowCapture（PrintWindow）截取崩坏3窗口，是 ImageProcessor 的默认帧来源
+    """
+
+    def __init__(self, window_title=GAME_WINDOW_TITLE, watcher=None):
+        """
+        :param window_title: 窗口标题
+        :param watcher: 窗口监视器，默认为该标题新建一个
+        """
+        super().__init__()
+        self.window_title = window_title
+        self.watcher = watcher or WindowWatcher(window_title)
+        self.window_capturer = None  # 延迟初始化窗口捕获器
+
+    def _init_window_capturer(self):
+        """初始化崩坏3游戏窗口捕获器（延迟加载）"""
+        if self.window_capturer is None:
+            logging.info("初始化窗口捕获器")
+            self.window_capturer = WindowCapture(self.window_title, self.watcher)
+        return self.window_capturer
+
+    @handle_exceptions("检查窗口存在状态出错", False)
+    def is_available(self):
+        return self.watcher.exists()
+
+    @handle_exceptions("获取屏幕分辨率出错", (1920, 1080), log_level="warning")
+    def resolution(self):
+        """获取主屏幕分辨率"""
+        return windll.user32.GetSystemMetrics(0), windll.user32.GetSystemMetrics(1)
+
+    def _grab(self):
+        pixels = self._init_window_capturer().capture_window()
+        if pixels is None:
+            logging.warning("屏幕捕获失败")
+            return None
+        # 灰度/RGB 视图由帧按需从 BGRX 缓冲区直接生成
+        return Frame.from_bgrx(pixels)
 
 
 class ImageProcessor:
@@ -394,129 +584,142 @@ class ImageProcessor:
     提供模板匹配、屏幕捕获和二维码识别功能，用于崩坏3游戏界面识别
     """
 
-    def __init__(self, template_dir=TEMPLATE_DIR):
+    # 连续未定位到二维码超过该时长（秒）后做一次整帧解码兜底。
+    # 按时间而非解码次数计算：静止画面只在帧变化检测强制刷新时才会解码
+    QR_FULL_DECODE_INTERVAL = 10.0
+
+    def __init__(
+        self,
+        template_dir=TEMPLATE_DIR,
+        template_cache_dir=TEMPLATE_CACHE_DIR_PATH,
+        frame_source=None,
+        clock=time.monotonic,
+    ):
+        """
+        :param template_dir: 模板图片目录
+        :param template_cache_dir: 缩放后模板的磁盘缓存目录，为 None 时不使用磁盘缓存
+        :param frame_source: 画面帧来源，默认为游戏窗口截图（WindowFrameSource）
+        :param clock: 时钟函数（可替换为模拟时钟）
+        """
         logging.info("初始化图像处理器")
         self.template_dir = template_dir
+        self.frame_source = frame_source or WindowFrameSource(
+            watcher=game_window_watcher
+        )
         self.screen_width, self.screen_height = self._get_screen_resolution()
         logging.info(f"屏幕分辨率: {self.screen_width}x{self.screen_height}")
-        self.template_cache = {}  # 内存缓存模板
-        self.window_capturer = None  # 延迟初始化窗口捕获器
-        self._load_templates()
+        # 批量模板匹配器，模板以连续 uint8 数组形式预存
+        self.template_matcher = TemplateMatcher()
+        self.template_cache = self.template_matcher.templates  # 内存缓存模板
+        self.last_match = None  # 最近一次模板匹配结果（用于判断是否处于登录界面）
+        # 帧变化检测器，用于跳过未变化画面的重复处理
+        self.change_detector = FrameChangeDetector()
+        # 二维码定位器：先在缩小的帧上定位，再交给 pyzbar 解码候选区域
+        self.qr_locator = QRLocator()
+        self.clock = clock
+        self._qr_miss_since = None  # 开始连续未定位到二维码的时间
+        # 剪贴板监视器：剪贴板未变化时不再重复读取与解码
+        self.clipboard_watcher = ClipboardWatcher()
+        # 票据去重：同一二维码只发起一次扫码验证
+        self.ticket_gate = TicketGate()
+        # 模板在首次匹配时才并行加载，缩放结果缓存在磁盘上
+        self.template_store = TemplateStore(template_dir, cache_dir=template_cache_dir)
+        self._templates_lock = threading.Lock()
+        self._templates_loaded = False
 
     def _get_screen_resolution(self):
-        """获取主屏幕分辨率"""
-        return windll.user32.GetSystemMetrics(0), windll.user32.GetSystemMetrics(1)
+        """获取屏幕分辨率（由帧来源提供）"""
+        return self.frame_source.resolution()
 
     def _get_resolution_from_filename(self, filename):
         """从模板文件名中提取分辨率信息"""
-        match = re.search(r"(\d+)p", filename)
-        return int(match.group(1)) if match else None
+        return source_resolution(filename)
 
     def _load_templates(self):
-        """加载模板图片并缩放到当前屏幕分辨率"""
+        """加载模板图片并缩放到当前屏幕分辨率（并行加载，优先读取缩放缓存）"""
         if not os.path.exists(self.template_dir):
             os.makedirs(self.template_dir, exist_ok=True)
             logging.info(f"已创建模板目录: {self.template_dir}")
             return
 
-        loaded_count = 0
-        for filename in os.listdir(self.template_dir):
-            if not filename.lower().endswith((".png", ".jpg", ".jpeg")):
-                continue
+        start = time.perf_counter()
+        templates = self.template_store.load_all(self.screen_height)
+        for filename, array in templates.items():
+            # 预处理为 uint8 数组（含金字塔粗匹配层）后缓存
+            self.template_matcher.add(filename, array)
+        logging.info(f"模板加载完成，共加载 {len(templates)} 个模板")
+        logging.debug(
+            f"模板加载耗时 {(time.perf_counter() - start) * 1000:.0f}ms，"
+            f"{self.template_store.stats()}"
+        )
 
-            file_path = os.path.join(self.template_dir, filename)
-            src_resolution = self._get_resolution_from_filename(filename)
+    def ensure_templates(self):
+        """首次使用模板时加载（启动时不再阻塞）"""
+        if self._templates_loaded:
+            return
+        with self._templates_lock:
+            if not self._templates_loaded:
+                self._load_templates()
+                self._templates_loaded = True
 
-            if not src_resolution:
-                logging.warning(f"跳过文件（缺少有效分辨率标识）: {filename}")
-                continue
+    def grab_frame(self):
+        """
+        从帧来源捕获一帧画面（默认为崩坏3游戏窗口，窗口不存在时返回 None）
+        返回的 Frame 可同时交给模板匹配与二维码解析，避免同一周期内重复截图
+        """
+        return self.frame_source.grab()
 
-            # logging.debug(f"加载模板: {filename} (源分辨率: {src_resolution}p)")
-            try:
-                # 使用PIL代替cv2加载和缩放模板
-                template_img = Image.open(file_path).convert("L")
-                scale_factor = self.screen_height / src_resolution
-                new_width = int(template_img.width * scale_factor)
-                new_height = int(template_img.height * scale_factor)
-                scaled_template = template_img.resize(
-                    (new_width, new_height), Image.LANCZOS
-                )
-
-                # 缓存PIL图像对象
-                self.template_cache[filename] = scaled_template
-            except Exception as e:
-                logging.warning(f"加载或缩放模板出错: {filename}, {e}")
-                continue
-            loaded_count += 1
-            # logging.debug(f"已缓存模板: {filename} ({new_size[0]}x{new_size[1]})")
-
-        logging.info(f"模板加载完成，共加载 {loaded_count} 个模板")
+    def capture_screen(self):
+        """捕获整个崩坏3游戏窗口的灰度图像（uint8 数组）"""
+        frame = self.grab_frame()
+        return frame.gray if frame is not None else None
 
-    def _init_window_capturer(self):
-        """初始化崩坏3游戏窗口捕获器（延迟加载）"""
-        if self.window_capturer is None:
-            logging.info("初始化窗口捕获器")
-            self.window_capturer = WindowCapture(GAME_WINDOW_TITLE)
-        return self.window_capturer
+    def frame_changed(self, frame):
+        """判断画面（Frame 或灰度图像）相对上次处理的帧是否发生变化"""
+        return self.change_detector.has_changed(frame)
 
-    def capture_screen(self):
-        """捕获整个崩坏3游戏窗口的灰度图像（窗口检测优化）"""
-        if not is_game_window_exist():
-            return None
-        capturer = self._init_window_capturer()
-        pil_img = capturer.capture_window()
-        if pil_img is None:
-            logging.warning("屏幕捕获失败")
-            return None
-        return pil_img.convert("L")
+    def frame_skip_stats(self):
+        """帧变化检测统计（checked/skipped/skip_ratio），用于验证 CPU 节省"""
+        return self.change_detector.stats()
+
+    def roi_stats(self):
+        """模板 ROI 记忆命中统计（hits/misses/hit_rate）"""
+        return self.template_matcher.roi_stats()
 
     def match_template(self, template_name, screen_gray, threshold=0.8):
-        """在屏幕图像中匹配指定模板，返回匹配位置和置信度"""
-        # logging.debug(f"开始模板匹配: {template_name}")
-        if template_name not in self.template_cache:
+        """
+        在屏幕图像中匹配指定模板，返回匹配位置和置信度
+        :param screen_gray: 灰度屏幕图像（PIL 图像、numpy 数组或 ImagePyramid）
+        """
+        self.ensure_templates()
+        if template_name not in self.template_matcher:
             logging.warning(f"模板不存在: {template_name}")
             return None, 0
 
-        template = self.template_cache[template_name]
         if screen_gray is None:
             return None, 0
 
-        # 将PIL图像转为numpy数组进行模板匹配
-        screen_np = (
-            np.array(screen_gray)
-            if not isinstance(screen_gray, np.ndarray)
-            else screen_gray
-        )
-        template_np = (
-            np.array(template) if not isinstance(template, np.ndarray) else template
-        )
+        # 由粗到精：先在缩小的金字塔层定位候选，再在全分辨率 ROI 内精确匹配
+        return self.template_matcher.match(template_name, screen_gray, threshold)
 
-        result = matchTemplate(screen_np, template_np, TM_CCOEFF_NORMED)
-        _, max_val, _, max_loc = minMaxLoc(result)
-        # print(f"[DEBUG] 模板匹配结果 - 最大置信度: {max_val:.2f}")
-
-        if max_val >= threshold:
-            # 使用PIL图像的size属性替代numpy的shape
-            template_width, template_height = template.size
-            x = max_loc[0] + template_width // 2
-            y = max_loc[1] + template_height // 2
-            # print(f"[DEBUG] 找到匹配位置: ({x}, {y})")
-            return (x, y), max_val
-        return None, max_val
-
-    def match_and_click(self, threshold=0.8):
-        """匹配所有模板并点击置信度最高的位置（若激活游戏窗口成功）"""
-        best_match = None
-        best_confidence = 0
-        screen_gray = self.capture_screen()
-
-        for template_name in self.template_cache:
-            location, confidence = self.match_template(
-                template_name, screen_gray, threshold
-            )
-            if location and confidence > best_confidence:
-                best_match = (template_name, location, confidence)
-                best_confidence = confidence
+    def match_and_click(self, threshold=0.8, early_exit=False, frame=None):
+        """
+        匹配所有模板并点击置信度最高的位置（若激活游戏窗口成功）
+        :param early_exit: 为 True 时命中首个达到阈值的模板即停止匹配
+        :param frame: 本周期已捕获的 Frame，为空时自行截图
+        """
+        if frame is None:
+            frame = self.grab_frame()
+        if frame is None:
+            self.last_match = None
+            return False
+
+        # 屏幕图像只转换一次，单次遍历全部模板
+        self.ensure_templates()
+        best_match = self.template_matcher.match_all(
+            frame, threshold, early_exit=early_exit
+        )
+        self.last_match = best_match
 
         if best_match:
             template_name, (x, y), confidence = best_match
@@ -527,6 +730,8 @@ class ImageProcessor:
                 f"匹配到位置: {template_name} @ ({x}, {y}), 置信度: {confidence:.2f}"
             )
             if active_game_window():
+                import pyautogui
+
                 pyautogui.click(x, y)
                 logging.info("点击对应模板")
                 return True
@@ -535,35 +740,56 @@ class ImageProcessor:
                 return False
         return False
 
-    @handle_exceptions("二维码解析出错", False)
-    async def parse_qr_code(self, image_source="clipboard", config=None, bh_info=None):
-        """从剪贴板或游戏窗口解析二维码并完成崩坏3登录"""
-        if image_source == "clipboard":
-            im = ImageGrab.grabclipboard()
-            if not isinstance(im, Image.Image):
-                return False
-        elif image_source == "game_window":
-            capturer = self._init_window_capturer()
-            im = capturer.capture_window()
-            if im is None:
-                logging.warning("游戏窗口截图失败")
-                return False
-            im = im.convert("RGB")
-        else:
-            logging.warning("无效的图像来源")
-            return False
-
-        result = decode(im)
+    def decode_qr(self, image, locate=True):
+        """
+        两阶段二维码解码
+        大图先在缩小的灰度图上定位二维码，仅将候选区域交给 pyzbar 解码；
+        连续未定位到超过 QR_FULL_DECODE_INTERVAL 秒时做一次整帧解码兜底，防止定位器漏检。
+        定位器与兜底计时只用于游戏画面帧（只在画面分析线程中调用）
+        :param image: Frame、PIL 图像或灰度数组
+        :param locate: 为 False 时直接整图解码（剪贴板图像只解码一次，不能依赖兜底）
+        :return: pyzbar 解码结果列表
+        """
+        gray = to_gray_array(image)
+        if not locate or max(gray.shape[:2]) <= self.qr_locator.max_side:
+            return decode(gray, symbols=[ZBarSymbol.QRCODE])
+
+        for x0, y0, x1, y1 in self.qr_locator.locate(gray):
+            result = decode(gray[y0:y1, x0:x1], symbols=[ZBarSymbol.QRCODE])
+            if result:
+                self._qr_miss_since = None
+                return result
+
+        now = self.clock()
+        if self._qr_miss_since is None:
+            self._qr_miss_since = now
+        elif now - self._qr_miss_since >= self.QR_FULL_DECODE_INTERVAL:
+            self._qr_miss_since = now
+            return decode(gray, symbols=[ZBarSymbol.QRCODE])
+        return []
+
+    def extract_ticket(self, image, image_source="game_window"):
+        """
+        解码图像中的二维码并提取登录票据（同步，可在工作线程中执行）
+        :param image: Frame、PIL 图像或灰度数组
+        :param image_source: 图像来源，clipboard 来源的无效图像会被记录，不再重复解码
+        :return: 票据字符串，未识别到有效票据时返回 None
+        """
+        result = self.decode_qr(image, locate=image_source != "clipboard")
         if not result:
-            return False
+            if image_source == "clipboard":
+                self.clipboard_watcher.reject(image)
+            return None
 
         url = result[0].data.decode("utf-8")
 
         if "ticket=" not in url:
             logging.debug("无效的二维码格式")
-            return False
+            if image_source == "clipboard":
+                self.clipboard_watcher.reject(image)
+            return None
 
-        ticket = next(
+        return next(
             (
                 p.split("=")[1]
                 for p in url.split("?")[1].split("&")
@@ -572,9 +798,26 @@ class ImageProcessor:
             None,
         )
 
+    def poll_clipboard_ticket(self):
+        """检查剪贴板，剪贴板出现新的登录二维码时返回票据"""
+        image = self.clipboard_watcher.poll()
+        if image is None:
+            return None
+        return self.extract_ticket(image, "clipboard")
+
+    @handle_exceptions("扫码验证出错", False)
+    async def login_with_ticket(self, ticket, config=None, bh_info=None):
+        """使用已提取的票据完成崩坏3扫码登录"""
         if ticket and config and bh_info:
-            logging.info("检测到有效登陆票据，开始扫码验证")
-            await mihoyosdk.scanCheck(bh_info, ticket, config)
+            if not self.ticket_gate.admit(ticket):
+                return False
+            completed = False
+            try:
+                logging.info("检测到有效登陆票据，开始扫码验证")
+                await mihoyosdk.scanCheck(bh_info, ticket, config)
+                completed = True
+            finally:
+                self.ticket_gate.release(ticket, completed)
             self.clear_clipboard()
             logging.info("扫码验证完成")
             return True
@@ -582,9 +825,39 @@ class ImageProcessor:
         logging.info("缺少必要的登陆信息")
         return False
 
+    @handle_exceptions("二维码解析出错", False)
+    async def parse_qr_code(
+        self, image_source="clipboard", config=None, bh_info=None, frame=None
+    ):
+        """
+        从剪贴板或游戏窗口解析二维码并完成崩坏3登录
+        :param frame: 本周期已捕获的 Frame（仅 game_window 来源），为空时自行截图
+        """
+        if image_source == "clipboard":
+            im = self.clipboard_watcher.poll()
+            if im is None:
+                return False
+        elif image_source == "game_window":
+            if frame is None:
+                frame = self.grab_frame()
+            if frame is None:
+                logging.warning("游戏窗口截图失败")
+                return False
+            im = frame
+        else:
+            logging.warning("无效的图像来源")
+            return False
+
+        ticket = self.extract_ticket(im, image_source)
+        if ticket is None:
+            return False
+        return await self.login_with_ticket(ticket, config, bh_info)
+
     @handle_exceptions("清空剪贴板出错")
     def clear_clipboard(self):
         """清空系统剪贴板内容"""
+        if windll is None:
+            return
         if windll.user32.OpenClipboard(None):
             windll.user32.EmptyClipboard()
             windll.user32.CloseClipboard()
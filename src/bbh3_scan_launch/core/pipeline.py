@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+自动监控流水线
+截图与画面分析（变化检测、模板匹配、二维码解码）在有界线程池中执行，
+使下一帧的截图与当前帧的分析重叠进行，事件循环本身不再被阻塞
+"""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+
+class FramePipeline:
+    """
+    截图 → 分析 两级流水线
+    - 同一时刻最多一次截图、一个分析任务在执行，另有至多一帧等待分析
+    - 分析繁忙时新帧替换等待中的旧帧（背压：丢弃过期帧，只分析最新画面）
+    - 分析识别到的登录票据暂存在流水线中，由监控循环取出后完成扫码验证
+    - 剪贴板检查（读取与解码）同样在线程池中执行，不阻塞事件循环
+    - 关闭后不再点击或提交票据：正在执行的分析在每一步之前检查停止标志
+    """
+
+    def __init__(self, image_processor, max_workers=3):
+        """
+        :param image_processor: ImageProcessor 实例
+        :param max_workers: 线程池大小（截图、画面分析与剪贴板检查各占一个线程）
+        """
+        self.image_processor = image_processor
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="auto_monitor"
+        )
+        self._running = None
+        self._pending = None
+        self._tickets = []
+        self._ticket_ready = asyncio.Event()
+        self._stopped = False
+        self.captured = 0
+        self.analysed = 0
+        self.dropped = 0
+
+    def _grab(self):
+        """在工作线程中截图，并使帧脱离复用的截图缓冲区"""
+        frame = self.image_processor.grab_frame()
+        return frame.detach() if frame is not None else None
+
+    def _analyse(self, frame, auto_click, auto_clip):
+        """在工作线程中分析一帧，返回识别到的票据"""
+        processor = self.image_processor
+        # 帧变化检测：画面与上次处理的帧相同时跳过匹配与解析
+        if self._stopped or not processor.frame_changed(frame):
+            return None
+        if auto_click and not self._stopped:
+            processor.match_and_click(frame=frame)
+        if auto_clip and not self._stopped:
+            return processor.extract_ticket(frame)
+        return None
+
+    async def capture(self):
+        """截取一帧（在线程池中执行），窗口不存在时返回 None"""
+        loop = asyncio.get_running_loop()
+        frame = await loop.run_in_executor(self.executor, self._grab)
+        if frame is not None:
+            self.captured += 1
+        return frame
+
+    async def poll_clipboard(self):
+        """在线程池中检查剪贴板，剪贴板出现新的登录二维码时返回票据"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, self.image_processor.poll_clipboard_ticket
+        )
+
+    def submit(self, frame, auto_click=False, auto_clip=False):
+        """
+        提交一帧等待分析，不等待分析完成
+        :param auto_click: 是否进行模板匹配与点击
+        :param auto_clip: 是否解码二维码
+        """
+        if self._stopped:
+            return
+        job = (frame, auto_click, auto_clip)
+        if self._running is None:
+            self._start(job)
+            return
+        if self._pending is not None:
+            self.dropped += 1
+        self._pending = job
+
+    def _start(self, job):
+        loop = asyncio.get_running_loop()
+        self._running = loop.run_in_executor(self.executor, self._analyse, *job)
+        self._running.add_done_callback(self._on_analysed)
+
+    def _on_analysed(self, future):
+        """分析完成回调（在事件循环线程中执行）：收集票据并启动等待中的帧"""
+        self._running = None
+        self.analysed += 1
+        if self._stopped:
+            return
+        if not future.cancelled():
+            error = future.exception()
+            if error is not None:
+                logging.error(f"画面分析出错: {error}")
+            elif future.result():
+                self._tickets.append(future.result())
+                self._ticket_ready.set()
+        if self._pending is not None:
+            job, self._pending = self._pending, None
+            self._start(job)
+
+    def tickets(self):
+        """取出已识别的票据"""
+        tickets, self._tickets = self._tickets, []
+        self._ticket_ready.clear()
+        return tickets
+
+    async def wait(self, timeout):
+        """等待下一个轮询周期；期间识别到票据时提前返回"""
+        if self._tickets:
+            return
+        try:
+            await asyncio.wait_for(self._ticket_ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def stats(self):
+        """流水线统计"""
+        return {
+            "captured": self.captured,
+            "analysed": self.analysed,
+            "dropped": self.dropped,
+        }
+
+    async def aclose(self, timeout=2.0):
+        """
+        停止流水线：不再启动新的分析，等待正在执行的分析结束后关闭线程池
+        :param timeout: 等待正在执行的分析的最长时间（秒）
+        """
+        self._stopped = True
+        self._pending = None
+        running = self._running
+        if running is not None:
+            try:
+                await asyncio.wait_for(asyncio.shield(running), timeout)
+            except asyncio.TimeoutError:
+                logging.warning(f"画面分析未在 {timeout} 秒内结束")
+            except Exception:
+                pass  # 分析出错已在完成回调中记录
+        self.close()
+
+    def close(self):
+        """关闭线程池，取消尚未开始的任务（不等待正在执行的分析）"""
+        self._stopped = True
+        self._pending = None
+        self.executor.shutdown(wait=False, cancel_futures=True)
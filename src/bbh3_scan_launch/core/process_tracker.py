@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+进程跟踪
+记住已找到的进程 PID，之后只用 pid_exists + 创建时间校验，
+仅在缓存失效时才遍历系统全部进程
+"""
+
+import logging
+import threading
+import time
+
+import psutil
+
+
+class ProcessTracker:
+    """
+    按进程名跟踪进程
+    - 找到进程后缓存 {pid: 创建时间}，查询时用 pid_exists 与创建时间校验（防止 PID 复用）
+    - 未找到进程的结果缓存 miss_ttl 秒，期间不重复遍历
+    - 可选后台线程定期刷新，使查询方只读取内存状态
+    """
+
+    def __init__(self, name, miss_ttl=1.0, clock=time.monotonic):
+        """
+        :param name: 进程名（不区分大小写）
+        :param miss_ttl: 未找到进程时结果的缓存时间（秒）
+        :param clock: 时钟函数（可替换为模拟时钟）
+        """
+        self.name = name.lower()
+        self.miss_ttl = miss_ttl
+        self.clock = clock
+        self._pids = {}
+        self._scanned_at = None
+        self._lock = threading.Lock()
+        self._refresh_thread = None
+        self._stop_event = threading.Event()
+        self.scans = 0
+        self.validations = 0
+
+    def _is_valid(self, pid, create_time):
+        """校验缓存的 PID 仍指向同一个进程"""
+        self.validations += 1
+        if not psutil.pid_exists(pid):
+            return False
+        try:
+            return psutil.Process(pid).create_time() == create_time
+        except psutil.Error:
+            return False
+
+    def _scan(self):
+        """遍历系统全部进程查找目标进程"""
+        self.scans += 1
+        pids = {}
+        for proc in psutil.process_iter(["name", "create_time"]):
+            try:
+                if proc.info["name"] and proc.info["name"].lower() == self.name:
+                    pids[proc.pid] = proc.info["create_time"]
+            except Exception:
+                continue
+        self._pids = pids
+        self._scanned_at = self.clock()
+
+    def pids(self):
+        """当前目标进程的 PID 列表"""
+        with self._lock:
+            if self._pids:
+                self._pids = {
+                    pid: created
+                    for pid, created in self._pids.items()
+                    if self._is_valid(pid, created)
+                }
+                if self._pids:
+                    return list(self._pids)
+                # 缓存的进程均已退出，重新遍历确认没有同名的新进程
+                self._scanned_at = None
+            if (
+                self._scanned_at is None
+                or self.clock() - self._scanned_at >= self.miss_ttl
+            ):
+                self._scan()
+            return list(self._pids)
+
+    def is_running(self):
+        """目标进程是否正在运行"""
+        return bool(self.pids())
+
+    def remember(self, pid):
+        """
+        记录由其他途径得知的 PID（如游戏窗口所属进程），进程名不符时忽略
+        """
+        try:
+            proc = psutil.Process(pid)
+            if proc.name().lower() != self.name:
+                return
+            create_time = proc.create_time()
+        except psutil.Error:
+            return
+        with self._lock:
+            self._pids[pid] = create_time
+
+    def invalidate(self):
+        """使缓存失效（如启动或结束进程后），下一次查询重新遍历"""
+        with self._lock:
+            self._pids = {}
+            self._scanned_at = None
+
+    def kill_all(self):
+        """结束全部目标进程（强制重新遍历，缓存之后才启动的同名进程同样会被结束）"""
+        with self._lock:
+            self._scan()
+            pids = list(self._pids)
+        for pid in pids:
+            try:
+                psutil.Process(pid).kill()
+            except psutil.Error:
+                continue
+        self.invalidate()
+
+    def start_background_refresh(self, interval=2.0):
+        """启动后台刷新线程（守护线程），定期校验或重新遍历"""
+        if self._refresh_thread is not None and self._refresh_thread.is_alive():
+            return
+        self._stop_event.clear()
+
+        def refresh_loop():
+            while not self._stop_event.wait(interval):
+                try:
+                    self.pids()
+                except Exception as e:
+                    logging.error(f"进程状态刷新出错: {e}")
+
+        self._refresh_thread = threading.Thread(
+            target=refresh_loop, name=f"ProcessTracker-{self.name}", daemon=True
+        )
+        self._refresh_thread.start()
+
+    def stop_background_refresh(self):
+        """停止后台刷新线程"""
+        self._stop_event.set()
+        self._refresh_thread = None
+
+    def stats(self):
+        """查询统计"""
+        return {"scans": self.scans, "validations": self.validations}
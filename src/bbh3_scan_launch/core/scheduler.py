@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+自适应轮询调度
+根据游戏窗口、登录界面与剪贴板状态决定自动监控的下一次轮询间隔
+"""
+
+
+class PollScheduler:
+    """
+    自动监控轮询调度器
+    - 游戏窗口不存在：间隔按倍数退避，直至最大间隔
+    - 检测到登录界面（模板命中）：使用最小间隔，尽快响应二维码
+    - 剪贴板刚发生变化：随后若干次轮询使用最小间隔（突发轮询）
+    - 其他情况：使用基础间隔（config["sleep_time"]）
+
+    游戏未运行时的轮询开销大幅降低；登录界面与突发轮询以额外的截图换取更低的识别延迟，
+    因此游戏运行期间的总开销会略高于固定间隔（见 benchmark.py schedule 场景）
+    """
+
+    GAME_ABSENT = "game_absent"
+    LOGIN_SCREEN = "login_screen"
+    BURST = "burst"
+    IDLE = "idle"
+
+    def __init__(
+        self,
+        base_interval=1.0,
+        min_interval=0.5,
+        max_interval=5.0,
+        backoff=2.0,
+        burst_ticks=4,
+    ):
+        """
+        :param base_interval: 基础轮询间隔（秒）
+        :param min_interval: 最小轮询间隔（秒）
+        :param max_interval: 最大轮询间隔（秒）
+        :param backoff: 游戏窗口不存在时每次轮询间隔的放大倍数
+        :param burst_ticks: 剪贴板变化后使用最小间隔的轮询次数
+        """
+        self.min_interval = min(min_interval, base_interval)
+        self.max_interval = max(max_interval, base_interval)
+        self.base_interval = base_interval
+        self.backoff = backoff
+        self.burst_ticks = burst_ticks
+        self.state = self.IDLE
+        self._absent_interval = None
+        self._burst_remaining = 0
+
+    @classmethod
+    def from_config(cls, config):
+        """由配置字典创建调度器"""
+        return cls(
+            base_interval=config.get("sleep_time", 1),
+            min_interval=config.get("min_sleep_time", 0.5),
+            max_interval=config.get("max_sleep_time", 5),
+        )
+
+    def next_interval(
+        self, game_present=True, login_screen=False, clipboard_changed=False
+    ):
+        """
+        根据本次轮询观察到的状态计算下一次轮询间隔（秒）
+        :param game_present: 游戏窗口是否存在
+        :param login_screen: 是否检测到登录界面
+        :param clipboard_changed: 剪贴板是否发生变化
+        """
+        if clipboard_changed:
+            self._burst_remaining = self.burst_ticks
+
+        if game_present:
+            self._absent_interval = None
+
+        if self._burst_remaining > 0:
+            self._burst_remaining -= 1
+            self.state = self.BURST
+            return self.min_interval
+        if not game_present:
+            self.state = self.GAME_ABSENT
+            if self._absent_interval is None:
+                self._absent_interval = self.base_interval
+            else:
+                self._absent_interval = min(
+                    self.max_interval, self._absent_interval * self.backoff
+                )
+            return self._absent_interval
+        if login_screen:
+            self.state = self.LOGIN_SCREEN
+            return self.min_interval
+        self.state = self.IDLE
+        return self.base_interval
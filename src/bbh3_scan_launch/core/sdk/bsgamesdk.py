@@ -1,16 +1,27 @@
-import asyncio
 import hashlib
 import json
 import time
 import urllib
 from ...utils import rsacr
+from ...utils.http_client import http_client
+from .request_builder import SignedFormTemplate
 import requests
 import logging
 
 bililogin = "https://line1-sdk-center-login-sh.biligame.net/"
+BILI_SIGN_KEY = "dbf8f1b4496f430b8a3c0f436a35b931"
+# RSA 公钥与盐值的复用时间（秒）：验证码重试、缓存账号失效后重新登录时不再重复获取
+RSA_KEY_TTL = 60
+rsa_key_cache = None  # (获取时间, {"hash": 盐值, "rsa_key": 公钥PEM})
+
+
+def biliSign(data):
+    """生成B站 SDK 请求的MD5签名"""
+    return hashlib.md5((data + BILI_SIGN_KEY).encode()).hexdigest()
 
 
 def setSign(data):
+    """为请求数据添加时间戳与签名，返回表单请求体（请求构造模板的参考实现）"""
     data["timestamp"] = int(time.time())
     data["client_timestamp"] = int(time.time())
     sign = ""
@@ -22,8 +33,7 @@ def setSign(data):
         data2 += f"{key}={data[key]}&"
     for key in sorted(data):
         sign += f"{data[key]}"
-    sign = sign + "dbf8f1b4496f430b8a3c0f436a35b931"
-    sign = hashlib.md5(sign.encode()).hexdigest()
+    sign = biliSign(sign)
     data2 += "sign=" + sign
     return data2
 
@@ -37,12 +47,8 @@ async def sendBiliPost(url, data):
     logging.debug(f"B站POST请求 - URL: {url}")
     logging.debug(f"B站POST请求 - 数据: {data}")
     try:
-        session = requests.Session()
-        res = session.post(url=url, data=data, headers=header)
-        if res is None:
-            logging.info("请求错误，3s后重试...")
-            await asyncio.sleep(3)
-            return await sendBiliPost(url, data)
+        # 超时与重试由 http_client 的重试策略统一处理
+        res = await http_client.apost(url, data=data, headers=header)
         try:
             return res.json()
         except json.JSONDecodeError as json_err:
@@ -98,54 +104,86 @@ captchaParam = (
 )
 
 
+# 预编译的请求模板（动态字段按原赋值顺序列出）
+userinfoRequest = SignedFormTemplate(
+    userinfoParam, biliSign, dynamic=("uid", "access_key")
+)
+rsaRequest = SignedFormTemplate(rsaParam, biliSign)
+loginRequest = SignedFormTemplate(
+    loginParam,
+    biliSign,
+    dynamic=(
+        "access_key",
+        "gt_user_id",
+        "uid",
+        "challenge",
+        "user_id",
+        "validate",
+        "seccode",
+        "pwd",
+    ),
+)
+captchaRequest = SignedFormTemplate(captchaParam, biliSign)
+
+
 async def getUserInfo(uid, access_key):
-    data = json.loads(userinfoParam)
-    data["uid"] = uid
-    data["access_key"] = access_key
-    data = setSign(data)
+    data = userinfoRequest.build(uid=uid, access_key=access_key)
     return await sendBiliPost(bililogin + "/api/client/user.info", data)
 
 
+async def getRsaKey():
+    """获取登录用的RSA公钥与盐值，RSA_KEY_TTL 秒内复用上次的结果"""
+    global rsa_key_cache
+    if rsa_key_cache is not None and time.monotonic() - rsa_key_cache[0] < RSA_KEY_TTL:
+        return rsa_key_cache[1]
+    rsa = await sendBiliPost(bililogin + "api/client/rsa", rsaRequest.build())
+    if rsa and "hash" in rsa and "rsa_key" in rsa:
+        rsa_key_cache = (time.monotonic(), rsa)
+    return rsa
+
+
+def invalidateRsaKey():
+    """清除缓存的RSA公钥与盐值，下一次登录重新获取"""
+    global rsa_key_cache
+    rsa_key_cache = None
+
+
 async def login1(account, password):
-    data = json.loads(rsaParam)
-    data = setSign(data)
-    rsa = await sendBiliPost(bililogin + "api/client/rsa", data)
-    data = json.loads(loginParam)
+    rsa = await getRsaKey()
     public_key = rsa["rsa_key"]
-    data["access_key"] = ""
-    data["gt_user_id"] = ""
-    data["uid"] = ""
-    data["challenge"] = ""
-    data["user_id"] = account
-    data["validate"] = ""
-    data["pwd"] = rsacr.rsacreate(rsa["hash"] + password, public_key)
-    data = setSign(data)
+    data = loginRequest.build(
+        access_key="",
+        gt_user_id="",
+        uid="",
+        challenge="",
+        user_id=account,
+        validate="",
+        seccode="",
+        pwd=rsacr.rsacreate(rsa["hash"] + password, public_key),
+    )
     logging.info(f"正在尝试登录B站账号: {account}")
     return await sendBiliPost(bililogin + "api/client/login", data)
 
 
 async def login2(account, password, challenge, gt_user, validate):
-    data = json.loads(rsaParam)
-    data = setSign(data)
-    rsa = await sendBiliPost(bililogin + "api/client/rsa", data)
-    data = json.loads(loginParam)
+    rsa = await getRsaKey()
     public_key = rsa["rsa_key"]
-    data["access_key"] = ""
-    data["gt_user_id"] = gt_user
-    data["uid"] = ""
-    data["challenge"] = challenge
-    data["user_id"] = account
-    data["validate"] = validate
-    data["seccode"] = validate + "|jordan"
-    data["pwd"] = rsacr.rsacreate(rsa["hash"] + password, public_key)
-    data = setSign(data)
+    data = loginRequest.build(
+        access_key="",
+        gt_user_id=gt_user,
+        uid="",
+        challenge=challenge,
+        user_id=account,
+        validate=validate,
+        seccode=validate + "|jordan",
+        pwd=rsacr.rsacreate(rsa["hash"] + password, public_key),
+    )
     logging.info(f"正在尝试二次登录B站账号: {account}")
     return await sendBiliPost(bililogin + "api/client/login", data)
 
 
 async def captcha():
-    data = json.loads(captchaParam)
-    data = setSign(data)
+    data = captchaRequest.build()
     return await sendBiliPost(bililogin + "api/client/start_captcha", data)
 
 
@@ -161,6 +199,9 @@ async def login(bili_account, bili_pwd, cap=None):
         login_sta = await login2(
             bili_account, bili_pwd, cap["challenge"], cap["userid"], cap["validate"]
         )
+        if login_sta and "access_key" not in login_sta:
+            # 通过验证码后仍失败时，不排除盐值已失效，下一次登录重新获取
+            invalidateRsaKey()
     else:
         login_sta = await login1(bili_account, bili_pwd)
 
@@ -3,16 +3,19 @@ import asyncio
 import hashlib
 import hmac
 import json
-import requests
 import time
 import logging
 
 # 本地模块 imports
 from ...dependency_container import get_version_manager
+from ...utils.cache_utils import api_cache
+from ...utils.http_client import http_client
+from .request_builder import SignedJsonTemplate
 
 version_manager = get_version_manager()
 
-url = "https://api-sdk.mihoyo.com/bh3_cn/combo/granter/login/v2/login"
+apiBase = "https://api-sdk.mihoyo.com"
+url = apiBase + "/bh3_cn/combo/granter/login/v2/login"
 verifyBody = (
     '{"device":"0000000000000000","app_id":"1","channel_id":"14","data":{},"sign":""}'
 )
@@ -24,21 +27,29 @@ scanExtR = '{"data":{}}'
 scanDataR = '{"accountType":"2","accountID":"","accountToken":"","dispatch":{}}'
 scanCheckR = '{"app_id":"1","device":"0000000000000000","ticket":"abab","ts":1637593776066,"sign":"abab"}'
 
-local_dispatch = json.loads("{}")
 local_bh_ver = "5.8.0"
-has_dispatch = False
-has_bh_ver = False
+
+versionApi = "https://api-v2.scanner.hellocraft.xyz/v4/hi3_version"
+oaServerApi = "https://outer-dp-bb01.bh3.com/query_gameserver?"
+# 接口缓存有效期（秒）：过期后先返回旧值并在后台刷新
+BH_VER_TTL = 6 * 3600
+DISPATCH_TTL = 24 * 3600
+MIN_DISPATCH_LENGTH = 100
+# 已验证会话（verify 成功返回的登录令牌）的有效期（秒）
+SESSION_TTL = 30 * 60
+SESSION_FIELDS = ("combo_id", "open_id", "combo_token")
+
+BH3_SIGN_KEY = b"0ebc517adb1b62c6b408df153331f9aa"
 
 
 def bh3Sign(data):
     """生成崩坏3 API请求的HMAC-SHA256签名"""
-    key = "0ebc517adb1b62c6b408df153331f9aa"
-    sign = hmac.new(key.encode(), data.encode(), hashlib.sha256).hexdigest()
+    sign = hmac.new(BH3_SIGN_KEY, data.encode(), hashlib.sha256).hexdigest()
     return sign
 
 
 def makeSign(data):
-    """为API请求数据生成签名并添加到原始数据中"""
+    """为API请求数据生成签名并添加到原始数据中（请求构造模板的参考实现）"""
     sign = ""
     data2 = ""
     for key in sorted(data):
@@ -51,22 +62,36 @@ def makeSign(data):
     return data
 
 
+# 预编译的请求模板（动态字段按原赋值顺序列出）与只解析一次的嵌套模板
+verifyRequest = SignedJsonTemplate(verifyBody, bh3Sign, dynamic=("data",))
+scanCheckRequest = SignedJsonTemplate(scanCheckR, bh3Sign, dynamic=("ticket", "ts"))
+scanResultRequest = SignedJsonTemplate(
+    scanResultR, bh3Sign, dynamic=("payload", "ts", "ticket")
+)
+verifyDataFields = json.loads(verifyData)
+scanPayloadFields = json.loads(scanPayloadR)
+scanRawFields = json.loads(scanRawR)
+scanExtFields = json.loads(scanExtR)
+scanDataFields = json.loads(scanDataR)
+
+
 async def getBHVer(cache_bh_ver=None):
-    """获取崩坏3当前版本号（优先使用缓存）"""
-    global has_bh_ver, local_bh_ver
+    """
+    获取崩坏3当前版本号（优先使用接口缓存）
+    :param cache_bh_ver: 获取失败且无缓存时使用的本地版本号
+    """
+    global local_bh_ver
 
-    if has_bh_ver:
-        return local_bh_ver
-    feedback = await sendGet(
-        "https://api-v2.scanner.hellocraft.xyz/v4/hi3_version", cache_bh_ver
-    )
-    if feedback == cache_bh_ver:
-        local_bh_ver = cache_bh_ver["bh_ver"]
+    async def fetch():
+        feedback = await sendGet(versionApi)
+        return feedback.get("version") if isinstance(feedback, dict) else None
+
+    bh_ver = await api_cache.get_or_fetch("hi3_version", fetch, BH_VER_TTL)
+    if bh_ver is None:
         logging.warning("获取版本号失败，使用缓存版本号")
-    else:
-        local_bh_ver = feedback["version"]
-    has_bh_ver = True
-    return local_bh_ver
+        return cache_bh_ver or local_bh_ver
+    local_bh_ver = bh_ver
+    return bh_ver
 
 
 async def getOAServer(oa_token=None):
@@ -76,18 +101,13 @@ async def getOAServer(oa_token=None):
     实现逻辑：
     1. 获取当前游戏版本号
     2. 从 version_manager 中获取对应版本的 dispatch 字段
-       若存在且非空，则直接使用并缓存。
+       若存在且非空，则直接使用。
     3. 若无预设 dispatch，则使用对应版本的 oa_token 通过 OA 服务器接口获取分发信息：
        - 拼接 OA 服务器接口 https://outer-dp-bb01.bh3.com/query_gameserver?version=xxx&token=oa_token
        - 以 oa_token 作为 token 参数，发起 GET 请求，返回 dispatch 字段内容。
-       - 缓存结果。
+       - 结果按游戏版本写入接口缓存。
     4. 若两种方式均不可用，则返回空 JSON 字符串。
     """
-    global has_dispatch, local_dispatch
-
-    if has_dispatch:
-        return local_dispatch
-
     # 获取当前游戏版本
     bh_ver = await getBHVer()
 
@@ -95,8 +115,6 @@ async def getOAServer(oa_token=None):
     dispatch = version_manager.get_dispatch_for_version(bh_ver)
     if dispatch and dispatch.strip():
         logging.debug(f"从 version.json 获取 {bh_ver} 版本的 dispatch 成功")
-        has_dispatch = True
-        local_dispatch = dispatch
         return dispatch
     else:
         logging.debug(f"version.json 中无 {bh_ver} 版本的有效 dispatch 字段")
@@ -107,25 +125,34 @@ async def getOAServer(oa_token=None):
         logging.error(f"version.json 中无 {bh_ver} 版本的有效 oa_token")
         return "{}"
 
-    oa_main_url = "https://outer-dp-bb01.bh3.com/query_gameserver?"
-    param = f"version={bh_ver}_gf_android_bilibili&token={oa_token}"
-    dispatch = await sendGetRaw(oa_main_url + param, "")
+    async def fetch():
+        param = f"version={bh_ver}_gf_android_bilibili&token={oa_token}"
+        dispatch = await sendGetRaw(oaServerApi + param, "")
+        # 过短的响应为错误信息，不写入缓存
+        return dispatch if dispatch and len(dispatch) >= MIN_DISPATCH_LENGTH else None
+
+    dispatch = await api_cache.get_or_fetch(
+        f"oa_dispatch:{bh_ver}", fetch, DISPATCH_TTL
+    )
+    return dispatch if dispatch is not None else "{}"
+
 
-    has_dispatch = True
-    local_dispatch = dispatch
-    return dispatch
+def isVersionError(feedback):
+    """判断接口返回是否为版本相关错误"""
+    message = str(feedback.get("message", ""))
+    return "版本" in message or "version" in message.lower()
+
+
+def invalidateVersionCache():
+    """清除版本号与 OA 分发信息缓存（游戏版本更新后缓存失效时调用）"""
+    api_cache.invalidate("hi3_version")
+    api_cache.invalidate("oa_dispatch:")
 
 
 async def scanCheck(bh_info, ticket, config):
     """验证崩坏3登录二维码并触发扫码确认"""
-    check = json.loads(scanCheckR)
-    check["ticket"] = ticket
-    check["ts"] = int(time.time())
-    check = makeSign(check)
-    post_body = json.dumps(check).replace(" ", "")
-    feedback = await sendPost(
-        "https://api-sdk.mihoyo.com/bh3_cn/combo/panda/qrcode/scan", post_body
-    )
+    post_body = scanCheckRequest.build(ticket=ticket, ts=int(time.time()))
+    feedback = await sendPost(apiBase + "/bh3_cn/combo/panda/qrcode/scan", post_body)
     if feedback["retcode"] != 0:
         logging.info("请求错误！可能是二维码已过期")
         logging.info(f"{feedback}")
@@ -137,29 +164,24 @@ async def scanCheck(bh_info, ticket, config):
 async def scanConfirm(bhinfoR, ticket, config):
     """确认崩坏3二维码扫描并完成登录流程"""
     bhinfo = bhinfoR["data"]
-    scan_result = json.loads(scanResultR)
-    scan_data = json.loads(scanDataR)
     dispatch = await getOAServer(bhinfo["open_id"])
+    scan_data = dict(scanDataFields)
     scan_data["dispatch"] = dispatch
     scan_data["accountID"] = bhinfo["open_id"]
     scan_data["accountToken"] = bhinfo["combo_token"]
-    scan_ext = json.loads(scanExtR)
+    scan_ext = dict(scanExtFields)
     scan_ext["data"] = scan_data
-    scan_raw = json.loads(scanRawR)
+    scan_raw = dict(scanRawFields)
     scan_raw["open_id"] = bhinfo["open_id"]
     scan_raw["combo_id"] = bhinfo["combo_id"]
     scan_raw["combo_token"] = bhinfo["combo_token"]
-    scan_payload = json.loads(scanPayloadR)
+    scan_payload = dict(scanPayloadFields)
     scan_payload["raw"] = json.dumps(scan_raw)
     scan_payload["ext"] = json.dumps(scan_ext)
-    scan_result["payload"] = scan_payload
-    scan_result["ts"] = int(time.time())
-    scan_result["ticket"] = ticket
-    scan_result = makeSign(scan_result)
-    post_body = json.dumps(scan_result).replace(" ", "")
-    feedback = await sendPost(
-        "https://api-sdk.mihoyo.com/bh3_cn/combo/panda/qrcode/confirm", post_body
+    post_body = scanResultRequest.build(
+        payload=scan_payload, ts=int(time.time()), ticket=ticket
     )
+    feedback = await sendPost(apiBase + "/bh3_cn/combo/panda/qrcode/confirm", post_body)
     if feedback["retcode"] == 0:
         logging.info("扫码成功！")
         return True
@@ -167,33 +189,65 @@ async def scanConfirm(bhinfoR, ticket, config):
     else:
         logging.info("扫码失败！")
         logging.info(f"{feedback}")
+        if isVersionError(feedback):
+            logging.warning("扫码失败原因为版本不匹配，已清除版本号与 OA 服务器缓存")
+            invalidateVersionCache()
+        else:
+            # 登录令牌可能已失效，下次启动时重新验证账号
+            invalidateSession()
         return False
 
 
 async def verify(uid, access_key):
-    """验证B站账号并获取崩坏3登录令牌"""
+    """验证B站账号并获取崩坏3登录令牌（成功时写入已验证会话缓存）"""
     logging.debug(f"verify with uid={uid}")
-    data = json.loads(verifyData)
+    data = dict(verifyDataFields)
     data["uid"] = uid
     data["access_key"] = access_key
-    body = json.loads(verifyBody)
-    body["data"] = json.dumps(data)
-    body = makeSign(body)
-    feedback = await sendPost(url, json.dumps(body).replace(" ", ""))
+    post_body = verifyRequest.build(data=json.dumps(data))
+    feedback = await sendPost(url, post_body)
+    if feedback and feedback.get("retcode") == 0:
+        session = {key: feedback["data"].get(key) for key in SESSION_FIELDS}
+        session["token_digest"] = sessionDigest(access_key)
+        api_cache.set(f"bh_session:{uid}", session)
     return feedback
 
 
+def sessionDigest(access_key):
+    """B站令牌的摘要（会话缓存只保存摘要，用于判断令牌是否变化）"""
+    return hashlib.sha256(str(access_key).encode()).hexdigest()
+
+
+def getCachedSession(uid, access_key):
+    """
+    读取已验证的会话
+    :return: 与 verify 返回格式相同的 {"retcode": 0, "data": {...}}；
+             无缓存、已过期或B站令牌已变化时返回 None
+    """
+    session, fresh = api_cache.get(f"bh_session:{uid}", SESSION_TTL)
+    if not fresh or session.get("token_digest") != sessionDigest(access_key):
+        return None
+    return {"retcode": 0, "data": {key: session[key] for key in SESSION_FIELDS}}
+
+
+def invalidateSession():
+    """清除已验证会话缓存（登录令牌失效时调用）"""
+    api_cache.invalidate("bh_session:")
+
+
+async def warmUp():
+    """预先建立到米哈游接口的连接（DNS、TCP 与 TLS 握手），供随后的登录与扫码请求复用"""
+    await http_client.warm_up(apiBase)
+
+
 async def sendPost(target, data, noReturn=False):
     logging.debug(f"米哈游POST请求 - URL: {target}")
     logging.debug(f"米哈游POST请求 - 数据: {data}")
     try:
-        session = requests.Session()
-        res = session.post(url=target, data=data)
+        # 超时与重试由 http_client 的重试策略统一处理
+        res = await http_client.apost(target, data=data)
         if noReturn:
             return
-        if res is None:
-            logging.debug("请求错误，正在重试...")
-            return await sendPost(target, data, noReturn)
         return res.json()
     except Exception as e:
         logging.error(f"POST 请求失败: {e}")
@@ -203,12 +257,8 @@ async def sendPost(target, data, noReturn=False):
 async def sendGet(target, default_ret=None):
     logging.debug(f"米哈游GET请求 - URL: {target}")
     try:
-        session = requests.Session()
-        res = session.get(url=target)
-        if res is None:
-            logging.debug("请求错误，正在重试...")
-            return await sendGet(target, default_ret)
-        return res.json()
+        # 响应不是有效 JSON 时同样按重试策略重试
+        return await http_client.aget(target, parse=lambda res: res.json())
     except Exception as e:
         logging.error(f"GET 请求失败: {e}")
         return default_ret
@@ -217,11 +267,7 @@ async def sendGet(target, default_ret=None):
 async def sendGetRaw(target, default_ret=None):
     logging.debug(f"米哈游GET原始请求 - URL: {target}")
     try:
-        session = requests.Session()
-        res = session.get(url=target)
-        if res is None:
-            logging.debug("请求错误，正在重试...")
-            return await sendGetRaw(target, default_ret)
+        res = await http_client.aget(target)
         return res.text
     except Exception as e:
         logging.error(f"GET 原始请求失败: {e}")
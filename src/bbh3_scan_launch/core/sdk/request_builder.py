@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+SDK 请求构造
+请求模板只解析一次：预先确定字段顺序与签名所需的排序顺序，并把模板中不变的字段
+预先拼接成静态片段，每次请求只需填入动态字段，再用一次 join 生成请求体与签名原文。
+输出与 bsgamesdk.setSign / mihoyosdk.makeSign 逐字节一致
+"""
+
+import json
+import time
+import urllib.parse
+
+
+def _compile(pieces):
+    """
+    合并相邻的静态片段
+    :param pieces: [(静态文本, 动态字段名或 None)]，动态字段的值渲染在静态文本之后
+    :return: [(静态文本, 紧随其后的动态字段名或 None)]
+    """
+    plan = []
+    static = ""
+    for text, key in pieces:
+        static += text
+        if key is not None:
+            plan.append((static, key))
+            static = ""
+    plan.append((static, None))
+    return plan
+
+
+def _render(plan, piece, values):
+    """按预编译的片段表生成文本，动态字段的值由 piece(key, value) 渲染"""
+    parts = []
+    for static, key in plan:
+        parts.append(static)
+        if key is not None:
+            parts.append(piece(key, values[key]))
+    return "".join(parts)
+
+
+def _str_piece(key, value):
+    return f"{value}"
+
+
+class SignedFormTemplate:
+    """
+    B站表单请求模板（对应 bsgamesdk.setSign）
+    - 请求体为按模板字段顺序拼接的 key=value&，pwd 字段先写入 URL 编码值再写入原值
+    - 签名为按字段名排序后的字段值拼接，交给 sign 函数计算
+    - timestamp 与 client_timestamp 在每次构造时自动填入当前时间
+    """
+
+    TIMESTAMP_KEYS = ("timestamp", "client_timestamp")
+
+    def __init__(self, template, sign, dynamic=()):
+        """
+        :param template: JSON 格式的请求模板
+        :param sign: 签名函数，参数为签名原文，返回签名
+        :param dynamic: 每次请求需要填入的字段（按赋值顺序，模板中没有的字段依次追加到末尾）
+        """
+        fields = json.loads(template)
+        for key in (*dynamic, *self.TIMESTAMP_KEYS):
+            fields.setdefault(key, None)
+        self.sign = sign
+        self.dynamic = set(dynamic)
+        variable = self.dynamic | set(self.TIMESTAMP_KEYS)
+        self._body_plan = _compile(
+            (
+                (f"{key}=", key)
+                if key in variable
+                else (self._body_piece(key, value), None)
+            )
+            for key, value in fields.items()
+        )
+        self._sign_plan = _compile(
+            ("", key) if key in variable else (f"{fields[key]}", None)
+            for key in sorted(fields)
+        )
+
+    @staticmethod
+    def _value_piece(key, value):
+        if key == "pwd":
+            return f"{urllib.parse.quote(value)}&pwd={value}&"
+        return f"{value}&"
+
+    @classmethod
+    def _body_piece(cls, key, value):
+        return f"{key}={cls._value_piece(key, value)}"
+
+    def build(self, **values):
+        """
+        构造带签名的请求体
+        :param values: 动态字段的值
+        :return: 请求体字符串
+        """
+        missing = self.dynamic.difference(values)
+        if missing:
+            raise KeyError(f"缺少请求字段: {', '.join(sorted(missing))}")
+        now = int(time.time())
+        for key in self.TIMESTAMP_KEYS:
+            values[key] = now
+        body = _render(self._body_plan, self._value_piece, values)
+        sign = self.sign(_render(self._sign_plan, _str_piece, values))
+        return body + "sign=" + sign
+
+
+class SignedJsonTemplate:
+    """
+    米哈游 JSON 请求模板（对应 mihoyosdk.makeSign 与 json.dumps(...).replace(" ", "")）
+    - 签名原文为按字段名排序（不含 sign）的 key=value&，去掉末尾的 & 与全部空格
+    - 请求体为去掉全部空格的 JSON，sign 字段位于模板中的原有位置
+    """
+
+    def __init__(self, template, sign, dynamic=()):
+        """
+        :param template: JSON 格式的请求模板
+        :param sign: 签名函数，参数为签名原文，返回签名
+        :param dynamic: 每次请求需要填入的字段（按赋值顺序，模板中没有的字段依次追加到末尾）
+        """
+        fields = json.loads(template)
+        for key in (*dynamic, "sign"):
+            fields.setdefault(key, None)
+        self.sign = sign
+        self.dynamic = set(dynamic)
+        variable = self.dynamic | {"sign"}
+        # 空格对删除操作是逐字符独立的，可以在片段内提前去掉
+        pieces = [("{", None)]
+        for index, (key, value) in enumerate(fields.items()):
+            prefix = ("," if index else "") + f"{json.dumps(key)}:".replace(" ", "")
+            if key in variable:
+                pieces.append((prefix, key))
+            else:
+                pieces.append((prefix + self._value_piece(key, value), None))
+        pieces.append(("}", None))
+        self._body_plan = _compile(pieces)
+        # 签名原文先去掉末尾的 & 再去掉空格，静态片段保留原文以保证结果一致
+        self._sign_plan = _compile(
+            (f"{key}=", key) if key in variable else (f"{key}={fields[key]}&", None)
+            for key in sorted(fields)
+            if key != "sign"
+        )
+
+    @staticmethod
+    def _value_piece(key, value):
+        return json.dumps(value).replace(" ", "")
+
+    @staticmethod
+    def _sign_piece(key, value):
+        return f"{value}&"
+
+    def build(self, **values):
+        """
+        构造带签名的请求体
+        :param values: 动态字段的值
+        :return: 请求体字符串
+        """
+        missing = self.dynamic.difference(values)
+        if missing:
+            raise KeyError(f"缺少请求字段: {', '.join(sorted(missing))}")
+        source = _render(self._sign_plan, self._sign_piece, values)
+        values["sign"] = self.sign(source.rstrip("&").replace(" ", ""))
+        return _render(self._body_plan, self._value_piece, values)
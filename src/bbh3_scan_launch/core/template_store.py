@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+模板加载与缓存
+模板图片按文件名中的分辨率标识缩放到当前屏幕高度；多个模板在线程池中并行加载，
+缩放结果以 .npy 数组保存在缓存目录，之后启动直接读取，无需重新解码与缩放
+"""
+
+import logging
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from ..constants import TEMPLATE_CACHE_DIR_PATH
+
+TEMPLATE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+
+
+def source_resolution(filename):
+    """从模板文件名中提取源分辨率（如 1260p），缺少标识时返回 None"""
+    match = re.search(r"(\d+)p", filename)
+    return int(match.group(1)) if match else None
+
+
+class TemplateStore:
+    """
+    缩放模板的加载器
+    - 缓存文件名包含模板文件的修改时间、源分辨率与目标屏幕高度，
+      任一项变化都会重新缩放，旧的缓存文件在写入新缓存时删除
+    - 缓存目录不可写时仍正常加载，只是每次启动都重新缩放
+    """
+
+    def __init__(self, template_dir, cache_dir=TEMPLATE_CACHE_DIR_PATH, max_workers=4):
+        """
+        :param template_dir: 模板图片目录
+        :param cache_dir: 缩放结果缓存目录，为 None 时不使用缓存
+        :param max_workers: 并行加载的线程数
+        """
+        self.template_dir = template_dir
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def template_files(self):
+        """模板目录中带有效分辨率标识的图片文件名"""
+        files = []
+        for filename in sorted(os.listdir(self.template_dir)):
+            if not filename.lower().endswith(TEMPLATE_EXTENSIONS):
+                continue
+            if not source_resolution(filename):
+                logging.warning(f"跳过文件（缺少有效分辨率标识）: {filename}")
+                continue
+            files.append(filename)
+        return files
+
+    def cache_path(self, filename, mtime_ns, target_height):
+        """缩放结果的缓存文件路径"""
+        return os.path.join(
+            self.cache_dir,
+            f"{filename}.{mtime_ns}.{source_resolution(filename)}p-{target_height}p.npy",
+        )
+
+    def _read_cache(self, path):
+        try:
+            array = np.load(path, allow_pickle=False)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logging.debug(f"模板缓存损坏，重新缩放: {path} - {e}")
+            return None
+        return array if array.dtype == np.uint8 and array.ndim == 2 else None
+
+    def _write_cache(self, filename, path, array):
+        """原子写入缓存文件，并删除同一模板的旧缓存"""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_path = path + ".tmp"
+            with open(temp_path, "wb") as f:
+                np.save(f, array, allow_pickle=False)
+            os.replace(temp_path, path)
+            for name in os.listdir(self.cache_dir):
+                stale = os.path.join(self.cache_dir, name)
+                if name.startswith(filename + ".") and stale != path:
+                    os.remove(stale)
+        except OSError as e:
+            logging.debug(f"写入模板缓存失败: {filename} - {e}")
+
+    def _scale(self, file_path, src_resolution, target_height):
+        """读取模板图片并缩放到目标屏幕高度（LANCZOS）"""
+        template_img = Image.open(file_path).convert("L")
+        scale_factor = target_height / src_resolution
+        new_width = int(template_img.width * scale_factor)
+        new_height = int(template_img.height * scale_factor)
+        scaled = template_img.resize((new_width, new_height), Image.LANCZOS)
+        return np.ascontiguousarray(np.asarray(scaled, dtype=np.uint8))
+
+    def load(self, filename, target_height):
+        """
+        加载单个模板（优先读取缓存）
+        :return: 缩放后的 uint8 灰度数组，失败时返回 None
+        """
+        file_path = os.path.join(self.template_dir, filename)
+        try:
+            mtime_ns = os.stat(file_path).st_mtime_ns
+            path = None
+            if self.cache_dir:
+                path = self.cache_path(filename, mtime_ns, target_height)
+                array = self._read_cache(path)
+                if array is not None:
+                    with self._lock:
+                        self.cache_hits += 1
+                    return array
+            array = self._scale(file_path, source_resolution(filename), target_height)
+        except Exception as e:
+            logging.warning(f"加载或缩放模板出错: {filename}, {e}")
+            return None
+        with self._lock:
+            self.cache_misses += 1
+        if path:
+            self._write_cache(filename, path, array)
+        return array
+
+    def load_all(self, target_height):
+        """
+        并行加载全部模板
+        :return: {文件名: 缩放后的 uint8 灰度数组}（加载失败的模板不包含在内）
+        """
+        files = self.template_files()
+        if not files:
+            return {}
+        with ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(files)),
+            thread_name_prefix="template_loader",
+        ) as executor:
+            arrays = executor.map(lambda name: self.load(name, target_height), files)
+            return {
+                name: array for name, array in zip(files, arrays) if array is not None
+            }
+
+    def stats(self):
+        """缓存命中统计"""
+        return {"cache_hits": self.cache_hits, "cache_misses": self.cache_misses}
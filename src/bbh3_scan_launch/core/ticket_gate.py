@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+扫码票据去重
+同一二维码可能同时出现在游戏画面与剪贴板中，或在画面中停留多个轮询周期，
+每次识别都会得到相同的票据；去重后每个票据只发起一次扫码验证
+"""
+
+import logging
+import time
+
+
+class TicketGate:
+    """
+    扫码票据闸门
+    - 同一票据的扫码验证进行中时，重复的票据直接被抑制（同一时刻只有一次请求）
+    - 完成扫码验证的票据在 ttl 秒内再次出现时同样被抑制
+    - 扫码验证出错（未完成）的票据不计入已提交集合，可以再次提交
+    """
+
+    def __init__(self, ttl=120.0, clock=time.monotonic):
+        """
+        :param ttl: 已提交票据的记忆时间（秒）
+        :param clock: 时钟函数（可替换为模拟时钟）
+        """
+        self.ttl = ttl
+        self.clock = clock
+        self._in_flight = set()
+        self._seen = {}
+        self.submitted = 0
+        self.suppressed_in_flight = 0
+        self.suppressed_seen = 0
+
+    def _prune(self):
+        now = self.clock()
+        self._seen = {
+            ticket: seen_at
+            for ticket, seen_at in self._seen.items()
+            if now - seen_at < self.ttl
+        }
+
+    def admit(self, ticket):
+        """
+        判断票据是否可以提交，可以提交时标记为进行中
+        :return: 可以提交时为 True；进行中或 ttl 内已提交过时为 False
+        """
+        if ticket in self._in_flight:
+            self.suppressed_in_flight += 1
+            logging.debug("相同票据的扫码验证正在进行，已忽略")
+            return False
+        self._prune()
+        if ticket in self._seen:
+            self.suppressed_seen += 1
+            logging.debug("票据已提交过扫码验证，已忽略")
+            return False
+        self._in_flight.add(ticket)
+        self.submitted += 1
+        return True
+
+    def release(self, ticket, completed=True):
+        """
+        扫码验证结束后调用
+        :param completed: 扫码验证是否完成（出错时为 False，票据可再次提交）
+        """
+        self._in_flight.discard(ticket)
+        if completed:
+            self._seen[ticket] = self.clock()
+
+    def stats(self):
+        """提交统计"""
+        return {
+            "submitted": self.submitted,
+            "suppressed": self.suppressed_in_flight + self.suppressed_seen,
+            "suppressed_in_flight": self.suppressed_in_flight,
+            "suppressed_seen": self.suppressed_seen,
+        }
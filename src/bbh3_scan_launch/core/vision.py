@@ -0,0 +1,636 @@
+# -*- coding: utf-8 -*-
+"""
+视觉算法工具
+提供与平台无关的画面帧封装、模板匹配（图像金字塔 + 由粗到精搜索）与帧变化检测，
+仅依赖 numpy/cv2，便于在非 Windows 环境下基准测试
+"""
+
+import os
+import time
+from abc import ABC, abstractmethod
+
+import cv2
+import numpy as np
+from PIL import Image
+
+# 粗匹配可选的缩放倍数（从粗到细依次尝试）
+PYRAMID_SCALES = (8, 4, 2)
+# 粗匹配层中模板最短边的下限（像素），过小会导致候选定位失真
+MIN_COARSE_TEMPLATE_SIDE = 16
+# 粗匹配层保留的候选数量
+COARSE_CANDIDATES = 3
+# 粗匹配候选的置信度下限（相对匹配阈值的比例）
+COARSE_THRESHOLD_RATIO = 0.5
+# ROI 记忆：在上次命中框四周扩展的余量（相对模板尺寸的比例）及最小像素数
+ROI_PADDING_RATIO = 0.25
+ROI_MIN_PADDING = 8
+
+
+def to_gray_array(image):
+    """将 Frame、PIL 图像或 numpy 数组转换为连续的 uint8 灰度数组"""
+    if isinstance(image, Frame):
+        return image.gray
+    if isinstance(image, np.ndarray):
+        array = image
+    else:
+        if getattr(image, "mode", "L") != "L":
+            image = image.convert("L")
+        array = np.asarray(image)
+    if array.dtype != np.uint8:
+        array = array.astype(np.uint8)
+    return np.ascontiguousarray(array)
+
+
+def choose_pyramid_scale(width, height):
+    """根据模板尺寸选择粗匹配缩放倍数，模板过小时返回 1（即不使用金字塔）"""
+    for scale in PYRAMID_SCALES:
+        if min(width, height) // scale >= MIN_COARSE_TEMPLATE_SIDE:
+            return scale
+    return 1
+
+
+def _downscale(image, scale):
+    """按整数倍缩小图像（INTER_AREA 可抑制混叠）"""
+    height, width = image.shape[:2]
+    size = (max(1, width // scale), max(1, height // scale))
+    return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+
+class Frame:
+    """
+    单次捕获的画面帧
+    每个监控周期只捕获一次，并交给模板匹配、变化检测与二维码解析等所有使用方；
+    灰度、RGB 视图与图像金字塔均按需生成并缓存在帧上
+    """
+
+    def __init__(self, image, timestamp=None):
+        """
+        :param image: 捕获得到的 PIL 图像（也接受灰度/RGB numpy 数组）
+        :param timestamp: 捕获时间（time.monotonic()），默认为当前时间
+        """
+        if isinstance(image, np.ndarray):
+            image = Image.fromarray(image)
+        self._image = image
+        self._bgrx = None
+        self.timestamp = time.monotonic() if timestamp is None else timestamp
+        self._gray = None
+        self._rgb = None
+        self._pyramid = None
+
+    @classmethod
+    def from_bgrx(cls, pixels, timestamp=None):
+        """
+        由窗口截图的 BGRX 像素（形如 (高, 宽, 4) 的 uint8 数组）构建帧
+        像素数组可能指向截图复用的缓冲区，帧只在下一次截图前有效
+        """
+        frame = cls(None, timestamp)
+        frame._bgrx = pixels
+        return frame
+
+    def detach(self):
+        """
+        使帧脱离截图复用的缓冲区，以便在下一次截图后继续使用（如交给其他线程分析）
+        直接生成灰度视图并释放对 BGRX 缓冲区的引用，此后的 RGB 视图由灰度图生成
+        """
+        if self._bgrx is not None:
+            gray = self.gray
+            self._image = Image.fromarray(gray)
+            self._bgrx = None
+            self._rgb = None
+        return self
+
+    @property
+    def size(self):
+        """帧尺寸 (宽, 高)"""
+        if self._bgrx is not None:
+            return self._bgrx.shape[1], self._bgrx.shape[0]
+        return self._image.size
+
+    @property
+    def gray(self):
+        """灰度视图（连续 uint8 数组）"""
+        if self._gray is None:
+            if self._bgrx is not None:
+                # 直接由 BGRX 缓冲区加权求和得到灰度，仅产生一次输出拷贝
+                self._gray = cv2.cvtColor(self._bgrx, cv2.COLOR_BGRA2GRAY)
+            else:
+                self._gray = np.ascontiguousarray(np.asarray(self._image.convert("L")))
+        return self._gray
+
+    @property
+    def rgb(self):
+        """RGB 视图（PIL 图像，供 pyzbar 使用）"""
+        if self._rgb is None:
+            if self._bgrx is not None:
+                self._rgb = Image.frombuffer(
+                    "RGB", self.size, self._bgrx, "raw", "BGRX", 0, 1
+                )
+            elif self._image.mode == "RGB":
+                self._rgb = self._image
+            else:
+                self._rgb = self._image.convert("RGB")
+        return self._rgb
+
+    @property
+    def pyramid(self):
+        """灰度图像金字塔"""
+        if self._pyramid is None:
+            self._pyramid = ImagePyramid(self.gray)
+        return self._pyramid
+
+
+class ImagePyramid:
+    """
+    屏幕图像金字塔
+    每帧只构建一次，各缩放层按需生成并缓存，供所有模板共享
+    """
+
+    def __init__(self, image):
+        self.base = to_gray_array(image)
+        self._levels = {1: self.base}
+
+    @property
+    def shape(self):
+        return self.base.shape
+
+    def level(self, scale):
+        """获取指定缩放倍数的图像层"""
+        if scale not in self._levels:
+            self._levels[scale] = _downscale(self.base, scale)
+        return self._levels[scale]
+
+
+class PreparedTemplate:
+    """
+    预处理后的模板
+    保存全分辨率数组及其粗匹配层，只需构建一次
+    """
+
+    def __init__(self, name, image):
+        self.name = name
+        self.array = to_gray_array(image)
+        self.height, self.width = self.array.shape[:2]
+        self.scale = choose_pyramid_scale(self.width, self.height)
+        self.coarse = (
+            _downscale(self.array, self.scale) if self.scale > 1 else self.array
+        )
+
+
+def _result_buffer(buffers, screen, template):
+    """按匹配结果尺寸从缓冲区字典中取出（或创建）可复用的结果数组"""
+    if buffers is None:
+        return None
+    shape = (
+        screen.shape[0] - template.shape[0] + 1,
+        screen.shape[1] - template.shape[1] + 1,
+    )
+    out = buffers.get(shape)
+    if out is None:
+        out = buffers[shape] = np.empty(shape, dtype=np.float32)
+    return out
+
+
+def _best_match(screen, template, buffers=None):
+    """
+    在 screen 中执行一次完整的模板匹配，返回 (左上角坐标, 置信度)
+    :param buffers: 可选的结果缓冲区字典（按结果尺寸复用，避免逐次分配）
+    """
+    out = _result_buffer(buffers, screen, template)
+    result = cv2.matchTemplate(screen, template, cv2.TM_CCOEFF_NORMED, result=out)
+    _, max_val, _, max_loc = cv2.minMaxLoc(result)
+    return max_loc, max_val
+
+
+def _coarse_candidates(result, template_shape, count, floor):
+    """从粗匹配结果中提取互不重叠的若干候选峰值"""
+    candidates = []
+    t_height, t_width = template_shape
+    for _ in range(count):
+        _, max_val, _, (x, y) = cv2.minMaxLoc(result)
+        if max_val < floor and candidates:
+            break
+        candidates.append(((x, y), max_val))
+        # 抑制该峰值邻域，避免重复候选
+        result[
+            max(0, y - t_height // 2) : y + t_height // 2 + 1,
+            max(0, x - t_width // 2) : x + t_width // 2 + 1,
+        ] = -1.0
+    return candidates
+
+
+def match_brute_force(screen, template, buffers=None):
+    """
+    全分辨率暴力匹配
+    :return: (模板左上角坐标, 置信度)，屏幕小于模板时返回 (None, 0)
+    """
+    screen = screen.base if isinstance(screen, ImagePyramid) else screen
+    if screen.shape[0] < template.height or screen.shape[1] < template.width:
+        return None, 0
+    return _best_match(screen, template.array, buffers)
+
+
+def match_coarse_to_fine(pyramid, template, threshold=0.8, buffers=None):
+    """
+    由粗到精的模板匹配
+    先在 1/scale 分辨率下定位候选，再在全分辨率的小范围 ROI 内精确匹配
+    :return: (模板左上角坐标, 置信度)，屏幕小于模板时返回 (None, 0)
+    """
+    screen = pyramid.base
+    if screen.shape[0] < template.height or screen.shape[1] < template.width:
+        return None, 0
+
+    scale = template.scale
+    coarse_screen = pyramid.level(scale) if scale > 1 else screen
+    if (
+        scale == 1
+        or coarse_screen.shape[0] < template.coarse.shape[0]
+        or coarse_screen.shape[1] < template.coarse.shape[1]
+    ):
+        return _best_match(screen, template.array, buffers)
+
+    out = _result_buffer(buffers, coarse_screen, template.coarse)
+    result = cv2.matchTemplate(
+        coarse_screen, template.coarse, cv2.TM_CCOEFF_NORMED, result=out
+    )
+    candidates = _coarse_candidates(
+        result,
+        template.coarse.shape[:2],
+        COARSE_CANDIDATES,
+        threshold * COARSE_THRESHOLD_RATIO,
+    )
+
+    # 粗匹配中取整造成的偏移不超过 scale 像素，ROI 两侧各留 2*scale 余量
+    padding = 2 * scale
+    screen_height, screen_width = screen.shape[:2]
+    best_loc, best_val = None, -1.0
+    for (cx, cy), _ in candidates:
+        x0 = max(0, cx * scale - padding)
+        y0 = max(0, cy * scale - padding)
+        x1 = min(screen_width, cx * scale + template.width + padding)
+        y1 = min(screen_height, cy * scale + template.height + padding)
+        if x1 - x0 < template.width or y1 - y0 < template.height:
+            continue
+        (rx, ry), val = _best_match(screen[y0:y1, x0:x1], template.array, buffers)
+        if val > best_val:
+            best_loc, best_val = (x0 + rx, y0 + ry), val
+
+    if best_loc is None:
+        return None, max(0.0, candidates[0][1]) if candidates else 0
+    return best_loc, best_val
+
+
+class TemplateMatcher:
+    """
+    批量模板匹配器
+    模板在加载时预存为连续 uint8 数组；每帧只转换一次屏幕图像，
+    单次遍历全部模板，并复用匹配结果缓冲区，使每帧内存分配次数保持恒定；
+    同时记忆各模板上次命中的区域（按窗口尺寸归一化），优先在该区域附近搜索，
+    未命中时再回退到全帧搜索
+    """
+
+    # 结果缓冲区数量上限（窗口尺寸频繁变化时防止无限增长）
+    MAX_BUFFERS = 64
+
+    def __init__(self):
+        self.templates = {}  # 模板名 -> PreparedTemplate
+        self._buffers = {}
+        self._frame_shape = None
+        # ROI 记忆：模板名 -> 上次命中框 (x, y, w, h)，均为相对窗口尺寸的比例
+        self._roi_memory = {}
+        self.roi_hits = 0
+        self.roi_misses = 0
+
+    def __contains__(self, name):
+        return name in self.templates
+
+    def __iter__(self):
+        return iter(self.templates)
+
+    def __len__(self):
+        return len(self.templates)
+
+    def add(self, name, image):
+        """添加（或替换）模板"""
+        self.templates[name] = PreparedTemplate(name, image)
+        self._roi_memory.pop(name, None)
+
+    def clear(self):
+        """清空模板、缓冲区与 ROI 记忆"""
+        self.templates.clear()
+        self._buffers.clear()
+        self._roi_memory.clear()
+
+    def roi_stats(self):
+        """ROI 记忆命中统计"""
+        total = self.roi_hits + self.roi_misses
+        return {
+            "hits": self.roi_hits,
+            "misses": self.roi_misses,
+            "hit_rate": self.roi_hits / total if total else 0.0,
+        }
+
+    def _remember(self, name, loc, template, screen_shape):
+        """记录模板命中框（归一化到窗口尺寸）"""
+        screen_height, screen_width = screen_shape[:2]
+        self._roi_memory[name] = (
+            loc[0] / screen_width,
+            loc[1] / screen_height,
+            template.width / screen_width,
+            template.height / screen_height,
+        )
+
+    def _match_remembered(self, pyramid, template, threshold):
+        """
+        在上次命中框附近的 ROI 内匹配，开销与按钮尺寸成正比
+        :return: (模板左上角坐标, 置信度)；无记忆或未命中时坐标为 None
+        """
+        box = self._roi_memory.get(template.name)
+        if box is None:
+            return None, 0
+
+        screen = pyramid.base
+        screen_height, screen_width = screen.shape[:2]
+        pad_x = max(ROI_MIN_PADDING, int(template.width * ROI_PADDING_RATIO))
+        pad_y = max(ROI_MIN_PADDING, int(template.height * ROI_PADDING_RATIO))
+        x = int(round(box[0] * screen_width))
+        y = int(round(box[1] * screen_height))
+        x0, y0 = max(0, x - pad_x), max(0, y - pad_y)
+        x1 = min(screen_width, x + template.width + pad_x)
+        y1 = min(screen_height, y + template.height + pad_y)
+        if x1 - x0 < template.width or y1 - y0 < template.height:
+            self.roi_misses += 1
+            return None, 0
+
+        (rx, ry), val = _best_match(screen[y0:y1, x0:x1], template.array, self._buffers)
+        if val >= threshold:
+            self.roi_hits += 1
+            return (x0 + rx, y0 + ry), val
+        self.roi_misses += 1
+        return None, val
+
+    def _prepare_frame(self, screen):
+        """将屏幕图像转换为金字塔；帧尺寸变化时丢弃旧缓冲区"""
+        if isinstance(screen, Frame):
+            pyramid = screen.pyramid
+        elif isinstance(screen, ImagePyramid):
+            pyramid = screen
+        else:
+            pyramid = ImagePyramid(screen)
+        if pyramid.shape != self._frame_shape or len(self._buffers) > self.MAX_BUFFERS:
+            self._buffers.clear()
+            self._frame_shape = pyramid.shape
+        return pyramid
+
+    def _locate(self, pyramid, template, threshold):
+        """匹配单个模板，返回 (模板中心坐标 或 None, 置信度)"""
+        max_loc, max_val = self._match_remembered(pyramid, template, threshold)
+        if max_loc is None:
+            # ROI 未命中，回退到全帧由粗到精搜索
+            max_loc, max_val = match_coarse_to_fine(
+                pyramid, template, threshold, self._buffers
+            )
+        if max_loc is not None and max_val >= threshold:
+            self._remember(template.name, max_loc, template, pyramid.shape)
+            return (
+                max_loc[0] + template.width // 2,
+                max_loc[1] + template.height // 2,
+            ), max_val
+        return None, max_val
+
+    def match(self, name, screen, threshold=0.8):
+        """匹配指定模板，返回 (模板中心坐标 或 None, 置信度)"""
+        return self._locate(
+            self._prepare_frame(screen), self.templates[name], threshold
+        )
+
+    def match_all(self, screen, threshold=0.8, early_exit=False):
+        """
+        单次遍历匹配全部模板
+        :param early_exit: 为 True 时命中首个达到阈值的模板即返回
+        :return: 置信度最高的 (模板名, 中心坐标, 置信度)，无命中时返回 None
+        """
+        pyramid = self._prepare_frame(screen)
+        best = None
+        for name, template in self.templates.items():
+            location, confidence = self._locate(pyramid, template, threshold)
+            if location and (best is None or confidence > best[2]):
+                best = (name, location, confidence)
+                if early_exit:
+                    break
+        return best
+
+
+class FrameChangeDetector:
+    """
+    帧变化检测器
+    将帧缩小为低分辨率缩略图作为签名，与上次处理过的帧逐格比较；
+    画面无明显变化时可跳过模板匹配与二维码解析
+    """
+
+    def __init__(self, size=(64, 36), tolerance=8, force_interval=10):
+        """
+        :param size: 缩略图尺寸 (宽, 高)
+        :param tolerance: 单格灰度差阈值，超过即视为画面变化
+        :param force_interval: 连续跳过该次数后强制处理一帧（0 表示不强制）
+        """
+        self.size = size
+        self.tolerance = tolerance
+        self.force_interval = force_interval
+        self._last_signature = None
+        self._consecutive_skips = 0
+        self.checked = 0
+        self.skipped = 0
+
+    def signature(self, image):
+        """计算帧签名（INTER_AREA 缩略图，等价于逐格均值）"""
+        gray = image.base if isinstance(image, ImagePyramid) else to_gray_array(image)
+        return cv2.resize(gray, self.size, interpolation=cv2.INTER_AREA)
+
+    def has_changed(self, image):
+        """判断帧相对上次处理的帧是否有变化；有变化时将其记为新的参考帧"""
+        self.checked += 1
+        signature = self.signature(image)
+        if (
+            self._last_signature is not None
+            and self._last_signature.shape == signature.shape
+            and (
+                not self.force_interval or self._consecutive_skips < self.force_interval
+            )
+            and int(cv2.absdiff(signature, self._last_signature).max())
+            <= self.tolerance
+        ):
+            self.skipped += 1
+            self._consecutive_skips += 1
+            return False
+        self._last_signature = signature
+        self._consecutive_skips = 0
+        return True
+
+    def reset(self):
+        """清除参考帧（下一帧必定视为变化）"""
+        self._last_signature = None
+        self._consecutive_skips = 0
+
+    def stats(self):
+        """跳过统计"""
+        return {
+            "checked": self.checked,
+            "skipped": self.skipped,
+            "skip_ratio": self.skipped / self.checked if self.checked else 0.0,
+        }
+
+
+class FrameSource(ABC):
+    """
+    画面帧来源接口
+    ImageProcessor 通过该接口获取画面，从而可替换为窗口截图、录像回放或合成帧；
+    子类须实现 resolution 与 _grab
+    """
+
+    def __init__(self):
+        self.captures = 0  # 实际捕获次数
+
+    def is_available(self):
+        """画面来源当前是否可用（例如游戏窗口是否存在）"""
+        return True
+
+    @abstractmethod
+    def resolution(self):
+        """画面对应的屏幕分辨率 (宽, 高)，用于模板缩放与点击坐标限制"""
+
+    def grab(self):
+        """捕获一帧画面，失败时返回 None"""
+        if not self.is_available():
+            return None
+        self.captures += 1
+        return self._grab()
+
+    @abstractmethod
+    def _grab(self):
+        """捕获一帧画面（Frame），失败时返回 None"""
+
+
+class DirectoryFrameSource(FrameSource):
+    """
+    目录回放帧来源
+    按文件名顺序回放目录中的截图（png/jpg），用于在非 Windows 环境下复现录制的游戏会话
+    """
+
+    def __init__(self, directory, loop=False, resolution=None):
+        """
+        :param directory: 截图目录
+        :param loop: 回放结束后是否从头循环
+        :param resolution: 屏幕分辨率，默认取第一张截图的尺寸
+        """
+        super().__init__()
+        self.directory = directory
+        self.loop = loop
+        self.files = sorted(
+            os.path.join(directory, name)
+            for name in os.listdir(directory)
+            if name.lower().endswith((".png", ".jpg", ".jpeg"))
+        )
+        self.position = 0
+        self._resolution = resolution
+
+    def is_available(self):
+        if self.loop:
+            return bool(self.files)
+        return self.position < len(self.files)
+
+    def resolution(self):
+        if self._resolution is None:
+            if not self.files:
+                raise ValueError(f"回放目录中没有截图: {self.directory}")
+            with Image.open(self.files[0]) as image:
+                self._resolution = image.size
+        return self._resolution
+
+    def _grab(self):
+        path = self.files[self.position % len(self.files)]
+        self.position += 1
+        with Image.open(path) as image:
+            return Frame(image.convert("RGB"))
+
+
+class SyntheticFrameSource(FrameSource):
+    """
+    合成帧来源
+    由工厂函数按帧序号生成画面（PIL 图像或 numpy 数组），用于基准测试
+    """
+
+    def __init__(self, factory, size, count=None):
+        """
+        :param factory: 生成函数 factory(index) -> 图像
+        :param size: 屏幕分辨率 (宽, 高)
+        :param count: 帧总数，None 表示无限
+        """
+        super().__init__()
+        self.factory = factory
+        self.size = size
+        self.count = count
+        self.position = 0
+
+    def is_available(self):
+        return self.count is None or self.position < self.count
+
+    def resolution(self):
+        return self.size
+
+    def _grab(self):
+        image = self.factory(self.position)
+        self.position += 1
+        return Frame(image) if image is not None else None
+
+
+class QRLocator:
+    """
+    二维码定位器
+    在缩小的灰度帧上用 OpenCV 的 QRCodeDetector 检测定位图形，
+    仅返回候选区域（全分辨率坐标），供 pyzbar 在小范围内解码
+    """
+
+    def __init__(self, max_side=1280, margin_ratio=0.2):
+        """
+        :param max_side: 检测时缩小后图像的最长边（像素），过小会导致二维码模块无法分辨
+        :param margin_ratio: 候选区域四周扩展的余量（相对二维码边长的比例）
+        """
+        self.max_side = max_side
+        self.margin_ratio = margin_ratio
+        # 新版 OpenCV 提供基于 ArUco 的检测器，对复杂背景更稳健且更快
+        detector_class = getattr(cv2, "QRCodeDetectorAruco", cv2.QRCodeDetector)
+        self._detector = detector_class()
+
+    def locate(self, gray):
+        """
+        检测二维码位置
+        :return: 候选区域列表 [(x0, y0, x1, y1)]，未检测到时为空列表
+        """
+        height, width = gray.shape[:2]
+        scale = max(width, height) / self.max_side
+        if scale > 1:
+            small = cv2.resize(
+                gray,
+                (max(1, round(width / scale)), max(1, round(height / scale))),
+                interpolation=cv2.INTER_AREA,
+            )
+        else:
+            small, scale = gray, 1.0
+
+        found, points = self._detector.detect(small)
+        if not found or points is None:
+            return []
+
+        points = points.reshape(-1, 2) * scale
+        x0, y0 = points.min(axis=0)
+        x1, y1 = points.max(axis=0)
+        margin = max(x1 - x0, y1 - y0) * self.margin_ratio
+        box = (
+            max(0, int(x0 - margin)),
+            max(0, int(y0 - margin)),
+            min(width, int(x1 + margin) + 1),
+            min(height, int(y1 + margin) + 1),
+        )
+        if box[2] <= box[0] or box[3] <= box[1]:
+            return []
+        return [box]
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+游戏窗口监视
+缓存游戏窗口句柄，仅在缓存过期时用 IsWindow 校验或 FindWindow 重新查找，
+窗口出现/消失时通知订阅者，调用方查询的是内存中的状态而不是每次枚举全部窗口
+"""
+
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+
+try:
+    import win32gui
+    import win32process
+except ImportError:
+    win32gui = win32process = None
+
+
+class WindowBackend(ABC):
+    """窗口查询后端接口"""
+
+    @abstractmethod
+    def find_window(self, title):
+        """按标题查找顶层窗口，未找到时返回 0"""
+
+    @abstractmethod
+    def is_window(self, hwnd):
+        """句柄是否仍指向有效的可见窗口"""
+
+    def process_id(self, hwnd):
+        """窗口所属进程 ID，不支持时返回 None"""
+        return None
+
+
+class Win32WindowBackend(WindowBackend):
+    """Windows 窗口后端（FindWindow / IsWindow / IsWindowVisible）"""
+
+    def find_window(self, title):
+        if win32gui is None:
+            return 0
+        hwnd = win32gui.FindWindow(None, title)
+        return hwnd if hwnd and win32gui.IsWindowVisible(hwnd) else 0
+
+    def is_window(self, hwnd):
+        if win32gui is None:
+            return False
+        return bool(win32gui.IsWindow(hwnd)) and bool(win32gui.IsWindowVisible(hwnd))
+
+    def process_id(self, hwnd):
+        if win32process is None:
+            return None
+        return win32process.GetWindowThreadProcessId(hwnd)[1]
+
+
+class ScriptedWindowBackend(WindowBackend):
+    """
+    脚本化窗口后端
+    窗口句柄由调用方直接设置，并记录后端调用次数，用于在非 Windows 环境下验证缓存行为
+    """
+
+    def __init__(self, hwnd=0, pid=None):
+        self.hwnd = hwnd
+        self.pid = pid
+        self.calls = 0
+
+    def find_window(self, title):
+        self.calls += 1
+        return self.hwnd
+
+    def is_window(self, hwnd):
+        self.calls += 1
+        return bool(hwnd) and hwnd == self.hwnd
+
+    def process_id(self, hwnd):
+        return self.pid
+
+
+class WindowWatcher:
+    """
+    窗口监视器
+    - 缓存窗口句柄与所属进程 ID，ttl 秒内的查询直接返回缓存
+    - 缓存过期后先用 IsWindow 校验旧句柄，失效时才用 FindWindow 重新查找
+    - 窗口出现、消失或句柄变化时调用订阅的回调 callback(hwnd, pid)
+    - 截图线程、分析线程与事件循环会同时查询，缓存的读写由锁保护
+    """
+
+    def __init__(self, title, backend=None, ttl=0.5, clock=time.monotonic):
+        """
+        :param title: 窗口标题
+        :param backend: 窗口查询后端，默认为 Windows 后端
+        :param ttl: 缓存有效期（秒）
+        :param clock: 时钟函数（可替换为模拟时钟）
+        """
+        self.title = title
+        self.backend = backend or Win32WindowBackend()
+        self.ttl = ttl
+        self.clock = clock
+        self._hwnd = 0
+        self._pid = None
+        self._checked_at = None
+        self._subscribers = []
+        self._lock = threading.RLock()  # 回调中可能再次查询，使用可重入锁
+        self.queries = 0
+        self.refreshes = 0
+
+    def subscribe(self, callback):
+        """订阅窗口状态变化"""
+        self._subscribers.append(callback)
+
+    def invalidate(self):
+        """使缓存失效（如启动游戏或截图失败后），下一次查询必定访问后端"""
+        with self._lock:
+            self._checked_at = None
+
+    def refresh(self, force=False):
+        """
+        获取当前窗口句柄（缓存有效时不访问后端）
+        :param force: 忽略缓存有效期
+        :return: 窗口句柄，窗口不存在时为 0
+        """
+        with self._lock:
+            self.queries += 1
+            now = self.clock()
+            if (
+                not force
+                and self._checked_at is not None
+                and now - self._checked_at < self.ttl
+            ):
+                return self._hwnd
+
+            self.refreshes += 1
+            self._checked_at = now
+            hwnd = self._hwnd
+            if not (hwnd and self.backend.is_window(hwnd)):
+                hwnd = self.backend.find_window(self.title) or 0
+            if hwnd != self._hwnd:
+                self._hwnd = hwnd
+                self._pid = self.backend.process_id(hwnd) if hwnd else None
+                self._publish()
+            return self._hwnd
+
+    def _publish(self):
+        logging.debug(f"窗口状态变化: {self.title} hwnd={self._hwnd} pid={self._pid}")
+        for callback in self._subscribers:
+            try:
+                callback(self._hwnd, self._pid)
+            except Exception as e:
+                logging.error(f"窗口状态回调出错: {e}")
+
+    @property
+    def hwnd(self):
+        """窗口句柄，窗口不存在时为 0"""
+        return self.refresh()
+
+    @property
+    def pid(self):
+        """窗口所属进程 ID，窗口不存在或后端不支持时为 None"""
+        with self._lock:
+            self.refresh()
+            return self._pid
+
+    def exists(self):
+        """窗口是否存在"""
+        return bool(self.refresh())
+
+    def stats(self):
+        """查询统计"""
+        return {
+            "queries": self.queries,
+            "refreshes": self.refreshes,
+            "hit_ratio": (1 - self.refreshes / self.queries if self.queries else 0.0),
+        }
@@ -1,25 +1,22 @@
 # main.py
 import ctypes
 import sys
+import time
 import asyncio
 import webbrowser
 import atexit
 from threading import Thread
-from flask import Flask, abort, render_template, request
 import logging
 from PySide6.QtCore import QThread, Signal, QTimer, QObject
 from PySide6.QtGui import QIcon
 from PySide6.QtWidgets import QApplication, QMainWindow, QFileDialog
-from .core.sdk import bsgamesdk
-from .core.sdk import mihoyosdk
 from .gui import main_window as mainWindow
-from .core.bh3_utils import (
-    image_processor,
-    click_center_of_game_window,
-)
-from .core.bh3_utils import BH3GameManager
 from .constants import TEMPLATE_WEB_DIR
 from .utils.exception_utils import handle_exceptions
+from .utils.startup_profiler import startup_profiler
+
+# 注意：视觉（cv2/numpy/pyzbar/win32）、网络（requests/SDK）与 Flask 相关模块
+# 在首次使用时才导入，避免拖慢窗口显示
 
 # ========== 初始化配置管理器和版本更新工具 ==========
 from .dependency_container import (
@@ -28,8 +25,7 @@ from .dependency_container import (
     get_network_manager,
 )
 
-# 获取全局管理器实例
-network_manager = get_network_manager()
+# 获取全局管理器实例（network_manager 依赖网络模块，使用时再获取）
 config_manager = get_config_manager()
 version_manager = get_version_manager()
 
@@ -37,7 +33,18 @@ version_manager = get_version_manager()
 ui = None
 window = None
 app = None
-game_manager = BH3GameManager()
+game_manager = None
+
+
+def get_game_manager():
+    """获取游戏管理器（首次调用时导入视觉与窗口模块）"""
+    global game_manager
+    if game_manager is None:
+        from .core.bh3_utils import BH3GameManager
+
+        game_manager = BH3GameManager()
+    return game_manager
+
 
 # 注意：不要在模块导入时固定 BH_VER/OA_TOKEN，
 # 这些值可能随远程 version.json 更新而变化。
@@ -57,10 +64,9 @@ class UpdateDownloadThread(QThread):
             return
 
         self.update_status.emit("正在准备下载...")
-        # 使用全局导入的network_manager
 
         # 尝试按优先级下载
-        success = network_manager.try_download_by_priority()
+        success = get_network_manager().try_download_by_priority()
 
         # 再次检查是否已被请求停止
         if self.isInterruptionRequested():
@@ -100,10 +106,165 @@ class LoginThread(QThread):
     update_log = Signal(str)
     login_complete = Signal(bool)  # 登录完成信号，传递成功/失败状态
 
+    async def prefetch(self, local_bh_ver):
+        """
+        登录预取：与B站账号验证并行获取不依赖账号的数据
+        （崩坏3版本号、远程 version.json、OA 分发信息）。
+        结果缓存在各模块中，后续登录步骤直接命中缓存
+        """
+        from .core.sdk import mihoyosdk
+
+        async def timed(name, coro):
+            start = time.perf_counter()
+            try:
+                await coro
+            except Exception as e:
+                logging.debug(f"登录预取 - {name} 失败: {e}")
+            finally:
+                logging.debug(
+                    f"登录预取 - {name}: {(time.perf_counter() - start) * 1000:.0f}ms"
+                )
+
+        async def refresh_versions():
+            version_manager.refresh_oa_info()
+            if not version_manager.oa_versions:
+                await asyncio.to_thread(config_manager.check_program_update)
+                version_manager.refresh_oa_info()
+
+        await asyncio.gather(
+            timed("版本号", mihoyosdk.getBHVer(local_bh_ver)),
+            timed("version.json", refresh_versions()),
+        )
+        await timed("OA服务器", mihoyosdk.getOAServer())
+
     @handle_exceptions("登陆过程中发生错误", None)
     async def login(self):
-        logging.info("正在登录B站账号...")
+        from .core.sdk import mihoyosdk
+
+        login_start = phase_start = time.perf_counter()
+
+        def log_phase(phase):
+            """记录登录各阶段耗时（DEBUG）"""
+            nonlocal phase_start
+            now = time.perf_counter()
+            logging.debug(f"登录阶段耗时 - {phase}: {(now - phase_start) * 1000:.0f}ms")
+            phase_start = now
+
+        # 在调用 getBHVer 前动态计算本地默认 BH 版本，确保使用最新的 version.json
+        oa_versions = version_manager.get_version_info("oa_versions")
+        local_bh_ver = (
+            max(oa_versions.keys()) if oa_versions else version_manager.DEFAULT_BHVER
+        )
         config = config_manager.config
+        # 短时间内重启时直接使用已验证的会话，账号验证推迟到进入扫码状态之后
+        bh_info = None
+        if config["last_login_succ"]:
+            bh_info = mihoyosdk.getCachedSession(config["uid"], config["access_key"])
+        revalidate = bh_info is not None
+        # 预热米哈游接口的连接（不等待，失败不影响登录）；
+        # 需要验证账号时，不依赖账号的请求与B站账号验证并行进行。
+        # 使用已验证会话时没有可以并行的请求，版本号与 OA 服务器直接读取接口缓存
+        warm_up_task = asyncio.create_task(mihoyosdk.warmUp())
+        prefetch_task = (
+            None if revalidate else asyncio.create_task(self.prefetch(local_bh_ver))
+        )
+        try:
+            if revalidate:
+                logging.info(
+                    f"使用账号 {config['uname']} 已验证的会话，将在后台重新验证"
+                )
+                config_manager.bh_info = bh_info
+                log_phase("已验证会话")
+            else:
+                bs_info = await self.login_bilibili(config)
+                if bs_info is None:
+                    # 发出信号，即使失败也要通知主线程登录流程结束
+                    self.login_complete.emit(False)
+                    return
+                log_phase("B站账号")
+                logging.info("登陆崩坏3账号中...")
+                bh_info = await mihoyosdk.verify(bs_info["uid"], bs_info["access_key"])
+                config_manager.bh_info = bh_info
+                if bh_info["retcode"] != 0:
+                    logging.error(f"登录失败！{bh_info}")
+                    self.login_complete.emit(False)
+                    return
+                log_phase("崩坏3账号")
+            logging.info("登录成功，账号：LoveElysia1314，开始获取OA服务器信息...")
+            if prefetch_task:
+                await prefetch_task
+                log_phase("等待预取")
+            # 获取服务器版本号（传入本地默认版本作为缓存/参考）
+            server_bh_ver = await mihoyosdk.getBHVer(local_bh_ver)
+            # 检查版本是否匹配
+            if server_bh_ver != local_bh_ver:
+                logging.warning(
+                    f"版本不匹配 (本地: {local_bh_ver}, 服务器: {server_bh_ver})！"
+                )
+
+            # 刷新 OA 版本信息，如果为空则更新远程文件
+            version_manager.refresh_oa_info()
+            if not version_manager.oa_versions:
+                # 检查远程版本信息，确保 oa_versions 已更新
+                update_result = config_manager.check_program_update()
+                if "error" in update_result:
+                    logging.error(
+                        f"获取远程版本信息失败，无法继续获取OA服务器: {update_result['error']}"
+                    )
+                    self.login_complete.emit(False)
+                    return
+                # 重新刷新 OA 版本信息
+                version_manager.refresh_oa_info()
+
+            # 检查是否有对应版本的支持
+            if not version_manager.has_version_support(server_bh_ver):
+                logging.warning(f"警告：当前配置不支持游戏版本 {server_bh_ver}！")
+                logging.warning("请更新 version.json 中的 oa_versions 配置以支持新版本")
+                # 可以选择使用默认版本或提示用户
+                if version_manager.oa_versions:
+                    # 使用最新的支持版本
+                    supported_ver = max(version_manager.oa_versions.keys())
+                    logging.info(f"将使用支持的版本 {supported_ver} 继续")
+                    server_bh_ver = supported_ver
+                else:
+                    logging.error("无任何支持的版本配置！")
+                    self.login_complete.emit(False)
+                    return
+
+            logging.info(f"当前崩坏3版本: {server_bh_ver}")
+
+            # 根据服务器版本获取对应的OA_TOKEN
+            OA_TOKEN = version_manager.get_oa_token_for_version(server_bh_ver)
+
+            oa = await mihoyosdk.getOAServer(OA_TOKEN)
+            log_phase("版本与OA服务器")
+            if len(oa) < 100:
+                logging.info("获取OA服务器失败！请检查Token后重试")
+                self.login_complete.emit(False)
+                return
+            logging.info("获取OA服务器成功！")
+            config["account_login"] = True
+            config_manager.write_conf(config)
+            logging.debug(
+                f"登录至扫码就绪耗时: {(time.perf_counter() - login_start) * 1000:.0f}ms"
+            )
+            self.login_complete.emit(True)
+            if revalidate:
+                await self.revalidate_session(config)
+        finally:
+            # 提前返回或出错时取消未完成的预取，避免其在登录结束后继续运行
+            for task in (warm_up_task, prefetch_task):
+                if task:
+                    task.cancel()
+
+    async def login_bilibili(self, config):
+        """
+        登录B站账号：优先验证缓存账号，失效时使用账号密码重新登录
+        :return: {"uid", "access_key"}，失败时返回 None
+        """
+        from .core.sdk import bsgamesdk
+
+        logging.info("正在登录B站账号...")
         if config["last_login_succ"]:
             logging.info(f"验证缓存账号 {config['uname']} 中...")
             bs_user_info = await bsgamesdk.getUserInfo(
@@ -130,20 +291,16 @@ class LoginThread(QThread):
                 )
                 if not bs_info:
                     logging.error("登录请求失败，返回结果为空")
-                    self.login_complete.emit(False)
-                    return
+                    return None
                 if "access_key" not in bs_info:
                     self.handle_login_failure(bs_info)
-                    # 发出信号，即使失败也要通知主线程登录流程结束
-                    self.login_complete.emit(False)
-                    return
+                    return None
                 bs_user_info = await bsgamesdk.getUserInfo(
                     bs_info["uid"], bs_info["access_key"]
                 )
                 if not bs_user_info or "uname" not in bs_user_info:
                     logging.error("获取用户信息失败")
-                    self.login_complete.emit(False)
-                    return
+                    return None
                 logging.info(f"重新登陆B站账号 {bs_user_info['uname']} 成功！")
                 config.update(
                     {
@@ -161,20 +318,16 @@ class LoginThread(QThread):
             )
             if not bs_info:
                 logging.error("登录请求失败，返回结果为空")
-                self.login_complete.emit(False)
-                return
+                return None
             if "access_key" not in bs_info:
                 self.handle_login_failure(bs_info)
-                # 发出信号，即使失败也要通知主线程登录流程结束
-                self.login_complete.emit(False)
-                return
+                return None
             bs_user_info = await bsgamesdk.getUserInfo(
                 bs_info["uid"], bs_info["access_key"]
             )
             if not bs_user_info or "uname" not in bs_user_info:
                 logging.error("获取用户信息失败")
-                self.login_complete.emit(False)
-                return
+                return None
             logging.info(f"登陆B站账号 {bs_user_info['uname']} 成功！")
             config.update(
                 {
@@ -185,70 +338,27 @@ class LoginThread(QThread):
                 }
             )
             config_manager.write_conf(config)
-        logging.info("登陆崩坏3账号中...")
-        bh_info = await mihoyosdk.verify(bs_info["uid"], bs_info["access_key"])
-        config_manager.bh_info = bh_info
-        if bh_info["retcode"] != 0:
-            logging.error(f"登录失败！{bh_info}")
-            self.login_complete.emit(False)
-            return
-        logging.info("登录成功，账号：LoveElysia1314，开始获取OA服务器信息...")
-        # 在调用 getBHVer 前动态计算本地默认 BH 版本，确保使用最新的 version.json
-        oa_versions = version_manager.get_version_info("oa_versions")
-        local_bh_ver = (
-            max(oa_versions.keys()) if oa_versions else version_manager.DEFAULT_BHVER
-        )
-        # 获取服务器版本号（传入本地默认版本作为缓存/参考）
-        server_bh_ver = await mihoyosdk.getBHVer(local_bh_ver)
-        # 检查版本是否匹配
-        if server_bh_ver != local_bh_ver:
-            logging.warning(
-                f"版本不匹配 (本地: {local_bh_ver}, 服务器: {server_bh_ver})！"
-            )
+        return bs_info
 
-        # 刷新 OA 版本信息，如果为空则更新远程文件
-        version_manager.refresh_oa_info()
-        if not version_manager.oa_versions:
-            # 检查远程版本信息，确保 oa_versions 已更新
-            update_result = config_manager.check_program_update()
-            if "error" in update_result:
-                logging.error(
-                    f"获取远程版本信息失败，无法继续获取OA服务器: {update_result['error']}"
-                )
-                self.login_complete.emit(False)
-                return
-            # 重新刷新 OA 版本信息
-            version_manager.refresh_oa_info()
-
-        # 检查是否有对应版本的支持
-        if not version_manager.has_version_support(server_bh_ver):
-            logging.warning(f"警告：当前配置不支持游戏版本 {server_bh_ver}！")
-            logging.warning("请更新 version.json 中的 oa_versions 配置以支持新版本")
-            # 可以选择使用默认版本或提示用户
-            if version_manager.oa_versions:
-                # 使用最新的支持版本
-                supported_ver = max(version_manager.oa_versions.keys())
-                logging.info(f"将使用支持的版本 {supported_ver} 继续")
-                server_bh_ver = supported_ver
-            else:
-                logging.error("无任何支持的版本配置！")
-                self.login_complete.emit(False)
+    @handle_exceptions("后台验证会话出错", None)
+    async def revalidate_session(self, config):
+        """
+        后台重新验证缓存的会话：令牌仍有效时刷新会话，失效时清除会话缓存，
+        下次启动时重新登录
+        """
+        from .core.sdk import bsgamesdk, mihoyosdk
+
+        bs_user_info = await bsgamesdk.getUserInfo(config["uid"], config["access_key"])
+        if bs_user_info and "uname" in bs_user_info:
+            bh_info = await mihoyosdk.verify(config["uid"], config["access_key"])
+            if bh_info and bh_info.get("retcode") == 0:
+                config_manager.bh_info = bh_info
+                logging.debug("缓存会话重新验证成功")
                 return
-
-        logging.info(f"当前崩坏3版本: {server_bh_ver}")
-
-        # 根据服务器版本获取对应的OA_TOKEN
-        OA_TOKEN = version_manager.get_oa_token_for_version(server_bh_ver)
-
-        oa = await mihoyosdk.getOAServer(OA_TOKEN)
-        if len(oa) < 100:
-            logging.info("获取OA服务器失败！请检查Token后重试")
-            self.login_complete.emit(False)
-            return
-        logging.info("获取OA服务器成功！")
-        config["account_login"] = True
+        logging.warning("缓存的登录会话已失效，如扫码失败请重新登录")
+        mihoyosdk.invalidateSession()
+        config["last_login_succ"] = False
         config_manager.write_conf(config)
-        self.login_complete.emit(True)
 
     def handle_login_failure(self, bs_info):
         if not bs_info:
@@ -309,7 +419,9 @@ class ParseThread(QThread):
 
     async def periodic_check(self):
         """定期执行检查任务"""
-        await game_manager.auto_monitor(
+        from .core.bh3_utils import click_center_of_game_window, image_processor
+
+        await get_game_manager().auto_monitor(
             config_manager.get_effective_config(),
             image_processor,
             click_center_of_game_window,
@@ -475,7 +587,7 @@ class SelfMainWindow(QMainWindow):
         """
         统一的游戏启动方法，包含路径检查和消息提示
         """
-        game_manager.launch_game(show_messages=True)
+        get_game_manager().launch_game(show_messages=True)
 
     def launchGame(self):
         self.launch_game_unified()
@@ -496,7 +608,7 @@ class SelfMainWindow(QMainWindow):
         一键登录模式，支持跳过游戏启动（防止重复打开游戏）
         :param skip_launch: 如果为 True，则不执行 launchGame
         """
-        if game_manager.one_click_login(skip_launch=skip_launch):
+        if get_game_manager().one_click_login(skip_launch=skip_launch):
             self.temp_mode = True
             # 记录原始设置用于UI复原（不持久化）
             base_config = config_manager.config
@@ -609,6 +721,41 @@ class SelfMainWindow(QMainWindow):
         self.check_and_display_updates()
 
 
+# ========== 验证码网页服务 ==========
+def run_captcha_server():
+    """在当前线程中导入 Flask 并运行验证码网页服务（阻塞）"""
+    from flask import Flask, abort, render_template, request
+
+    fapp = Flask(__name__, template_folder=TEMPLATE_WEB_DIR)
+    log = logging.getLogger("werkzeug")
+    log.setLevel(logging.ERROR)
+
+    # Flask 路由定义（重要：删除会导致验证码网页 Not Found）
+    @fapp.route("/")
+    def index():
+        return render_template("index.html")
+
+    @fapp.route("/geetest")
+    def geetest():
+        return render_template("geetest.html")
+
+    @fapp.route("/ret", methods=["POST"])
+    def ret():
+        if not request.json:
+            logging.info("请求错误")
+            abort(400)
+        input_data = request.json
+        logging.debug(f"验证码数据接收: {input_data}")
+        config_manager.cap = input_data
+        # 延迟调用login_accept，避免与当前请求冲突
+        import threading
+
+        threading.Timer(1.0, login_accept).start()
+        return "1"
+
+    fapp.run(host="0.0.0.0", port=12983, threaded=True, use_reloader=False, debug=False)
+
+
 # ========== 应用启动函数 ==========
 def main():
     """运行应用程序的核心逻辑"""
@@ -616,6 +763,11 @@ def main():
     global ui, window, app
     global auto_login_triggered
 
+    # --profile-startup：记录到窗口显示的各阶段耗时（经 run.py 启动时还包含模块导入）
+    if "--profile-startup" in sys.argv:
+        startup_profiler.enable()
+    startup_profiler.mark("导入主模块")
+
     logging.basicConfig(
         level=logging.INFO,
         format="[%(asctime)s] %(levelname)s: %(message)s",
@@ -628,10 +780,14 @@ def main():
         logging.DEBUG if config.get("debug_print", False) else logging.INFO
     )
 
+    startup_profiler.mark("日志与配置")
+
     app = QApplication(sys.argv)
+    startup_profiler.mark("QApplication")
     window = SelfMainWindow()
     ui = mainWindow.Ui_MainWindow()  # 实例化 UI
     ui.setupUi(window)  # 设置 UI 到窗口
+    startup_profiler.mark("主窗口构建")
     # 添加 GUI 日志处理器
     handler = GuiHandler(ui.logText)
     logging.getLogger().addHandler(handler)
@@ -659,47 +815,12 @@ def main():
     )
 
     window.show()
+    startup_profiler.mark("窗口显示")
+    startup_profiler.report()
 
-    # Flask 应用设置（回退到v1.3.2：启动时直接启动Flask线程）
-    fapp = Flask(__name__, template_folder=TEMPLATE_WEB_DIR)
-    log = logging.getLogger("werkzeug")
-    log.setLevel(logging.ERROR)
-
-    # Flask 路由定义（重要：删除会导致验证码网页 Not Found）
-    @fapp.route("/")
-    def index():
-        return render_template("index.html")
-
-    @fapp.route("/geetest")
-    def geetest():
-        return render_template("geetest.html")
-
-    @fapp.route("/ret", methods=["POST"])
-    def ret():
-        if not request.json:
-            logging.info("请求错误")
-            abort(400)
-        input_data = request.json
-        logging.debug(f"验证码数据接收: {input_data}")
-        config_manager.cap = input_data
-        # 延迟调用login_accept，避免与当前请求冲突
-        import threading
-
-        threading.Timer(1.0, login_accept).start()
-        return "1"
-
-    flaskThread = Thread(
-        target=fapp.run,
-        daemon=True,
-        kwargs={
-            "host": "0.0.0.0",
-            "port": 12983,
-            "threaded": True,
-            "use_reloader": False,
-            "debug": False,
-        },
-    )
-    flaskThread.start()
+    # Flask 验证码服务（回退到v1.3.2：启动时直接启动Flask线程；
+    # Flask 在该线程中导入，不阻塞窗口显示）
+    Thread(target=run_captcha_server, daemon=True).start()
 
     # --- 在显示窗口前应用配置 ---
     # 尝试自动登录
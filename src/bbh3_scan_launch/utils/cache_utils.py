@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+接口缓存
+将版本号、OA 分发信息等接口结果持久化到 config/cache.json，按条目设置有效期；
+过期条目先返回旧值，同时在后台刷新（stale-while-revalidate）
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+
+from ..constants import CACHE_FILE_PATH
+
+
+class PersistentCache:
+    """
+    JSON 文件持久化缓存
+    条目格式 {键: {"value": 值, "stored_at": 写入时间戳}}，键一般为 "接口:游戏版本"
+    """
+
+    def __init__(self, path=CACHE_FILE_PATH, clock=time.time, refresh_timeout=0.5):
+        """
+        :param path: 缓存文件路径
+        :param clock: 时钟函数（可替换为模拟时钟）
+        :param refresh_timeout: 过期条目等待后台刷新的最长时间（秒）
+        """
+        self.path = path
+        self.clock = clock
+        self.refresh_timeout = refresh_timeout
+        self.lock = threading.Lock()
+        self._entries = self._load()
+        self._refreshing = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                entries = json.load(f)
+            return entries if isinstance(entries, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logging.warning(f"接口缓存文件损坏，已忽略: {e}")
+            return {}
+
+    def _save(self):
+        """原子写入缓存文件（调用方持有锁）"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f, ensure_ascii=False, indent=4)
+        os.replace(temp_path, self.path)
+
+    def get(self, key, ttl):
+        """
+        读取缓存
+        :param ttl: 有效期（秒）
+        :return: (值, 是否在有效期内)，无缓存或条目格式错误时为 (None, False)
+        """
+        with self.lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None, False
+        if not (
+            isinstance(entry, dict)
+            and "value" in entry
+            and isinstance(entry.get("stored_at"), (int, float))
+        ):
+            logging.warning(f"接口缓存条目格式错误，已忽略: {key}")
+            return None, False
+        return entry["value"], self.clock() - entry["stored_at"] < ttl
+
+    def set(self, key, value):
+        """写入缓存并落盘"""
+        with self.lock:
+            self._entries[key] = {"value": value, "stored_at": self.clock()}
+            try:
+                self._save()
+            except OSError as e:
+                logging.warning(f"写入接口缓存失败: {e}")
+
+    def invalidate(self, prefix=""):
+        """删除键以 prefix 开头的条目（默认全部）"""
+        with self.lock:
+            keys = [key for key in self._entries if key.startswith(prefix)]
+            for key in keys:
+                del self._entries[key]
+            if keys:
+                try:
+                    self._save()
+                except OSError as e:
+                    logging.warning(f"写入接口缓存失败: {e}")
+        if keys:
+            logging.debug(f"已清除接口缓存: {', '.join(keys)}")
+
+    async def get_or_fetch(self, key, fetch, ttl):
+        """
+        读取缓存，必要时调用 fetch 获取
+        - 有效期内：直接返回缓存
+        - 已过期：在后台调用 fetch 刷新，至多等待 refresh_timeout 秒，超时则先返回旧值
+        - 无缓存：等待 fetch 返回；返回 None 表示获取失败，不写入缓存
+        :param fetch: 无参协程函数
+        """
+        value, fresh = self.get(key, ttl)
+        if fresh:
+            self.hits += 1
+            return value
+        if value is not None:
+            self.stale_hits += 1
+            task = self._refreshing.get(key)
+            if task is None or task.done():
+                task = asyncio.create_task(self._refresh(key, fetch))
+                self._refreshing[key] = task
+            # 调用方多运行在短生命周期的 asyncio.run 中，事件循环结束时未完成的刷新会被取消，
+            # 因此在此短暂等待刷新完成
+            try:
+                refreshed = await asyncio.wait_for(
+                    asyncio.shield(task), self.refresh_timeout
+                )
+            except asyncio.TimeoutError:
+                return value
+            return value if refreshed is None else refreshed
+        self.misses += 1
+        value = await fetch()
+        if value is not None:
+            self.set(key, value)
+        return value
+
+    async def _refresh(self, key, fetch):
+        try:
+            value = await fetch()
+            if value is not None:
+                self.set(key, value)
+            return value
+        except Exception as e:
+            logging.warning(f"后台刷新接口缓存失败（{key}）: {e}")
+            return None
+        finally:
+            self._refreshing.pop(key, None)
+
+    def stats(self):
+        """命中统计"""
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+        }
+
+
+# 全局实例
+api_cache = PersistentCache()
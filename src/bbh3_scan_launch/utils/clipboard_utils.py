@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+剪贴板工具
+通过剪贴板序列号（或内容哈希）判断剪贴板是否变化，仅在变化时读取并解码图像
+"""
+
+import hashlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from PIL import Image, ImageGrab
+
+try:
+    from ctypes import windll
+except ImportError:
+    windll = None
+
+
+class ClipboardBackend(ABC):
+    """剪贴板后端接口"""
+
+    def sequence_number(self):
+        """剪贴板序列号（每次内容变化时递增），不支持时返回 None"""
+        return None
+
+    @abstractmethod
+    def grab_image(self):
+        """读取剪贴板中的图像，无图像时返回 None"""
+
+
+class SystemClipboardBackend(ClipboardBackend):
+    """系统剪贴板后端（Windows 下使用 GetClipboardSequenceNumber）"""
+
+    def sequence_number(self):
+        if windll is None:
+            return None
+        return windll.user32.GetClipboardSequenceNumber()
+
+    def grab_image(self):
+        image = ImageGrab.grabclipboard()
+        return image if isinstance(image, Image.Image) else None
+
+
+class ClipboardWatcher:
+    """
+    剪贴板变化监视器
+    - 后端支持序列号时，序列号不变即直接跳过，不读取剪贴板
+    - 不支持序列号时，退化为比较图像内容哈希
+    - 记录已确认无效（无二维码/格式错误）的图像，重复复制时不再解码
+    """
+
+    def __init__(self, backend=None, memo_size=32):
+        """
+        :param backend: 剪贴板后端，默认为系统剪贴板
+        :param memo_size: 已拒绝图像哈希的记忆数量
+        """
+        self.backend = backend or SystemClipboardBackend()
+        self.memo_size = memo_size
+        self._last_sequence = None
+        self._last_digest = None
+        self._rejected = OrderedDict()
+        self.changed = False  # 最近一次 poll 时剪贴板是否发生变化
+        self.polls = 0
+        self.grabs = 0
+        self.suppressed = 0
+
+    @staticmethod
+    def digest(image):
+        """计算图像内容哈希"""
+        hasher = hashlib.blake2b(digest_size=16)
+        hasher.update(f"{image.mode}:{image.size}".encode())
+        hasher.update(image.tobytes())
+        return hasher.hexdigest()
+
+    def poll(self):
+        """
+        检查剪贴板
+        :return: 新出现且未被拒绝过的图像；剪贴板未变化或无新图像时返回 None
+        """
+        self.polls += 1
+        self.changed = False
+        sequence = self.backend.sequence_number()
+        if sequence is not None:
+            if sequence == self._last_sequence:
+                return None
+            self._last_sequence = sequence
+            self.changed = True
+
+        self.grabs += 1
+        image = self.backend.grab_image()
+        if image is None:
+            self._last_digest = None
+            return None
+
+        digest = self.digest(image)
+        if digest in self._rejected or (
+            sequence is None and digest == self._last_digest
+        ):
+            self.suppressed += 1
+            return None
+        self._last_digest = digest
+        self.changed = True
+        return image
+
+    def reject(self, image):
+        """记录无效图像，之后再次出现时不再返回"""
+        digest = self.digest(image)
+        self._rejected[digest] = True
+        self._rejected.move_to_end(digest)
+        while len(self._rejected) > self.memo_size:
+            self._rejected.popitem(last=False)
+
+    def reset(self):
+        """清除变化状态（下一次 poll 必定读取剪贴板）"""
+        self._last_sequence = None
+        self._last_digest = None
+
+    def stats(self):
+        """轮询统计"""
+        return {
+            "polls": self.polls,
+            "grabs": self.grabs,
+            "suppressed": self.suppressed,
+        }
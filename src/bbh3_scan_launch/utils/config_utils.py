@@ -35,6 +35,8 @@ class ConfigManager:
     DEFAULT_CONFIG = {
         "game_path": "",
         "sleep_time": 1,
+        "min_sleep_time": 0.5,
+        "max_sleep_time": 5,
         "account": "",
         "password": "",
         "uid": 0,
@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+"""
+共享 HTTP 客户端
+按主机复用 requests.Session 与 keep-alive 连接池，避免每次请求重新进行 DNS 解析、
+TCP 与 TLS 握手；按统一的重试策略处理瞬时故障，并统计连接复用与各接口的延迟/重试情况
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class RetryPolicy:
+    """
+    请求重试策略
+    - 每次尝试使用独立的超时，最多尝试 max_attempts 次
+    - 两次尝试之间按指数退避等待，并加入随机抖动，避免多个客户端同时重试
+    - 幂等请求在连接错误、超时、5xx/429 与响应格式错误时重试；
+      非幂等请求只在连接超时（请求尚未发出）时重试，防止重复提交
+    """
+
+    IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS")
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(
+        self, max_attempts=3, timeout=(5, 15), backoff=0.5, max_backoff=8.0, jitter=0.5
+    ):
+        """
+        :param max_attempts: 最大尝试次数（含首次）
+        :param timeout: 每次尝试的超时（秒），可为 (连接超时, 读取超时)
+        :param backoff: 首次重试前的等待时间（秒），之后每次翻倍
+        :param max_backoff: 单次等待时间上限（秒）
+        :param jitter: 抖动比例，实际等待时间在 [1 - jitter, 1 + jitter] 倍之间
+        """
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+
+    def delay(self, attempt):
+        """第 attempt 次尝试失败后的等待时间（秒）"""
+        base = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        return base * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def is_idempotent(self, method):
+        return method.upper() in self.IDEMPOTENT_METHODS
+
+    def should_retry(self, idempotent, error=None, status=None):
+        """
+        判断失败是否可以重试
+        :param idempotent: 请求是否幂等
+        :param error: 请求或响应解析抛出的异常
+        :param status: HTTP 状态码
+        """
+        if isinstance(error, requests.exceptions.ConnectTimeout):
+            return True
+        if not idempotent:
+            return False
+        if isinstance(error, requests.exceptions.SSLError):
+            return False
+        if isinstance(
+            error,
+            (
+                requests.exceptions.ConnectionError,
+                requests.exceptions.Timeout,
+                ValueError,
+            ),
+        ):
+            return True
+        return status in self.RETRY_STATUSES
+
+
+class EndpointStats:
+    """单个接口的请求统计"""
+
+    def __init__(self):
+        self.calls = 0
+        self.attempts = 0
+        self.retries = 0
+        self.failures = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, attempts, elapsed_ms, failed):
+        self.calls += 1
+        self.attempts += attempts
+        self.retries += attempts - 1
+        self.failures += failed
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def as_dict(self):
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "failures": self.failures,
+            "avg_ms": self.total_ms / self.calls if self.calls else 0.0,
+            "max_ms": self.max_ms,
+        }
+
+
+class HttpClient:
+    """
+    HTTP 客户端
+    - 每个主机一个 Session，Session 内的连接池在请求之间保持连接
+    - 所有请求按 retry_policy 设置超时与重试，并按接口（方法 + 主机 + 路径）统计
+    """
+
+    def __init__(
+        self, pool_connections=4, pool_maxsize=8, retry_policy=None, verify=True
+    ):
+        """
+        :param pool_connections: 每个 Session 缓存的连接池数量
+        :param pool_maxsize: 每个连接池保持的最大连接数
+        :param retry_policy: 重试策略，默认为 RetryPolicy()
+        :param verify: TLS 证书校验（True 或 CA 证书路径）
+        """
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.verify = verify
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def session_for(self, url):
+        """获取目标主机的 Session（首次使用时创建）"""
+        host = urlsplit(url).netloc
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=self.pool_connections,
+                    pool_maxsize=self.pool_maxsize,
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sessions[host] = session
+            return session
+
+    def request(
+        self, method, url, idempotent=None, parse=None, retry_policy=None, **kwargs
+    ):
+        """
+        发送请求（按重试策略重试），其余参数与 requests.Session.request 相同
+        :param idempotent: 请求是否幂等，默认按请求方法判断
+        :param retry_policy: 本次请求使用的重试策略，默认为客户端的 retry_policy
+        :param parse: 响应解析函数（如 lambda res: res.json()），解析失败视为响应格式错误
+        :return: parse 的返回值，未提供 parse 时返回响应对象
+        :raises: 最后一次尝试的异常（重试耗尽或不可重试时）
+        """
+        policy = retry_policy or self.retry_policy
+        if idempotent is None:
+            idempotent = policy.is_idempotent(method)
+        kwargs.setdefault("timeout", policy.timeout)
+        # 按请求传入：Session.verify 会被 REQUESTS_CA_BUNDLE/CURL_CA_BUNDLE 覆盖，
+        # 按请求传入的 CA 证书路径或 False 优先于环境变量；为 True 时仍使用环境变量指定的 CA 证书
+        kwargs.setdefault("verify", self.verify)
+        session = self.session_for(url)
+        parts = urlsplit(url)
+        endpoint = f"{method.upper()} {parts.netloc}{parts.path}"
+
+        start = time.perf_counter()
+        attempt = 0
+        failed = True
+        try:
+            while True:
+                attempt += 1
+                error = status = None
+                try:
+                    response = session.request(method, url, **kwargs)
+                    status = response.status_code
+                    result = parse(response) if parse else response
+                    if status not in policy.RETRY_STATUSES:
+                        failed = False
+                        return result
+                except Exception as e:
+                    error = e
+                if attempt >= policy.max_attempts or not policy.should_retry(
+                    idempotent, error, status
+                ):
+                    if error is not None:
+                        raise error
+                    return result
+                delay = policy.delay(attempt)
+                logging.debug(
+                    f"请求失败（{error or status}），{delay:.1f}秒后第{attempt + 1}次尝试: {endpoint}"
+                )
+                time.sleep(delay)
+        finally:
+            self._record(
+                endpoint, attempt, (time.perf_counter() - start) * 1000, failed
+            )
+
+    def _record(self, endpoint, attempts, elapsed_ms, failed):
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = EndpointStats()
+            stats.record(attempts, elapsed_ms, failed)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    async def arequest(self, method, url, **kwargs):
+        """
+        异步发送请求：在线程池中执行阻塞请求，等待网络期间不阻塞事件循环，
+        仍复用同一个连接池
+        """
+        return await asyncio.to_thread(self.request, method, url, **kwargs)
+
+    async def warm_up(self, url):
+        """
+        预热连接：向目标主机发送一次 HEAD 请求，使连接池中保留一个已完成握手的连接。
+        响应内容与状态码无关紧要，失败时忽略；只尝试一次并使用较短的超时（WARM_UP_POLICY）
+        """
+        try:
+            await self.arequest("HEAD", url, retry_policy=WARM_UP_POLICY)
+        except Exception as e:
+            logging.debug(f"连接预热失败: {url} - {e}")
+
+    async def aget(self, url, **kwargs):
+        return await self.arequest("GET", url, **kwargs)
+
+    async def apost(self, url, **kwargs):
+        return await self.arequest("POST", url, **kwargs)
+
+    def endpoint_stats(self):
+        """
+        各接口的请求统计
+        :return: {接口: {"calls", "retries", "failures", "avg_ms", "max_ms"}}
+        """
+        with self._lock:
+            return {
+                endpoint: stats.as_dict() for endpoint, stats in self._endpoints.items()
+            }
+
+    def stats(self):
+        """
+        各主机的连接统计
+        :return: {主机: {"requests": 请求数, "connections": 新建连接数, "reused": 复用连接的请求数}}
+        """
+        stats = {}
+        with self._lock:
+            sessions = list(self._sessions.items())
+        for host, session in sessions:
+            requests_count = connections = 0
+            for adapter in set(session.adapters.values()):
+                pools = adapter.poolmanager.pools
+                for key in pools.keys():
+                    pool = pools[key]
+                    requests_count += pool.num_requests
+                    connections += pool.num_connections
+            stats[host] = {
+                "requests": requests_count,
+                "connections": connections,
+                "reused": requests_count - connections,
+            }
+        return stats
+
+    def close(self):
+        """关闭所有 Session 及其连接"""
+        with self._lock:
+            sessions, self._sessions = list(self._sessions.values()), {}
+        for session in sessions:
+            session.close()
+
+
+# 单次尝试（不重试）的策略，用于调用方自行回退到其他源的请求
+NO_RETRY = RetryPolicy(max_attempts=1)
+# 连接预热的策略：预热只是尽力而为，主机缓慢或不可达时尽快放弃
+WARM_UP_POLICY = RetryPolicy(max_attempts=1, timeout=(3, 3))
+
+# 全局实例
+http_client = HttpClient()
@@ -1,5 +1,4 @@
 # network_utils.py
-import requests
 import os
 import webbrowser
 import json
@@ -8,6 +7,7 @@ import time
 from typing import List, Dict
 from ..constants import VERSION_FILE_PATH
 from .exception_utils import handle_exceptions
+from .http_client import NO_RETRY, http_client
 
 
 class SourceManager:
@@ -71,10 +71,17 @@ class NetworkManager:
 
     @handle_exceptions("网络请求失败", {"success": False})
     def fetch_from_source(self, url, timeout=5):
-        """从单个源获取数据"""
+        """
+        从单个源获取数据
+        只尝试一次（不重试），失败时由调用方立即回退到下一个源，
+        单个源不可用时最多等待 timeout 秒
+        """
         logging.debug(f"网络工具GET请求 - URL: {url}")
-        response = requests.get(
-            url, timeout=timeout, headers={"User-Agent": "Mozilla/5.0"}
+        response = http_client.get(
+            url,
+            timeout=timeout,
+            retry_policy=NO_RETRY,
+            headers={"User-Agent": "Mozilla/5.0"},
         )
         response.raise_for_status()  # 自动检查HTTP状态码
         return {
@@ -1,12 +1,20 @@
 import base64
+import functools
+
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric import padding
 
 
+@functools.lru_cache(maxsize=8)
+def load_public_key(public_key):
+    """解析PEM格式的RSA公钥（同一公钥只解析一次）"""
+    return serialization.load_pem_public_key(public_key.encode("utf-8"))
+
+
 def rsacreate(message, public_key):
     """使用RSA公钥加密消息（PKCS#1 v1.5填充）"""
-    # 加载公钥
-    pub_key = serialization.load_pem_public_key(public_key.encode("utf-8"))
+    # 加载公钥（缓存解析结果）
+    pub_key = load_public_key(public_key)
 
     # 使用PKCS1v15填充加密
     cipher_text = pub_key.encrypt(message.encode("utf-8"), padding.PKCS1v15())
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+启动耗时分析（--profile-startup）
+记录启动各阶段到窗口显示的耗时，并统计每个模块的导入耗时
+（与 python -X importtime 相同的自身/累计耗时口径）
+"""
+
+import importlib.abc
+import logging
+import sys
+import threading
+import time
+
+
+class _TimedLoader(importlib.abc.Loader):
+    """
+    计时加载器代理
+    只替换本次导入的模块规格中的加载器，原加载器实例不做修改
+    （同一加载器实例可能被多个模块共用，如 PyInstaller 的 FrozenImporter）
+    """
+
+    def __init__(self, loader, timer):
+        self.loader = loader
+        self.timer = timer
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        # 模块与其规格恢复为原加载器，分析结束后不留下代理
+        module.__loader__ = self.loader
+        if module.__spec__ is not None:
+            module.__spec__.loader = self.loader
+        self.timer.timed(module.__name__, self.loader.exec_module, module)
+
+    def __getattr__(self, name):
+        return getattr(self.loader, name)
+
+
+class _ImportTimer(importlib.abc.MetaPathFinder):
+    """
+    导入计时器
+    由其余查找器定位模块，再以计时代理替换规格中的加载器，记录模块执行耗时；
+    内置/冻结模块的加载器为类本身，不做代理
+    """
+
+    def __init__(self, records):
+        self.records = records
+        self._local = threading.local()
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        loader = spec.loader
+        if (
+            loader is None
+            or isinstance(loader, type)
+            or not hasattr(loader, "exec_module")
+        ):
+            return spec
+        spec.loader = _TimedLoader(loader, self)
+        return spec
+
+    def timed(self, fullname, exec_module, module):
+        """执行模块并记录 (模块, 自身耗时, 累计耗时)"""
+        stack = self._local.__dict__.setdefault("stack", [])
+        stack.append(0.0)  # 子模块累计耗时
+        start = time.perf_counter()
+        try:
+            exec_module(module)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            self.records.append((fullname, elapsed - children, elapsed))
+
+
+class StartupProfiler:
+    """
+    启动耗时分析器
+    未启用时 mark 为空操作，可以常驻在启动流程中
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.started_at = None
+        self.phases = []  # [(阶段, 阶段耗时秒)]
+        self.imports = []  # [(模块, 自身耗时秒, 累计耗时秒)]
+        self._last_mark = None
+        self._timer = None
+
+    def enable(self):
+        """开始分析（须在导入主模块之前调用，才能统计到启动时的导入）"""
+        if self.enabled:
+            return
+        self.enabled = True
+        self.started_at = self._last_mark = time.perf_counter()
+        self._timer = _ImportTimer(self.imports)
+        sys.meta_path.insert(0, self._timer)
+
+    def mark(self, phase):
+        """记录一个阶段结束"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last_mark))
+        self._last_mark = now
+
+    def report(self, top=15):
+        """
+        停止导入计时并输出报告
+        :param top: 列出累计导入耗时最长的模块数
+        """
+        if not self.enabled:
+            return
+        if self._timer in sys.meta_path:
+            sys.meta_path.remove(self._timer)
+        total = time.perf_counter() - self.started_at
+        lines = [f"启动耗时分析：到窗口显示共 {total * 1000:.0f}ms"]
+        for phase, elapsed in self.phases:
+            lines.append(f"  {phase:<16} {elapsed * 1000:>8.1f}ms")
+        lines.append(f"导入模块 {len(self.imports)} 个，累计耗时最长的 {top} 个：")
+        lines.append(f"  {'自身(ms)':>10} {'累计(ms)':>10}  模块")
+        for name, own, cumulative in sorted(
+            self.imports, key=lambda record: record[2], reverse=True
+        )[:top]:
+            lines.append(f"  {own * 1000:>10.1f} {cumulative * 1000:>10.1f}  {name}")
+        logging.info("\n".join(lines))
+
+
+# 全局实例
+startup_profiler = StartupProfiler()